@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from app.core.database import Base
 from app.core.config import settings
 import app.models  # Import all models
+from app.services.audit_partition_service import partition_month
 
 config = context.config
 
@@ -19,6 +20,17 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # audit_logs partitions are created at runtime, not by migrations
+    if type_ == "table" and partition_month(name):
+        return False
+    if type_ == "index" and partition_month(object.table.name):
+        return False
+    return True
+
+
 # Override sqlalchemy.url with env variable
 config.set_main_option('sqlalchemy.url', settings.DATABASE_URL)
 
@@ -30,6 +42,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -46,7 +59,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,44 @@
+"""make_audit_logs_immutable
+
+Revision ID: 198f43bd776d
+Revises: 850041367c99
+Create Date: 2026-10-16 23:45:43.145863
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '198f43bd776d'
+down_revision = '850041367c99'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Audit rows can be inserted but never changed or removed, whatever
+    # connects to the database
+    op.execute("""
+        CREATE FUNCTION audit_logs_immutable() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'audit_logs is append-only: % not allowed', TG_OP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER audit_logs_no_update_or_delete
+        BEFORE UPDATE OR DELETE ON audit_logs
+        FOR EACH ROW EXECUTE FUNCTION audit_logs_immutable()
+    """)
+    op.execute("""
+        CREATE TRIGGER audit_logs_no_truncate
+        BEFORE TRUNCATE ON audit_logs
+        FOR EACH STATEMENT EXECUTE FUNCTION audit_logs_immutable()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER audit_logs_no_truncate ON audit_logs")
+    op.execute("DROP TRIGGER audit_logs_no_update_or_delete ON audit_logs")
+    op.execute("DROP FUNCTION audit_logs_immutable()")
@@ -0,0 +1,114 @@
+"""partition_audit_logs_by_month
+
+Revision ID: 286df263077f
+Revises: 198f43bd776d
+Create Date: 2026-10-16 23:48:46.999906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import date, datetime
+
+
+# revision identifiers, used by Alembic.
+revision = '286df263077f'
+down_revision = '198f43bd776d'
+branch_labels = None
+depends_on = None
+
+
+# Partitions created past the current month; the daily maintenance task
+# keeps this many ahead from then on
+MONTHS_AHEAD = 3
+
+IMMUTABLE_TRIGGERS = """
+    CREATE TRIGGER audit_logs_no_update_or_delete
+    BEFORE UPDATE OR DELETE ON audit_logs
+    FOR EACH ROW EXECUTE FUNCTION audit_logs_immutable();
+    CREATE TRIGGER audit_logs_no_truncate
+    BEFORE TRUNCATE ON audit_logs
+    FOR EACH STATEMENT EXECUTE FUNCTION audit_logs_immutable()
+"""
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _set_aside_current_table(suffix: str):
+    # Index names are schema-wide, so the old table's move out of the way
+    op.rename_table('audit_logs', f'audit_logs_{suffix}')
+    op.execute(f"ALTER INDEX audit_logs_pkey RENAME TO audit_logs_{suffix}_pkey")
+    op.execute(f"ALTER INDEX ix_audit_logs_action RENAME TO ix_audit_logs_{suffix}_action")
+    op.execute(f"ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_{suffix}_created_at")
+    op.execute(f"DROP TRIGGER audit_logs_no_truncate ON audit_logs_{suffix}")
+    op.execute(f"DROP TRIGGER audit_logs_no_update_or_delete ON audit_logs_{suffix}")
+
+
+def _create_audit_logs(partitioned: bool):
+    op.create_table('audit_logs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('actor_id', sa.UUID(), nullable=False),
+    sa.Column('payload_snapshot', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at') if partitioned else sa.PrimaryKeyConstraint('id'),
+    **({'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {})
+    )
+    op.create_index(op.f('ix_audit_logs_action'), 'audit_logs', ['action'], unique=False)
+    op.create_index(op.f('ix_audit_logs_created_at'), 'audit_logs', ['created_at'], unique=False)
+
+
+def upgrade() -> None:
+    _set_aside_current_table('unpartitioned')
+    _create_audit_logs(partitioned=True)
+    op.create_index('ix_audit_logs_actor_id_created_at', 'audit_logs', ['actor_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_actor_id_action_created_at', 'audit_logs', ['actor_id', 'action', 'created_at'], unique=False)
+
+    # A partition for every month with entries, through MONTHS_AHEAD from now
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM audit_logs_unpartitioned")).scalar()
+    today = datetime.utcnow().date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        name = f"audit_logs_y{month.year}m{month.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        # Row triggers are inherited from the parent; TRUNCATE ones aren't
+        op.execute(
+            f"CREATE TRIGGER audit_logs_no_truncate BEFORE TRUNCATE ON {name} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION audit_logs_immutable()"
+        )
+        month = _add_months(month, 1)
+
+    op.execute("""
+        INSERT INTO audit_logs (id, action, actor_id, payload_snapshot, created_at)
+        SELECT id, action, actor_id, payload_snapshot, created_at FROM audit_logs_unpartitioned
+    """)
+    op.drop_table('audit_logs_unpartitioned')
+    op.execute(IMMUTABLE_TRIGGERS)
+
+
+def downgrade() -> None:
+    # Archived partitions (in the audit_archive schema) are left as they are
+    op.rename_table('audit_logs', 'audit_logs_partitioned')
+    op.execute("DROP TRIGGER audit_logs_no_truncate ON audit_logs_partitioned")
+    op.execute("DROP TRIGGER audit_logs_no_update_or_delete ON audit_logs_partitioned")
+    op.execute("ALTER INDEX audit_logs_pkey RENAME TO audit_logs_partitioned_pkey")
+    op.execute("ALTER INDEX ix_audit_logs_action RENAME TO ix_audit_logs_partitioned_action")
+    op.execute("ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_partitioned_created_at")
+    op.execute("ALTER INDEX ix_audit_logs_actor_id_created_at RENAME TO ix_audit_logs_partitioned_actor_id_created_at")
+    op.execute("ALTER INDEX ix_audit_logs_actor_id_action_created_at RENAME TO ix_audit_logs_partitioned_actor_id_action_created_at")
+
+    _create_audit_logs(partitioned=False)
+    op.execute("""
+        INSERT INTO audit_logs (id, action, actor_id, payload_snapshot, created_at)
+        SELECT id, action, actor_id, payload_snapshot, created_at FROM audit_logs_partitioned
+    """)
+    # Dropping the parent drops its partitions
+    op.drop_table('audit_logs_partitioned')
+    op.execute(IMMUTABLE_TRIGGERS)
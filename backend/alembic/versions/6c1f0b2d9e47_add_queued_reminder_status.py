@@ -0,0 +1,31 @@
+"""add_queued_reminder_status
+
+Revision ID: 6c1f0b2d9e47
+Revises: 20f22797dad6
+Create Date: 2026-10-17 10:42:08.311920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1f0b2d9e47'
+down_revision = '20f22797dad6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE reminderstatus ADD VALUE IF NOT EXISTS 'queued' AFTER 'scheduled'")
+
+
+def downgrade() -> None:
+    # Postgres can't drop an enum value; put queued drafts back to approved
+    # and rebuild the type without it
+    op.execute("UPDATE reminder_drafts SET status = 'approved', delivery_status = NULL WHERE status = 'queued'")
+    op.execute("ALTER TABLE reminder_drafts ALTER COLUMN status DROP DEFAULT")
+    op.execute("ALTER TYPE reminderstatus RENAME TO reminderstatus_old")
+    op.execute("CREATE TYPE reminderstatus AS ENUM ('pending', 'approved', 'scheduled', 'sent', 'failed')")
+    op.execute("ALTER TABLE reminder_drafts ALTER COLUMN status TYPE reminderstatus USING status::text::reminderstatus")
+    op.execute("DROP TYPE reminderstatus_old")
@@ -0,0 +1,43 @@
+"""add_invoices_business_id
+
+Revision ID: f20f367eccdb
+Revises: b79869c427fe
+Create Date: 2026-10-17 00:15:41.421132
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f20f367eccdb'
+down_revision = 'b79869c427fe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Added nullable and filled in from each invoice's client before the
+    # constraint goes on
+    op.add_column('invoices', sa.Column('business_id', sa.UUID(), nullable=True))
+    op.execute("""
+        UPDATE invoices SET business_id = clients.business_id
+        FROM clients WHERE clients.id = invoices.client_id
+    """)
+    op.alter_column('invoices', 'business_id', nullable=False)
+    op.create_foreign_key('invoices_business_id_fkey', 'invoices', 'businesses', ['business_id'], ['id'])
+
+    # The keyset indexes are scoped to a business instead of spanning all of them
+    op.drop_index('ix_invoices_due_date_id', table_name='invoices')
+    op.drop_index('ix_invoices_status_due_date_id', table_name='invoices')
+    op.create_index('ix_invoices_business_id_due_date_id', 'invoices', ['business_id', 'due_date', 'id'], unique=False)
+    op.create_index('ix_invoices_business_id_status_due_date_id', 'invoices', ['business_id', 'status', 'due_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoices_business_id_status_due_date_id', table_name='invoices')
+    op.drop_index('ix_invoices_business_id_due_date_id', table_name='invoices')
+    op.create_index('ix_invoices_status_due_date_id', 'invoices', ['status', 'due_date', 'id'], unique=False)
+    op.create_index('ix_invoices_due_date_id', 'invoices', ['due_date', 'id'], unique=False)
+    op.drop_constraint('invoices_business_id_fkey', 'invoices', type_='foreignkey')
+    op.drop_column('invoices', 'business_id')
@@ -0,0 +1,115 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, union_all
+from typing import List, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import base64
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.models.audit_log import AuditLog
+from app.schemas.audit import AuditLogResponse
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+# Largest page GET /audit will return in one response
+MAX_AUDIT_PAGE_SIZE = 500
+
+
+def _encode_cursor(created_at: datetime, entry_id) -> str:
+    """Opaque cursor pointing just past an entry in (created_at, id) order"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{entry_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), UUID(entry_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("", response_model=List[AuditLogResponse])
+async def get_audit_log(
+    response: Response,
+    actor_id: Optional[UUID] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=MAX_AUDIT_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get audit log entries for the current user's business, newest first
+
+    Filter by `actor_id`, `action` and a `since`/`until` window (UTC,
+    `until` exclusive). When more entries follow, the response carries an
+    X-Next-Cursor header to send back as `cursor`.
+    """
+    actor_ids = [
+        user_id for (user_id,) in db.query(User.id).filter(
+            User.business_id == current_user.business_id
+        )
+    ]
+    if actor_id:
+        if actor_id not in actor_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        actor_ids = [actor_id]
+
+    if since and until and since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must be before until"
+        )
+
+    position = _decode_cursor(cursor) if cursor else None
+    ordering = (AuditLog.created_at.desc(), AuditLog.id.desc())
+
+    def newest_for(user_id: UUID):
+        # Walks ix_audit_logs_actor_id_created_at backwards; the time window
+        # also limits which monthly partitions are read at all
+        statement = select(AuditLog.__table__).where(AuditLog.actor_id == user_id)
+        if action:
+            statement = statement.where(AuditLog.action == action)
+        if since:
+            statement = statement.where(AuditLog.created_at >= since)
+        if until:
+            statement = statement.where(AuditLog.created_at < until)
+        if position:
+            # Keyset: resume strictly after the last entry of the previous
+            # page. The plain bound on created_at is what lets Postgres skip
+            # newer partitions; it can't prune on the row comparison.
+            statement = statement.where(
+                AuditLog.created_at <= position[0],
+                tuple_(AuditLog.created_at, AuditLog.id) < position
+            )
+        # One extra row tells us whether another page follows
+        return statement.order_by(*ordering).limit(limit + 1)
+
+    # One index walk per user, merged, rather than filtering the whole
+    # business's history by actor
+    if len(actor_ids) == 1:
+        statement = newest_for(actor_ids[0])
+    else:
+        merged = union_all(*[newest_for(user_id) for user_id in actor_ids]).subquery()
+        statement = select(merged).order_by(
+            merged.c.created_at.desc(), merged.c.id.desc()
+        ).limit(limit + 1)
+
+    rows = db.execute(statement).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows
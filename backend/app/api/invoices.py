@@ -1,21 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-import csv
-import io
-from datetime import datetime
+from sqlalchemy import select, tuple_
+from typing import List, Optional, Tuple
+from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
+import asyncio
+import base64
+import os
+import uuid
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.client import Client
 from app.models.invoice import Invoice, InvoiceStatus, ExternalSource
-from app.schemas.invoice import InvoiceResponse, InvoiceUploadResponse, InvoiceManualCreate, InvoiceUpdate
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.schemas.invoice import (
+    InvoiceResponse,
+    InvoiceListItem,
+    InvoiceUploadResponse,
+    InvoiceManualCreate,
+    InvoiceUpdate,
+    ImportJobResponse,
+    ReceivablesSummaryResponse,
+    SummaryBucket
+)
 from app.services.audit_service import AuditService
+from app.services.export_service import stream_export, EXPORT_FORMATS
+from app.services.receivables_summary_service import ReceivablesSummaryService, invoice_state
+from app.services.invoice_import_service import (
+    InvoiceImportService,
+    hash_upload,
+    open_upload,
+    stage_upload,
+    REQUIRED_FIELDS,
+    EXCEL_EXTENSIONS
+)
 
 router = APIRouter(prefix="/invoices", tags=["invoices"])
 
+# Largest page GET /invoices/ will return in one response
+MAX_INVOICE_PAGE_SIZE = 500
+
 
 @router.post("/upload", response_model=InvoiceUploadResponse)
 async def upload_invoices(
@@ -32,200 +61,457 @@ async def upload_invoices(
         )
 
     audit_service = AuditService(db)
-    success_count = 0
-    failed_count = 0
-    errors = []
-
-    # Read file contents
-    contents = await file.read()
-
-    # Convert Excel to CSV-like dict reader if needed
-    if file_extension in ['xlsx', 'xls']:
-        try:
-            from openpyxl import load_workbook
-            import tempfile
-
-            # Save to temp file (openpyxl needs a file path)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as tmp:
-                tmp.write(contents)
-                tmp_path = tmp.name
+    import_service = InvoiceImportService(db, current_user.business_id)
+    file_kind = "Excel" if file_extension in EXCEL_EXTENSIONS else "CSV"
 
-            # Load workbook and get active sheet
-            wb = load_workbook(tmp_path, read_only=True)
-            ws = wb.active
+    # An identical file that was already imported has nothing new to add
+    file_sha256 = await run_in_threadpool(hash_upload, file.file)
+    previous_import = _find_import_by_hash(db, current_user.business_id, file_sha256)
+    if previous_import and previous_import.status == ImportJobStatus.COMPLETED:
+        return InvoiceUploadResponse(
+            success=0,
+            failed=0,
+            errors=[],
+            duplicates=previous_import.rows_processed - previous_import.rows_failed,
+            already_imported=True
+        )
 
-            # Convert to list of dicts (like CSV DictReader)
-            rows = list(ws.values)
-            if not rows:
+    def run_import():
+        # Rows are parsed lazily from the spooled upload and written in batches
+        with open_upload(file.file, file_extension) as (headers, rows):
+            if not REQUIRED_FIELDS.issubset(set(headers)):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Excel file is empty"
+                    detail=f"File must contain columns: {', '.join(REQUIRED_FIELDS)}"
                 )
 
-            headers = [str(h).lower().strip() for h in rows[0]]
-            reader = [dict(zip(headers, row)) for row in rows[1:]]
+            return import_service.import_rows(rows)
 
-            # Clean up temp file
-            import os
-            os.unlink(tmp_path)
+    started_at = datetime.utcnow()
+    try:
+        # Parsing and writing are blocking, so keep them off the event loop
+        result = await run_in_threadpool(run_import)
 
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to read Excel file: {str(e)}"
+        # Record the import so the same file can be recognised next time
+        db.add(ImportJob(
+            business_id=current_user.business_id,
+            actor_id=current_user.id,
+            filename=file.filename,
+            file_extension=file_extension,
+            file_sha256=file_sha256,
+            status=ImportJobStatus.COMPLETED,
+            rows_processed=result.processed,
+            rows_failed=result.failed,
+            rows_duplicate=result.duplicates,
+            errors=result.errors,
+            started_at=started_at,
+            finished_at=datetime.utcnow()
+        ))
+
+        # Log the upload (a re-upload that only hit existing rows changed nothing)
+        if result.success:
+            audit_service.log_action(
+                action="invoices_uploaded",
+                actor_id=current_user.id,
+                payload={
+                    "success": result.success,
+                    "failed": result.failed,
+                    "duplicates": result.duplicates,
+                    "filename": file.filename
+                }
             )
-    else:
-        # CSV file
-        csv_file = io.StringIO(contents.decode('utf-8'))
-        csv_reader = csv.DictReader(csv_file)
-        headers = csv_reader.fieldnames or []
-        reader = list(csv_reader)
-
-    # Validate required fields
-    required_fields = {'client_name', 'client_email', 'amount', 'due_date'}
-    if file_extension in ['xlsx', 'xls']:
-        available_fields = set(headers) if 'headers' in locals() else set()
-    else:
-        available_fields = set(headers)
+        db.commit()
 
-    if not required_fields.issubset(available_fields):
+    except HTTPException:
+        db.rollback()
+        raise
+    except ValueError as e:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File must contain columns: {', '.join(required_fields)}"
+            detail=f"Failed to read {file_kind} file: {str(e)}"
+        )
+    except Exception as e:
+        db.rollback()
+        import traceback
+        error_detail = f"Failed to process {file_kind}: {str(e)}"
+        print(f"ERROR in upload_invoices: {error_detail}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error_detail
         )
 
-    try:
+    return InvoiceUploadResponse(
+        success=result.success,
+        failed=result.failed,
+        errors=result.errors,
+        duplicates=result.duplicates
+    )
 
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                # Parse amount
-                try:
-                    amount = Decimal(row['amount'].replace('£', '').replace(',', '').strip())
-                except (InvalidOperation, ValueError):
-                    errors.append(f"Row {row_num}: Invalid amount format")
-                    failed_count += 1
-                    continue
-
-                # Parse due_date
-                try:
-                    due_date = datetime.strptime(row['due_date'].strip(), '%Y-%m-%d').date()
-                except ValueError:
-                    try:
-                        due_date = datetime.strptime(row['due_date'].strip(), '%d/%m/%Y').date()
-                    except ValueError:
-                        errors.append(f"Row {row_num}: Invalid date format (use YYYY-MM-DD or DD/MM/YYYY)")
-                        failed_count += 1
-                        continue
-
-                client_name = row['client_name'].strip()
-                client_email = row['client_email'].strip().lower()
-
-                # Get optional invoice_number if provided
-                invoice_number = row.get('invoice_number', '').strip() if row.get('invoice_number') else None
-
-                if not client_name or not client_email:
-                    errors.append(f"Row {row_num}: Client name and email are required")
-                    failed_count += 1
-                    continue
-
-                # Find or create client
-                client = db.query(Client).filter(
-                    Client.business_id == current_user.business_id,
-                    Client.email == client_email
-                ).first()
-
-                if not client:
-                    client = Client(
-                        business_id=current_user.business_id,
-                        name=client_name,
-                        email=client_email
-                    )
-                    db.add(client)
-                    db.flush()
-
-                # Create invoice
-                invoice = Invoice(
-                    client_id=client.id,
-                    amount=amount,
-                    due_date=due_date,
-                    external_source=ExternalSource.MANUAL,
-                    status=InvoiceStatus.UNPAID
-                )
-                invoice.days_overdue = invoice.calculate_days_overdue()
-                db.add(invoice)
 
-                success_count += 1
+def _find_import_by_hash(db: Session, business_id, file_sha256: str):
+    """Most recent import of identical file content that didn't fail, if any"""
+    return db.query(ImportJob).filter(
+        ImportJob.business_id == business_id,
+        ImportJob.file_sha256 == file_sha256,
+        ImportJob.status != ImportJobStatus.FAILED
+    ).order_by(ImportJob.created_at.desc()).first()
+
+
+def _import_job_response(job: ImportJob) -> ImportJobResponse:
+    return ImportJobResponse(
+        id=job.id,
+        filename=job.filename,
+        status=job.status.value,
+        rows_processed=job.rows_processed,
+        rows_failed=job.rows_failed,
+        rows_duplicate=job.rows_duplicate,
+        rows_per_second=job.rows_per_second(),
+        errors=job.errors or [],
+        error_message=job.error_message,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        created_at=job.created_at
+    )
 
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                failed_count += 1
-                continue
 
-        db.commit()
+def _get_import_job(db: Session, job_id: str, business_id) -> ImportJob:
+    """Load an import job owned by the business, or raise 400/404"""
+    from uuid import UUID
 
-        # Log the upload
-        audit_service.log_action(
-            action="invoices_uploaded",
-            actor_id=current_user.id,
-            payload={
-                "success": success_count,
-                "failed": failed_count,
-                "filename": file.filename
-            }
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid import job ID format"
         )
 
-        return InvoiceUploadResponse(
-            success=success_count,
-            failed=failed_count,
-            errors=errors[:10]  # Limit errors to first 10
+    job = db.query(ImportJob).filter(
+        ImportJob.id == job_uuid,
+        ImportJob.business_id == business_id
+    ).first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+
+    return job
+
+
+@router.post("/imports", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stage a CSV or Excel upload and import it in the background
+
+    Uploading a file identical to one that is queued, running or already
+    imported returns that job instead of starting another.
+    """
+    from app.jobs.import_tasks import process_invoice_import
+
+    file_extension = file.filename.lower().split('.')[-1]
+    if file_extension not in ['csv', 'xlsx', 'xls']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only CSV and Excel files (.csv, .xlsx, .xls) are accepted"
         )
 
+    job_id = uuid.uuid4()
+    staged_path, file_sha256 = await run_in_threadpool(stage_upload, file.file, job_id, file_extension)
+
+    previous_import = _find_import_by_hash(db, current_user.business_id, file_sha256)
+    if previous_import:
+        os.unlink(staged_path)
+        return _import_job_response(previous_import)
+
+    job = ImportJob(
+        id=job_id,
+        business_id=current_user.business_id,
+        actor_id=current_user.id,
+        filename=file.filename,
+        file_extension=file_extension,
+        file_sha256=file_sha256,
+        staged_path=staged_path,
+        status=ImportJobStatus.QUEUED,
+        errors=[]
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    try:
+        process_invoice_import.delay(str(job.id))
     except Exception as e:
-        db.rollback()
-        import traceback
-        error_detail = f"Failed to process CSV: {str(e)}"
-        print(f"ERROR in upload_invoices: {error_detail}")
-        print(traceback.format_exc())
+        job.status = ImportJobStatus.FAILED
+        job.staged_path = None
+        job.error_message = "Could not queue import"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        os.unlink(staged_path)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=error_detail
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to queue import: {str(e)}"
+        )
+
+    return _import_job_response(job)
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the progress of a background invoice import"""
+    job = _get_import_job(db, job_id, current_user.business_id)
+    return _import_job_response(job)
+
+
+@router.get("/imports/{job_id}/events")
+async def stream_import_job_events(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream import progress as server-sent events until the job finishes"""
+    job = _get_import_job(db, job_id, current_user.business_id)
+    job_uuid = job.id
+
+    async def event_stream():
+        last_payload = None
+        while True:
+            # The request session is closed once the response starts, so
+            # each poll uses a short-lived session of its own
+            poll_db = SessionLocal()
+            try:
+                job = poll_db.query(ImportJob).filter(ImportJob.id == job_uuid).first()
+                payload = _import_job_response(job).model_dump_json()
+                finished = job.status in (ImportJobStatus.COMPLETED, ImportJobStatus.FAILED)
+            finally:
+                poll_db.close()
+
+            if payload != last_payload:
+                yield f"event: progress\ndata: {payload}\n\n"
+                last_payload = payload
+            else:
+                yield ": keep-alive\n\n"
+
+            if finished:
+                break
+
+            await asyncio.sleep(settings.IMPORT_PROGRESS_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Columns GET /invoices/ can return (the fields of InvoiceListItem)
+_INVOICE_LIST_FIELDS = {
+    "id": Invoice.id,
+    "client_id": Invoice.client_id,
+    "client_name": Client.name,
+    "client_email": Client.email,
+    "invoice_number": Invoice.invoice_number,
+    "amount": Invoice.amount,
+    "due_date": Invoice.due_date,
+    "status": Invoice.status,
+    "days_overdue": Invoice.days_overdue,
+    "created_at": Invoice.created_at,
+}
+
+
+def _encode_cursor(due_date: date, invoice_id) -> str:
+    """Opaque cursor pointing just past an invoice in (due_date, id) order"""
+    return base64.urlsafe_b64encode(f"{due_date.isoformat()}|{invoice_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, "UUID"]:
+    from uuid import UUID
+
+    try:
+        due_date, invoice_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return date.fromisoformat(due_date), UUID(invoice_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
 
 
-@router.get("/", response_model=List[InvoiceResponse])
+@router.get("/", response_model=List[InvoiceListItem], response_model_exclude_unset=True)
 async def get_invoices(
-    status_filter: str = None,
+    response: Response,
+    status_filter: Optional[str] = None,
+    min_days_overdue: Optional[int] = Query(None, ge=0),
+    max_days_overdue: Optional[int] = Query(None, ge=0),
+    client_id: Optional[str] = None,
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_INVOICE_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all invoices for the current user's business"""
-    query = db.query(
-        Invoice,
-        Client.name.label('client_name'),
-        Client.email.label('client_email')
-    ).join(Client).filter(
-        Client.business_id == current_user.business_id
+    """
+    Get invoices for the current user's business, latest due date first
+
+    Returns up to `limit` invoices; when more follow, the response carries
+    an X-Next-Cursor header to send back as `cursor`. `fields` is a
+    comma-separated subset of the invoice fields to return; each invoice
+    then has only those keys.
+    """
+    if fields:
+        selected = [f.strip() for f in fields.split(',') if f.strip()]
+        unknown = [f for f in selected if f not in _INVOICE_LIST_FIELDS]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(_INVOICE_LIST_FIELDS)}"
+            )
+    else:
+        selected = list(_INVOICE_LIST_FIELDS)
+
+    # Only the requested columns are loaded, plus the keyset columns
+    columns = [_INVOICE_LIST_FIELDS[f].label(f) for f in selected]
+    columns += [Invoice.due_date.label('_due_date'), Invoice.id.label('_id')]
+
+    query = db.query(*columns).select_from(Invoice).join(Client).filter(
+        Invoice.business_id == current_user.business_id
     )
 
     if status_filter:
-        query = query.filter(Invoice.status == status_filter)
-
-    invoices = query.order_by(Invoice.due_date.desc()).all()
-
-    return [
-        InvoiceResponse(
-            id=inv.Invoice.id,
-            client_id=inv.Invoice.client_id,
-            client_name=inv.client_name,
-            client_email=inv.client_email,
-            amount=inv.Invoice.amount,
-            due_date=inv.Invoice.due_date,
-            status=inv.Invoice.status.value,
-            days_overdue=inv.Invoice.days_overdue,
-            created_at=inv.Invoice.created_at
+        try:
+            query = query.filter(Invoice.status == InvoiceStatus(status_filter.lower()))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid status filter. Use unpaid or paid"
+            )
+
+    if min_days_overdue is not None:
+        query = query.filter(Invoice.days_overdue >= min_days_overdue)
+    if max_days_overdue is not None:
+        query = query.filter(Invoice.days_overdue <= max_days_overdue)
+    if min_amount is not None:
+        query = query.filter(Invoice.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Invoice.amount <= max_amount)
+
+    if client_id:
+        from uuid import UUID
+
+        try:
+            query = query.filter(Invoice.client_id == UUID(client_id))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid client ID format"
+            )
+
+    if cursor:
+        # Keyset: resume strictly after the last invoice of the previous page
+        query = query.filter(tuple_(Invoice.due_date, Invoice.id) < _decode_cursor(cursor))
+
+    # One extra row tells us whether another page follows
+    query = query.order_by(Invoice.due_date.desc(), Invoice.id.desc()).limit(limit + 1)
+
+    rows = query.all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1]._due_date, rows[-1]._id)
+
+    return [dict(zip(selected, row)) for row in rows]
+
+
+@router.get("/summary", response_model=ReceivablesSummaryResponse)
+async def get_receivables_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get dashboard totals for the business from its precomputed summary"""
+    summary = ReceivablesSummaryService(db).get_summary(current_user.business_id)
+
+    def bucket(prefix: str) -> SummaryBucket:
+        return SummaryBucket(
+            count=getattr(summary, f"{prefix}_count"),
+            amount=getattr(summary, f"{prefix}_amount")
+        )
+
+    return ReceivablesSummaryResponse(
+        outstanding_amount=summary.unpaid_amount,
+        unpaid_count=summary.unpaid_count,
+        paid_count=summary.paid_count,
+        paid_amount=summary.paid_amount,
+        overdue_count=summary.overdue_count,
+        overdue_amount=summary.overdue_amount,
+        average_days_overdue=(
+            summary.overdue_days_total / summary.overdue_count if summary.overdue_count else 0.0
+        ),
+        overdue_buckets={
+            "1-30": bucket("overdue_1_30"),
+            "31-60": bucket("overdue_31_60"),
+            "61-90": bucket("overdue_61_90"),
+            "90+": bucket("overdue_90_plus")
+        },
+        stages={stage: bucket(f"stage_{stage}") for stage in range(1, 5)},
+        updated_at=summary.updated_at
+    )
+
+
+@router.get("/export")
+async def export_invoices(
+    format: str = "ndjson",
+    status_filter: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export every invoice for the business as NDJSON or CSV
+
+    The file is streamed from a server-side cursor, so large ledgers start
+    downloading straight away and are never held in memory.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Use {' or '.join(EXPORT_FORMATS)}"
         )
-        for inv in invoices
-    ]
+
+    statement = select(
+        *[column.label(name) for name, column in _INVOICE_LIST_FIELDS.items()]
+    ).select_from(Invoice).join(Client).where(
+        Invoice.business_id == current_user.business_id
+    )
+
+    if status_filter:
+        try:
+            statement = statement.where(Invoice.status == InvoiceStatus(status_filter.lower()))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid status filter. Use unpaid or paid"
+            )
+
+    statement = statement.order_by(Invoice.due_date.desc(), Invoice.id.desc())
+    filename = f"invoices-{date.today().isoformat()}.{format}"
+
+    return StreamingResponse(
+        stream_export(statement, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.post("/manual", status_code=status.HTTP_201_CREATED)
@@ -279,6 +565,8 @@ async def add_invoice_manually(
     # Create invoice
     invoice = Invoice(
         client_id=client.id,
+        business_id=current_user.business_id,
+        invoice_number=invoice_data.invoice_number.strip() if invoice_data.invoice_number else None,
         amount=amount,
         due_date=due_date,
         external_source=ExternalSource.MANUAL,
@@ -286,8 +574,10 @@ async def add_invoice_manually(
     )
     invoice.days_overdue = invoice.calculate_days_overdue()
     db.add(invoice)
-    db.commit()
-    db.refresh(invoice)
+    ReceivablesSummaryService(db).invoice_changed(
+        current_user.business_id, None, invoice_state(invoice)
+    )
+    db.flush()
 
     # Log the action
     audit_service.log_action(
@@ -299,6 +589,7 @@ async def add_invoice_manually(
             "amount": str(amount)
         }
     )
+    db.commit()
 
     return {
         "message": "Invoice created successfully",
@@ -335,9 +626,12 @@ async def mark_invoice_paid(
             detail="Invoice not found"
         )
     
+    before = invoice_state(invoice)
     invoice.status = InvoiceStatus.PAID
     invoice.days_overdue = 0
-    db.commit()
+    ReceivablesSummaryService(db).invoice_changed(
+        current_user.business_id, before, invoice_state(invoice)
+    )
     
     # Log the action
     audit_service = AuditService(db)
@@ -346,6 +640,7 @@ async def mark_invoice_paid(
         actor_id=current_user.id,
         payload={"invoice_id": str(invoice.id)}
     )
+    db.commit()
     
     return {"message": "Invoice marked as paid"}
 
@@ -380,6 +675,8 @@ async def update_invoice(
             detail="Invoice not found"
         )
 
+    before = invoice_state(invoice)
+
     # Get the associated client
     client = db.query(Client).filter(Client.id == invoice.client_id).first()
 
@@ -431,7 +728,9 @@ async def update_invoice(
                 detail="Invalid date format. Use YYYY-MM-DD"
             )
 
-    db.commit()
+    ReceivablesSummaryService(db).invoice_changed(
+        current_user.business_id, before, invoice_state(invoice)
+    )
 
     # Log the action
     audit_service = AuditService(db)
@@ -440,6 +739,7 @@ async def update_invoice(
         actor_id=current_user.id,
         payload={"invoice_id": str(invoice.id)}
     )
+    db.commit()
 
     return {"message": "Invoice updated successfully"}
 
@@ -474,10 +774,10 @@ async def delete_invoice(
         )
     
     # Delete related reminder drafts first
-    from app.models.reminder_draft import ReminderDraft
+    from app.models.reminder import ReminderDraft
     db.query(ReminderDraft).filter(ReminderDraft.invoice_id == invoice_uuid).delete()
     
-    # Log before deletion
+    # Log before deletion; the entry commits with it
     audit_service = AuditService(db)
     audit_service.log_action(
         action="invoice_deleted",
@@ -485,6 +785,9 @@ async def delete_invoice(
         payload={"invoice_id": str(invoice.id)}
     )
     
+    ReceivablesSummaryService(db).invoice_changed(
+        current_user.business_id, invoice_state(invoice), None
+    )
     db.delete(invoice)
     db.commit()
     
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import select
+from typing import List, Optional
 from datetime import datetime, timedelta
+import json
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user, require_active_subscription
 from app.models.user import User
 from app.models.client import Client
@@ -14,11 +18,16 @@ from app.schemas.reminder import (
     ReminderDraftResponse,
     EditReminderRequest,
     SnoozeReminderRequest,
+    SendRemindersRequest,
+    SendRemindersResponse,
+    SkippedDraft,
     ReminderSettingsResponse,
     UpdateReminderSettingsRequest
 )
 from app.services.audit_service import AuditService
-from app.services.email_service import EmailService
+from app.services.outbound_mail_service import OutboundMailService
+from app.services.export_service import stream_export, EXPORT_FORMATS
+from app.services.receivables_summary_service import ReceivablesSummaryService
 from app.services.draft_generation_service import get_draft_generation_service
 
 router = APIRouter(prefix="/reminders", tags=["reminders"])
@@ -64,6 +73,51 @@ async def get_drafts(
     ]
 
 
+@router.get("/drafts/export")
+async def export_drafts(
+    format: str = "ndjson",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Export every reminder draft for the business as NDJSON or CSV, streamed"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Use {' or '.join(EXPORT_FORMATS)}"
+        )
+
+    statement = select(
+        ReminderDraft.id.label('id'),
+        ReminderDraft.invoice_id.label('invoice_id'),
+        Client.name.label('client_name'),
+        Client.email.label('client_email'),
+        Invoice.amount.label('amount'),
+        Invoice.days_overdue.label('days_overdue'),
+        ReminderDraft.tone.label('tone'),
+        ReminderDraft.escalation_level.label('escalation_level'),
+        ReminderDraft.subject.label('subject'),
+        ReminderDraft.body_text.label('body_text'),
+        ReminderDraft.status.label('status'),
+        ReminderDraft.approved.label('approved'),
+        ReminderDraft.sent_at.label('sent_at'),
+        ReminderDraft.snoozed_until.label('snoozed_until'),
+        ReminderDraft.created_at.label('created_at')
+    ).select_from(ReminderDraft)\
+     .join(Invoice, ReminderDraft.invoice_id == Invoice.id)\
+     .join(Client, Invoice.client_id == Client.id)\
+     .where(
+        Client.business_id == current_user.business_id
+    ).order_by(ReminderDraft.created_at.desc(), ReminderDraft.id.desc())
+
+    filename = f"reminder-drafts-{datetime.utcnow().date().isoformat()}.{format}"
+
+    return StreamingResponse(
+        stream_export(statement, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.post("/{draft_id}/approve")
 async def approve_draft(
     draft_id: str,
@@ -89,7 +143,6 @@ async def approve_draft(
         )
 
     draft.approved = True
-    db.commit()
 
     # Log approval
     audit_service = AuditService(db)
@@ -101,6 +154,7 @@ async def approve_draft(
             "invoice_id": str(draft.invoice_id)
         }
     )
+    db.commit()
 
     return {"message": "Draft approved"}
 
@@ -133,7 +187,6 @@ async def edit_draft(
     original_text = draft.body_text
     draft.body_text = edit_data.body_text
     draft.approved = False  # Require re-approval after edit
-    db.commit()
 
     # Log edit
     audit_service = AuditService(db)
@@ -146,6 +199,7 @@ async def edit_draft(
             "new_text": edit_data.body_text
         }
     )
+    db.commit()
 
     return {"message": "Draft updated"}
 
@@ -175,14 +229,88 @@ async def snooze_draft(
     return {"message": f"Draft snoozed for {snooze_data.days} days"}
 
 
-@router.post("/{draft_id}/send")
+def _send_skip_reason(draft: ReminderDraft) -> Optional[str]:
+    """Why a draft can't be queued for sending, or None if it can"""
+    if not draft.approved:
+        return "not_approved"
+    if draft.sent_at or draft.status == ReminderStatus.SENT:
+        return "already_sent"
+    if draft.status == ReminderStatus.QUEUED:
+        return "already_queued"
+    return None
+
+
+def _queue_drafts(db: Session, drafts: List[ReminderDraft], current_user: User) -> int:
+    """Hand drafts to the outbound mail queue, as an HTTP error if that fails"""
+    try:
+        return OutboundMailService(db).enqueue(drafts, current_user.id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to queue email: {str(e)}"
+        )
+
+
+@router.post("/send", response_model=SendRemindersResponse, status_code=status.HTTP_202_ACCEPTED)
+async def send_reminders(
+    request: SendRemindersRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_active_subscription)
+):
+    """
+    Queue many approved reminder drafts for sending in one call
+
+    Drafts that can't be sent are skipped with a reason rather than failing
+    the request. Sending happens in the background; each draft's status
+    moves from queued to sent or failed.
+    """
+    draft_ids = list(dict.fromkeys(request.draft_ids))
+    drafts = db.query(ReminderDraft).join(Invoice).join(Client).options(
+        contains_eager(ReminderDraft.invoice).contains_eager(Invoice.client)
+    ).filter(
+        ReminderDraft.id.in_(draft_ids),
+        Client.business_id == current_user.business_id
+    ).all()
+    found = {draft.id: draft for draft in drafts}
+
+    sendable = []
+    skipped = []
+    for draft_id in draft_ids:
+        draft = found.get(draft_id)
+        reason = _send_skip_reason(draft) if draft else "not_found"
+        if reason:
+            skipped.append(SkippedDraft(draft_id=draft_id, reason=reason))
+        else:
+            sendable.append(draft)
+
+    sendable_ids = [str(draft.id) for draft in sendable]
+    queued = _queue_drafts(db, sendable, current_user)
+
+    if queued:
+        audit_service = AuditService(db)
+        audit_service.log_action(
+            action="drafts_queued",
+            actor_id=current_user.id,
+            payload={
+                "count": queued,
+                "draft_ids": sendable_ids
+            }
+        )
+        db.commit()
+
+    return SendRemindersResponse(queued=queued, skipped=skipped)
+
+
+@router.post("/{draft_id}/send", status_code=status.HTTP_202_ACCEPTED)
 async def send_reminder(
     draft_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_active_subscription)
 ):
-    """Send an approved reminder draft"""
-    draft = db.query(ReminderDraft).join(Invoice).join(Client).filter(
+    """Queue an approved reminder draft for sending"""
+    draft = db.query(ReminderDraft).join(Invoice).join(Client).options(
+        contains_eager(ReminderDraft.invoice).contains_eager(Invoice.client)
+    ).filter(
         ReminderDraft.id == draft_id,
         Client.business_id == current_user.business_id
     ).first()
@@ -193,54 +321,33 @@ async def send_reminder(
             detail="Draft not found"
         )
 
-    if not draft.approved:
+    reason = _send_skip_reason(draft)
+    if reason:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Draft must be approved before sending"
+            detail={
+                "not_approved": "Draft must be approved before sending",
+                "already_sent": "Draft already sent",
+                "already_queued": "Draft already queued for sending"
+            }[reason]
         )
 
-    if draft.sent_at:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Draft already sent"
-        )
-
-    # Get invoice and client details
-    invoice = db.query(Invoice).filter(Invoice.id == draft.invoice_id).first()
-    client = db.query(Client).filter(Client.id == invoice.client_id).first()
-
-    # Send email
-    email_service = EmailService()
-    try:
-        email_service.send_reminder(
-            to_email=client.email,
-            from_user=current_user,
-            body=draft.body_text
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send email: {str(e)}"
-        )
-
-    # Mark as sent
-    draft.sent_at = datetime.utcnow()
-    db.commit()
+    payload = {
+        "draft_id": str(draft.id),
+        "invoice_id": str(draft.invoice_id)
+    }
+    _queue_drafts(db, [draft], current_user)
 
-    # Log send
+    # Log the request; the send itself is logged when it goes out
     audit_service = AuditService(db)
     audit_service.log_action(
-        action="draft_sent",
+        action="draft_queued",
         actor_id=current_user.id,
-        payload={
-            "draft_id": str(draft.id),
-            "invoice_id": str(invoice.id),
-            "client_email": client.email,
-            "amount": str(invoice.amount)
-        }
+        payload=payload
     )
+    db.commit()
 
-    return {"message": "Reminder sent successfully"}
+    return {"message": "Reminder queued for sending"}
 
 
 @router.post("/{draft_id}/mark-sent")
@@ -271,7 +378,6 @@ async def mark_draft_as_sent(
     draft.status = ReminderStatus.SENT
     draft.sent_at = datetime.utcnow()
     draft.delivery_status = "manually_sent"
-    db.commit()
 
     # Log the action
     audit_service = AuditService(db)
@@ -283,6 +389,7 @@ async def mark_draft_as_sent(
             "invoice_id": str(draft.invoice_id)
         }
     )
+    db.commit()
 
     return {"message": "Draft marked as sent"}
 
@@ -389,8 +496,9 @@ async def update_reminder_settings(
     settings.stage_4_days = settings_data.stage_4_days
     settings.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(settings)
+    # New thresholds move invoices between escalation stages
+    db.flush()
+    ReceivablesSummaryService(db).refresh(current_user.business_id)
 
     # Log settings update
     audit_service = AuditService(db)
@@ -408,6 +516,8 @@ async def update_reminder_settings(
             }
         }
     )
+    db.commit()
+    db.refresh(settings)
 
     return ReminderSettingsResponse(
         id=settings.id,
@@ -431,7 +541,9 @@ async def generate_drafts(
     """Manually trigger draft generation for overdue invoices"""
     draft_service = get_draft_generation_service(db)
 
-    drafts = draft_service.generate_drafts_for_overdue_invoices(
+    # Generation blocks on the model, so keep it off the event loop
+    drafts = await run_in_threadpool(
+        draft_service.generate_drafts_for_overdue_invoices,
         business_id=current_user.business_id,
         max_drafts=50,
         manual_trigger=True  # Manual button click, bypass auto_send check
@@ -447,8 +559,84 @@ async def generate_drafts(
             "draft_ids": [str(d.id) for d in drafts]
         }
     )
+    db.commit()
 
     return {
         "message": f"Generated {len(drafts)} reminder drafts",
         "count": len(drafts)
     }
+
+
+@router.post("/generate-drafts/stream")
+async def stream_generated_drafts(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generate drafts like /generate-drafts, streaming each as a server-sent
+    event as soon as it's ready
+
+    Events: `draft` for each committed draft (a ReminderDraftResponse),
+    then `done` with the count, or `error` if generation stopped early.
+    """
+    business_id = current_user.business_id
+    actor_id = current_user.id
+
+    def event_stream():
+        # The request session is closed once the response starts, so
+        # generation uses a session of its own. Drafts are committed one at
+        # a time, and kept loaded so they can be sent without re-reading.
+        db = SessionLocal(expire_on_commit=False)
+        drafts = []
+        try:
+            draft_service = get_draft_generation_service(db)
+            for draft in draft_service.iter_drafts_for_overdue_invoices(
+                business_id=business_id,
+                max_drafts=50,
+                manual_trigger=True  # Manual button click, bypass auto_send check
+            ):
+                db.commit()
+                drafts.append(draft)
+
+                invoice = draft.invoice
+                payload = ReminderDraftResponse(
+                    id=draft.id,
+                    invoice_id=draft.invoice_id,
+                    client_name=invoice.client.name,
+                    client_email=invoice.client.email,
+                    amount=invoice.amount,
+                    days_overdue=invoice.days_overdue,
+                    tone=draft.tone.value,
+                    escalation_level=draft.escalation_level,
+                    body_text=draft.body_text,
+                    status=draft.status.value,
+                    approved=draft.approved,
+                    sent_at=draft.sent_at,
+                    snoozed_until=draft.snoozed_until,
+                    created_at=draft.created_at
+                ).model_dump_json()
+                yield f"event: draft\ndata: {payload}\n\n"
+
+            yield f"event: done\ndata: {json.dumps({'count': len(drafts)})}\n\n"
+        except Exception as e:
+            db.rollback()
+            print(f"Streaming draft generation failed for business {business_id}: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Draft generation failed', 'count': len(drafts)})}\n\n"
+        finally:
+            # Also reached if the client disconnects part way through
+            if drafts:
+                AuditService(db).log_action(
+                    action="drafts_generated",
+                    actor_id=actor_id,
+                    payload={
+                        "count": len(drafts),
+                        "draft_ids": [str(d.id) for d in drafts]
+                    }
+                )
+                db.commit()
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import secrets
 
 
@@ -19,9 +19,62 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    OPENAI_BASE_URL: Optional[str] = None  # e.g. a local stub model server
+
+    # Model backend: live, record (live + save replies), replay or stub (offline)
+    AI_BACKEND: str = "live"
+    AI_REPLAY_FILE: str = "ai_replay.jsonl"
+    AI_STUB_LATENCY_MS: float = 0.0
+    AI_STUB_JITTER_MS: float = 0.0
+    AI_STUB_TOKENS_PER_SECOND: float = 0.0  # Adds generation time; 0 disables
+    AI_STUB_ERROR_RATE: float = 0.0
+
+    # Draft generation (calls to the model are made concurrently)
+    AI_MAX_CONCURRENCY: int = 8  # Requests in flight at once
+    AI_REQUESTS_PER_SECOND: float = 5.0  # Sustained request rate, per process
+    AI_BURST: int = 10  # Requests allowed at once before the rate applies
+    AI_REQUEST_TIMEOUT_SECONDS: float = 30.0  # Per attempt
+
+    # Model call resilience (see ResilientBackend)
+    AI_CALL_DEADLINE_SECONDS: float = 60.0  # Per call, across retries
+    AI_MAX_RETRIES: int = 3
+    AI_RETRY_BASE_SECONDS: float = 0.5  # Jittered exponential backoff
+    AI_RETRY_MAX_SECONDS: float = 8.0
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0  # How long to fail fast before a trial call
+    AI_HEDGE_ENABLED: bool = False  # Duplicate slow calls, take the first answer
+    AI_HEDGE_AFTER_SECONDS: float = 0.0  # 0 hedges after the observed p95 latency
+
+    AI_BATCH_MODE_ENABLED: bool = True  # Several invoices per model request
+    AI_BATCH_SIZE: int = 8  # Invoices per batched request
+
+    # Cache of generated emails, keyed by a hash of the prompt inputs
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GENERATION_CACHE_LOCAL_MAX_ENTRIES: int = 2048  # In-process LRU in front of Redis
+
+    # Nightly draft generation, fanned out across Celery workers by business
+    DRAFT_GENERATION_MAX_PER_BUSINESS: int = 200  # Drafts per business per run
+    DRAFT_GENERATION_BUSINESSES_PER_TASK: int = 1  # Raise to cut task overhead for many small tenants
+    DRAFT_GENERATION_LOCK_SECONDS: int = 1800  # Per-business lock, expires if a worker dies
+
+    # Template mode: routine reminders are rendered from stored AI-written templates
+    REMINDER_TEMPLATE_MODE_ENABLED: bool = True
+    REMINDER_TEMPLATE_MAX_LEVEL: int = 2  # Escalation levels up to this use templates
+    REMINDER_TEMPLATE_VARIANTS: int = 3  # Templates generated per business, tone and level
 
     # Anthropic (Claude)
     ANTHROPIC_API_KEY: str
+    ANTHROPIC_MODEL: str = "claude-3-5-haiku-20241022"
+
+    # Provider routing: "provider" or "provider:model" entries. Calls go to
+    # the lowest-latency healthy provider and fail over to the others.
+    AI_PROVIDERS: List[str] = ["openai", "anthropic"]
+    # Escalation level -> provider tried first for that stage, e.g.
+    # {"1": "openai:gpt-4o-mini", "4": "anthropic:claude-3-7-sonnet-20250219"}
+    AI_STAGE_ROUTES: Dict[int, str] = {}
+    AI_ROUTER_EWMA_ALPHA: float = 0.2  # Weight of the newest latency sample
+    AI_ROUTER_EXPLORE_RATE: float = 0.05  # Calls sent elsewhere to keep latencies fresh
 
     # Stripe
     STRIPE_SECRET_KEY: str
@@ -38,6 +91,40 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    SMTP_POOL_SIZE: int = 4  # Sessions kept open per process
+    SMTP_POOL_IDLE_SECONDS: float = 60.0  # Close sessions unused for this long
+    SMTP_POOL_NOOP_AFTER_SECONDS: float = 5.0  # Check with NOOP before reusing a session idle this long
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Then start a new session
+
+    # Outbound mail queue, drained by the mail workers
+    MAIL_QUEUE: str = "mail"
+    MAIL_BATCH_SIZE: int = 20  # Drafts per delivery task, all to one recipient domain
+    MAIL_DOMAIN_RATE_PER_MINUTE: int = 60  # Per recipient domain, across every worker
+    MAIL_DOMAIN_RATE_LIMITS: Dict[str, int] = {}  # Per-domain overrides, e.g. {"gmail.com": 120}
+    MAIL_MAX_ATTEMPTS: int = 5  # Before a transient failure marks the draft failed
+    MAIL_RETRY_BASE_SECONDS: float = 30.0  # Doubles with each attempt
+    MAIL_SENDING_TIMEOUT_SECONDS: float = 900.0  # A draft "sending" this long lost its worker; marked failed
+    AUTO_SEND_BATCH_SIZE: int = 500  # Scheduled drafts claimed per dispatcher query
+    AUTO_SEND_MAX_PER_RUN: int = 20000  # Per dispatcher run (runs every minute)
+
+    # Audit log: "transactional" writes each entry in the caller's transaction;
+    # "write_behind" buffers committed entries and inserts them in bulk
+    AUDIT_LOG_MODE: str = "transactional"
+    AUDIT_FLUSH_MAX_ENTRIES: int = 500  # Flush once this many are waiting
+    AUDIT_FLUSH_SECONDS: float = 1.0  # ...or the oldest has waited this long
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3  # Monthly partitions kept ready past the current one
+    AUDIT_RETENTION_MONTHS: int = 24  # Older months are moved to the archive schema (0 keeps all)
+    AUDIT_ARCHIVE_SCHEMA: str = "audit_archive"
+
+    # Invoice imports (must be a volume shared by the API and Celery workers)
+    IMPORT_STAGING_DIR: str = "/tmp/payflow-imports"
+    IMPORT_PROGRESS_INTERVAL_SECONDS: float = 1.0
+    IMPORT_STALE_SECONDS: float = 1800.0  # A queued/running job with no progress this long lost its worker; marked failed
+
+    # Daily days_overdue recomputation
+    DAYS_OVERDUE_CHUNK_SIZE: int = 5000  # Invoices updated per transaction
 
     # App
     ENVIRONMENT: str = "development"
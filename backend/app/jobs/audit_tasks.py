@@ -0,0 +1,33 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.audit_partition_service import AuditPartitionService
+
+
+@shared_task(name='app.jobs.audit_tasks.maintain_audit_partitions')
+def maintain_audit_partitions():
+    """
+    Create upcoming audit_logs partitions and archive expired ones (runs daily)
+
+    Partitions are created AUDIT_PARTITION_MONTHS_AHEAD months ahead; months
+    older than AUDIT_RETENTION_MONTHS are moved to AUDIT_ARCHIVE_SCHEMA.
+    """
+    db: Session = SessionLocal()
+    try:
+        service = AuditPartitionService(db)
+        created = service.ensure_partitions(settings.AUDIT_PARTITION_MONTHS_AHEAD)
+
+        archived = []
+        if settings.AUDIT_RETENTION_MONTHS > 0:
+            archived = service.archive_partitions(
+                settings.AUDIT_RETENTION_MONTHS,
+                settings.AUDIT_ARCHIVE_SCHEMA
+            )
+
+        if created or archived:
+            print(f"maintain_audit_partitions: created {created or 'none'}, archived {archived or 'none'}")
+        return {"created": created, "archived": archived}
+    finally:
+        db.close()
@@ -1,19 +1,30 @@
 from celery import Celery
+from celery.signals import worker_process_shutdown
 from app.core.config import settings
 
 celery_app = Celery(
     "payflow",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=['app.jobs.reminder_tasks']
+    include=['app.jobs.reminder_tasks', 'app.jobs.import_tasks', 'app.jobs.mail_tasks', 'app.jobs.audit_tasks']
 )
 
+# shared_task looks up the current app per thread, and API requests run in
+# worker threads; without this, tasks queued there would go through Celery's
+# unconfigured fallback app instead of this broker and these routes
+celery_app.set_default()
+
 celery_app.conf.update(
     task_serializer='json',
     accept_content=['json'],
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    # Email delivery has its own queue and workers, so a backlog of sends
+    # doesn't hold up imports and draft generation (or the other way round)
+    task_routes={
+        'app.jobs.mail_tasks.*': {'queue': settings.MAIL_QUEUE},
+    },
 )
 
 # Schedule daily reminder generation at 9 AM UTC
@@ -26,4 +37,27 @@ celery_app.conf.beat_schedule = {
         'task': 'app.jobs.reminder_tasks.update_days_overdue',
         'schedule': 86400.0,
     },
+    'dispatch-scheduled-reminders': {
+        'task': 'app.jobs.mail_tasks.dispatch_scheduled_reminders',
+        'schedule': 60.0,
+    },
+    'fail-stale-reminder-sends': {
+        'task': 'app.jobs.mail_tasks.fail_stale_sends',
+        'schedule': 300.0,
+    },
+    'fail-stale-invoice-imports': {
+        'task': 'app.jobs.import_tasks.fail_stale_imports',
+        'schedule': 300.0,
+    },
+    'maintain-audit-partitions-daily': {
+        'task': 'app.jobs.audit_tasks.maintain_audit_partitions',
+        'schedule': 86400.0,
+    },
 }
+
+
+@worker_process_shutdown.connect
+def flush_audit_log(**kwargs):
+    # Write-behind audit entries still buffered in this worker process
+    from app.services.audit_service import flush_audit_buffer
+    flush_audit_buffer()
@@ -0,0 +1,139 @@
+from celery import shared_task
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import os
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.services.audit_service import AuditService
+from app.services.invoice_import_service import (
+    InvoiceImportService,
+    ImportResult,
+    open_upload,
+    REQUIRED_FIELDS
+)
+
+
+@shared_task(name='app.jobs.import_tasks.process_invoice_import')
+def process_invoice_import(job_id: str):
+    """
+    Ingest a staged invoice upload in the background
+
+    Each batch is committed together with the job's progress counters, so
+    GET /invoices/imports/{id} reports rows as they become durable.
+    """
+    db: Session = SessionLocal()
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job or job.status != ImportJobStatus.QUEUED:
+            return {"job_id": job_id, "skipped": True}
+
+        staged_path = job.staged_path
+        job.status = ImportJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.progress_at = job.started_at
+        db.commit()
+
+        def record_progress(result: ImportResult):
+            job.progress_at = datetime.utcnow()
+            job.rows_processed = result.processed
+            job.rows_failed = result.failed
+            job.rows_duplicate = result.duplicates
+            job.errors = list(result.errors)
+            db.commit()
+
+        try:
+            with open(staged_path, 'rb') as staged:
+                with open_upload(staged, job.file_extension) as (headers, rows):
+                    if not REQUIRED_FIELDS.issubset(set(headers)):
+                        raise ValueError(f"File must contain columns: {', '.join(REQUIRED_FIELDS)}")
+
+                    import_service = InvoiceImportService(db, job.business_id)
+                    result = import_service.import_rows(rows, on_batch=record_progress)
+
+        except Exception as e:
+            db.rollback()
+            job.status = ImportJobStatus.FAILED
+            job.staged_path = None
+            job.error_message = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            print(f"Invoice import {job_id} failed: {e}")
+            return {"job_id": job_id, "status": job.status.value}
+
+        finally:
+            if os.path.exists(staged_path):
+                os.unlink(staged_path)
+
+        job.status = ImportJobStatus.COMPLETED
+        job.staged_path = None
+        job.finished_at = datetime.utcnow()
+
+        # Log the upload (a re-upload that only hit existing rows changed nothing)
+        if result.success:
+            audit_service = AuditService(db)
+            audit_service.log_action(
+                action="invoices_uploaded",
+                actor_id=job.actor_id,
+                payload={
+                    "success": result.success,
+                    "failed": result.failed,
+                    "duplicates": result.duplicates,
+                    "filename": job.filename,
+                    "import_job_id": str(job.id)
+                }
+            )
+        db.commit()
+
+        return {
+            "job_id": job_id,
+            "status": job.status.value,
+            "success": result.success,
+            "failed": result.failed,
+            "duplicates": result.duplicates
+        }
+
+    finally:
+        db.close()
+
+
+@shared_task(name='app.jobs.import_tasks.fail_stale_imports')
+def fail_stale_imports():
+    """
+    Fail import jobs whose worker died or whose task was lost (runs every
+    five minutes)
+
+    A job still queued, or running without committing a batch, after
+    IMPORT_STALE_SECONDS is marked failed and its staged file removed, so
+    the same file can be uploaded again. Rows from batches it already
+    committed stay imported; a re-upload skips them as duplicates.
+    """
+    db: Session = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.IMPORT_STALE_SECONDS)
+        stale = db.query(ImportJob).filter(
+            ImportJob.status.in_([ImportJobStatus.QUEUED, ImportJobStatus.RUNNING]),
+            func.coalesce(ImportJob.progress_at, ImportJob.created_at) < cutoff
+        ).with_for_update(skip_locked=True).all()
+
+        staged_paths = []
+        for job in stale:
+            if job.staged_path:
+                staged_paths.append(job.staged_path)
+            job.status = ImportJobStatus.FAILED
+            job.staged_path = None
+            job.error_message = "Import was interrupted; upload the file again to finish it"
+            job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+    for staged_path in staged_paths:
+        if os.path.exists(staged_path):
+            os.unlink(staged_path)
+
+    if stale:
+        print(f"fail_stale_imports: marked {len(stale)} interrupted import jobs failed")
+    return {"failed": len(stale)}
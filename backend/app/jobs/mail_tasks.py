@@ -0,0 +1,92 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.outbound_mail_service import OutboundMailService, create_domain_rate_limiter
+
+
+@shared_task(name='app.jobs.mail_tasks.send_reminder_batch', acks_late=True)
+def send_reminder_batch(draft_ids: List[str], actor_id: Optional[str], attempt: int = 0):
+    """
+    Deliver a batch of queued reminder drafts (runs on the mail workers)
+
+    Drafts over their domain's rate limit are queued again for the next
+    window; transient SMTP failures are retried with exponential backoff
+    until MAIL_MAX_ATTEMPTS.
+    """
+    db: Session = SessionLocal()
+    try:
+        service = OutboundMailService(db, rate_limiter=create_domain_rate_limiter())
+        result = service.deliver(draft_ids, actor_id, attempt)
+    finally:
+        db.close()
+
+    if result.deferred:
+        send_reminder_batch.apply_async(
+            (result.deferred, actor_id, attempt),
+            countdown=result.deferred_seconds
+        )
+    if result.retry:
+        send_reminder_batch.apply_async(
+            (result.retry, actor_id, attempt + 1),
+            countdown=settings.MAIL_RETRY_BASE_SECONDS * 2 ** attempt
+        )
+
+    return {
+        "sent": result.sent,
+        "failed": result.failed,
+        "skipped": result.skipped,
+        "retrying": len(result.retry),
+        "deferred": len(result.deferred)
+    }
+
+
+@shared_task(name='app.jobs.mail_tasks.dispatch_scheduled_reminders')
+def dispatch_scheduled_reminders():
+    """
+    Queue scheduled drafts whose auto_send_at has passed (runs every minute)
+
+    Claims due drafts a batch at a time until none are left, handing each
+    batch to the mail workers. Overlapping runs claim disjoint batches.
+    """
+    db: Session = SessionLocal()
+    start = time.perf_counter()
+    queued = 0
+    batches = 0
+    try:
+        service = OutboundMailService(db)
+        while queued < settings.AUTO_SEND_MAX_PER_RUN:
+            claimed = service.dispatch_scheduled(
+                min(settings.AUTO_SEND_BATCH_SIZE, settings.AUTO_SEND_MAX_PER_RUN - queued)
+            )
+            if not claimed:
+                break
+            queued += claimed
+            batches += 1
+    finally:
+        db.close()
+
+    if queued:
+        print(f"dispatch_scheduled_reminders: queued {queued} drafts in {batches} batches, "
+              f"{time.perf_counter() - start:.2f}s")
+    return {"queued": queued, "batches": batches}
+
+
+@shared_task(name='app.jobs.mail_tasks.fail_stale_sends')
+def fail_stale_sends():
+    """
+    Fail drafts left "sending" by a mail worker that died mid-batch (runs
+    every five minutes)
+    """
+    db: Session = SessionLocal()
+    try:
+        failed = OutboundMailService(db).fail_stale_sends(settings.MAIL_SENDING_TIMEOUT_SECONDS)
+    finally:
+        db.close()
+
+    if failed:
+        print(f"fail_stale_sends: marked {failed} interrupted drafts failed")
+    return {"failed": failed}
@@ -1,12 +1,17 @@
-from celery import shared_task
+from celery import chord, group, shared_task
 from sqlalchemy.orm import Session
-from datetime import datetime, date
+from typing import List
+import time
+
+import redis
+
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.invoice import Invoice, InvoiceStatus
-from app.models.client import Client, SensitivityLevel
-from app.models.reminder import ReminderDraft, ReminderTone
-from app.services.ai_service import AIService
-from app.services.audit_service import AuditService
+from app.models.settings import ReminderSettings
+from app.services.ai_service import get_ai_service
+from app.services.days_overdue_service import DaysOverdueService
+from app.services.draft_generation_service import DraftGenerationService
+from app.services.receivables_summary_service import ReceivablesSummaryService
 
 
 @shared_task(name='app.jobs.reminder_tasks.update_days_overdue')
@@ -14,15 +19,25 @@ def update_days_overdue():
     """Update days_overdue for all unpaid invoices (runs daily)"""
     db: Session = SessionLocal()
     try:
-        unpaid_invoices = db.query(Invoice).filter(
-            Invoice.status == InvoiceStatus.UNPAID
-        ).all()
-
-        for invoice in unpaid_invoices:
-            invoice.days_overdue = invoice.calculate_days_overdue()
-
-        db.commit()
-        return {"updated": len(unpaid_invoices)}
+        run = DaysOverdueService(db).recalculate()
+
+        # Every unpaid invoice has aged a day, so rebuild the dashboard
+        # totals, one business per transaction
+        summary_service = ReceivablesSummaryService(db)
+        for business_id in summary_service.business_ids():
+            summary_service.refresh(business_id)
+            db.commit()
+
+        print(
+            f"update_days_overdue: {run.updated} of {run.scanned} unpaid invoices changed "
+            f"in {run.chunks} chunks, {run.duration_seconds:.2f}s"
+        )
+        return {
+            "updated": run.updated,
+            "scanned": run.scanned,
+            "chunks": run.chunks,
+            "duration_seconds": round(run.duration_seconds, 3)
+        }
     finally:
         db.close()
 
@@ -30,81 +45,138 @@ def update_days_overdue():
 @shared_task(name='app.jobs.reminder_tasks.generate_reminder_drafts')
 def generate_reminder_drafts():
     """
-    Generate reminder drafts for eligible invoices (runs daily)
-
-    Eligibility criteria:
-    - Invoice is unpaid
-    - Days overdue >= 7
-    - Client is not VIP
-    - Client has reminders enabled
-    - No pending draft already exists
+    Start the nightly draft generation run (runs daily)
+
+    Fans out one task per chunk of businesses with auto-send enabled, so
+    the run spreads across every available worker. A chord collects their
+    results into a single summary once all of them have finished.
     """
     db: Session = SessionLocal()
-    ai_service = AIService()
-
     try:
-        # Find eligible invoices
-        eligible_invoices = db.query(Invoice).join(Client).filter(
-            Invoice.status == InvoiceStatus.UNPAID,
-            Invoice.days_overdue >= 7,
-            Client.sensitivity_level != SensitivityLevel.VIP,
-            Client.reminders_disabled == False
-        ).all()
-
-        generated_count = 0
-
-        for invoice in eligible_invoices:
-            # Check if already has a pending draft
-            existing_draft = db.query(ReminderDraft).filter(
-                ReminderDraft.invoice_id == invoice.id,
-                ReminderDraft.approved == False,
-                ReminderDraft.sent_at.is_(None)
-            ).first()
-
-            if existing_draft:
-                continue
-
-            # Count previous reminders
-            previous_reminders = db.query(ReminderDraft).filter(
-                ReminderDraft.invoice_id == invoice.id,
-                ReminderDraft.sent_at.isnot(None)
-            ).count()
-
-            # Determine tone based on days overdue
-            if invoice.days_overdue >= 30:
-                tone = ReminderTone.FIRM
-            elif invoice.days_overdue >= 14:
-                tone = ReminderTone.NEUTRAL
-            else:
-                tone = ReminderTone.FRIENDLY
+        business_ids = [
+            str(business_id) for (business_id,) in db.query(ReminderSettings.business_id).filter(
+                ReminderSettings.auto_send_enabled == True
+            ).order_by(ReminderSettings.business_id).all()
+        ]
+    finally:
+        db.close()
+
+    if not business_ids:
+        return {"businesses": 0, "tasks": 0}
+
+    size = max(1, settings.DRAFT_GENERATION_BUSINESSES_PER_TASK)
+    chunks = [business_ids[i:i + size] for i in range(0, len(business_ids), size)]
+
+    result = chord(
+        group(generate_business_drafts.s(chunk) for chunk in chunks)
+    )(summarise_draft_generation.s(time.time()))
+
+    print(f"generate_reminder_drafts: {len(business_ids)} businesses in {len(chunks)} tasks")
+    return {"businesses": len(business_ids), "tasks": len(chunks), "summary_task_id": result.id}
 
+
+@shared_task(name='app.jobs.reminder_tasks.generate_business_drafts')
+def generate_business_drafts(business_ids: List[str]):
+    """
+    Generate reminder drafts for a chunk of businesses
+
+    Each business is generated under a Redis lock, so it never has more
+    than one run at a time; a business whose previous run is still going is
+    skipped rather than getting duplicate drafts. A failure in one business
+    is reported in the results and doesn't stop the rest.
+    """
+    locks = redis.Redis.from_url(settings.REDIS_URL)
+    cache = get_ai_service().cache
+    results = []
+
+    for business_id in business_ids:
+        start = time.perf_counter()
+        lock = locks.lock(
+            f"draft-generation:{business_id}",
+            timeout=settings.DRAFT_GENERATION_LOCK_SECONDS,
+            blocking=False
+        )
+        try:
+            acquired = lock.acquire()
+        except redis.RedisError as e:
+            print(f"Draft generation lock unavailable for business {business_id}: {e}")
+            results.append({"business_id": business_id, "status": "failed", "error": str(e)})
+            continue
+
+        if not acquired:
+            results.append({"business_id": business_id, "status": "skipped"})
+            continue
+
+        db: Session = SessionLocal()
+        cache_before = cache.stats() if cache else None
+        try:
+            drafts = DraftGenerationService(db).generate_drafts_for_overdue_invoices(
+                business_id,
+                max_drafts=settings.DRAFT_GENERATION_MAX_PER_BUSINESS
+            )
+            results.append({
+                "business_id": business_id,
+                "status": "completed",
+                "drafts": len(drafts),
+                "duration_seconds": round(time.perf_counter() - start, 3),
+                "cache": _cache_lookups(cache, cache_before)
+            })
+        except Exception as e:
+            db.rollback()
+            print(f"Draft generation failed for business {business_id}: {e}")
+            results.append({"business_id": business_id, "status": "failed", "error": str(e)})
+        finally:
+            db.close()
             try:
-                # Generate reminder text
-                reminder_text = ai_service.generate_reminder(
-                    amount=invoice.amount,
-                    days_overdue=invoice.days_overdue,
-                    tone=tone.value,
-                    previous_reminders=previous_reminders
-                )
-
-                # Create draft
-                draft = ReminderDraft(
-                    invoice_id=invoice.id,
-                    tone=tone,
-                    body_text=reminder_text
-                )
-                db.add(draft)
-                generated_count += 1
-
-            except Exception as e:
-                print(f"Failed to generate reminder for invoice {invoice.id}: {e}")
-                continue
-
-        db.commit()
-        return {
-            "eligible": len(eligible_invoices),
-            "generated": generated_count
-        }
+                lock.release()
+            except redis.RedisError:
+                # Expired or unreachable; the timeout frees it either way
+                pass
 
-    finally:
-        db.close()
+    return results
+
+
+def _cache_lookups(cache, before) -> dict:
+    """
+    Generation cache hits and misses since `before`, a stats() snapshot
+
+    The cache's counters are process-wide, so this assumes one task at a
+    time per worker process (Celery's default prefork pool).
+    """
+    if cache is None:
+        return {"hits": 0, "misses": 0}
+    after = cache.stats()
+    return {
+        "hits": (after["local_hits"] + after["redis_hits"]) - (before["local_hits"] + before["redis_hits"]),
+        "misses": after["misses"] - before["misses"]
+    }
+
+
+@shared_task(name='app.jobs.reminder_tasks.summarise_draft_generation')
+def summarise_draft_generation(chunk_results: List[List[dict]], started_at: float):
+    """Combine the per-business results of a nightly run"""
+    results = [result for chunk in chunk_results for result in chunk]
+    cache_hits = sum(r.get("cache", {}).get("hits", 0) for r in results)
+    cache_misses = sum(r.get("cache", {}).get("misses", 0) for r in results)
+    summary = {
+        "businesses": len(results),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": [r["business_id"] for r in results if r["status"] == "failed"],
+        "drafts": sum(r.get("drafts", 0) for r in results),
+        "slowest_business_seconds": max((r.get("duration_seconds", 0.0) for r in results), default=0.0),
+        "duration_seconds": round(time.time() - started_at, 3),
+        "generation_cache": {
+            "hits": cache_hits,
+            "misses": cache_misses,
+            "hit_rate": round(cache_hits / (cache_hits + cache_misses), 3) if cache_hits + cache_misses else 0.0
+        }
+    }
+
+    print(
+        f"generate_reminder_drafts: {summary['drafts']} drafts for {summary['completed']} of "
+        f"{summary['businesses']} businesses ({summary['skipped']} skipped, "
+        f"{len(summary['failed'])} failed) in {summary['duration_seconds']:.2f}s, "
+        f"generation cache hit rate {summary['generation_cache']['hit_rate']:.0%}"
+    )
+    return summary
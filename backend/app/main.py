@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import auth, invoices, reminders, webhooks
+from app.api import audit, auth, invoices, reminders, webhooks
+from app.jobs import celery_app  # Configures the app that background tasks are queued through
 
 app = FastAPI(
     title="PayFlow Assist",
@@ -16,6 +17,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -23,6 +25,7 @@ app.include_router(auth.router)
 app.include_router(invoices.router)
 app.include_router(reminders.router)
 app.include_router(webhooks.router)
+app.include_router(audit.router)
 
 
 @app.get("/")
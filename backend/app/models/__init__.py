@@ -4,5 +4,9 @@ from app.models.client import Client
 from app.models.invoice import Invoice
 from app.models.reminder import ReminderDraft
 from app.models.audit_log import AuditLog
+from app.models.settings import ReminderSettings
+from app.models.import_job import ImportJob
+from app.models.receivables_summary import ReceivablesSummary
+from app.models.reminder_template import ReminderTemplate
 
-__all__ = ["User", "Business", "Client", "Invoice", "ReminderDraft", "AuditLog"]
+__all__ = ["User", "Business", "Client", "Invoice", "ReminderDraft", "AuditLog", "ReminderSettings", "ImportJob", "ReceivablesSummary", "ReminderTemplate"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Index, event
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -8,11 +8,27 @@ from app.core.database import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # One person's activity over a period, optionally of one kind
+        Index("ix_audit_logs_actor_id_created_at", "actor_id", "created_at"),
+        Index("ix_audit_logs_actor_id_action_created_at", "actor_id", "action", "created_at"),
+        # Monthly partitions, created ahead and archived by AuditPartitionService
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     action = Column(String, nullable=False, index=True)
     actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     payload_snapshot = Column(JSON, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Part of the primary key because it is the partition key
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True, index=True)
 
-    # Note: Audit logs are immutable - no updates or deletes allowed
+    # Note: Audit logs are immutable - no updates or deletes allowed. The
+    # ORM refuses to flush either, and a database trigger rejects them from
+    # anywhere else.
+
+
+@event.listens_for(AuditLog, "before_update")
+@event.listens_for(AuditLog, "before_delete")
+def _reject_audit_log_changes(mapper, connection, target):
+    raise ValueError("Audit logs are immutable")
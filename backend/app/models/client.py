@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -29,6 +29,10 @@ class Client(Base):
     relationship_notes = Column(Text, nullable=True)  # AI context about client relationship
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_clients_business_id_email", "business_id", "email"),
+    )
+
     # Relationships
     business = relationship("Business", back_populates="clients")
     invoices = relationship("Invoice", back_populates="client")
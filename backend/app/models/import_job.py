@@ -0,0 +1,50 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Integer, JSON, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+import enum
+
+from app.core.database import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    QUEUED = "queued"  # File staged, waiting for a worker
+    RUNNING = "running"  # Worker is ingesting rows
+    COMPLETED = "completed"  # All rows processed
+    FAILED = "failed"  # Import aborted, see error_message
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id"), nullable=False, index=True)
+    actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    file_extension = Column(String(10), nullable=False)
+    file_sha256 = Column(String(64), nullable=True)  # Lets a repeat upload return straight away
+    staged_path = Column(String, nullable=True)  # Cleared once the staged file is removed
+    status = Column(Enum(ImportJobStatus, values_callable=lambda x: [e.value for e in x]), default=ImportJobStatus.QUEUED, nullable=False)
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    rows_duplicate = Column(Integer, default=0, nullable=False)  # Already imported, skipped
+    errors = Column(JSON, nullable=False, default=list)  # First few row errors
+    error_message = Column(Text, nullable=True)  # Why the whole job failed
+    started_at = Column(DateTime, nullable=True)
+    progress_at = Column(DateTime, nullable=True)  # Last batch committed by the worker
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_import_jobs_business_id_file_sha256", "business_id", "file_sha256"),
+    )
+
+    def rows_per_second(self) -> float:
+        """Ingestion throughput so far"""
+        if not self.started_at:
+            return 0.0
+
+        elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return 0.0
+        return round(self.rows_processed / elapsed, 1)
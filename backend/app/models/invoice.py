@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Numeric, Date, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Numeric, Date, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
@@ -24,6 +24,9 @@ class Invoice(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
+    # The client's business, copied here so listings can be indexed per business
+    business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id"), nullable=False)
+    invoice_number = Column(String, nullable=True)
     external_source = Column(
         Enum(ExternalSource),
         default=ExternalSource.MANUAL,
@@ -37,8 +40,20 @@ class Invoice(Base):
         nullable=False
     )
     days_overdue = Column(Integer, default=0, nullable=False)
+    # Hash of business + client email + invoice number + amount + due date,
+    # set for uploaded rows so re-uploading a ledger cannot duplicate them
+    import_fingerprint = Column(String(64), nullable=True, unique=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Keyset pagination walks (due_date, id) within a business or client;
+    # the leading columns serve the list filters that can narrow the scan
+    __table_args__ = (
+        Index("ix_invoices_business_id_due_date_id", "business_id", "due_date", "id"),
+        Index("ix_invoices_client_id_due_date_id", "client_id", "due_date", "id"),
+        Index("ix_invoices_business_id_status_due_date_id", "business_id", "status", "due_date", "id"),
+        Index("ix_invoices_status_days_overdue", "status", "days_overdue"),
+    )
+
     # Relationships
     client = relationship("Client", back_populates="invoices")
     reminder_drafts = relationship("ReminderDraft", back_populates="invoice")
@@ -0,0 +1,51 @@
+"""
+Receivables Summary Model
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class ReceivablesSummary(Base):
+    """
+    Per-business invoice totals shown on the dashboard
+
+    Maintained incrementally by ReceivablesSummaryService as invoices are
+    written, so reading it costs the same however many invoices a business
+    has. Overdue buckets and escalation stages only count unpaid invoices.
+    """
+    __tablename__ = "receivables_summaries"
+
+    business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id"), primary_key=True)
+
+    unpaid_count = Column(Integer, default=0, nullable=False)
+    unpaid_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    paid_count = Column(Integer, default=0, nullable=False)
+    paid_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    overdue_count = Column(Integer, default=0, nullable=False)
+    overdue_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    overdue_days_total = Column(Integer, default=0, nullable=False)  # For the average
+
+    # Overdue buckets (days overdue)
+    overdue_1_30_count = Column(Integer, default=0, nullable=False)
+    overdue_1_30_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    overdue_31_60_count = Column(Integer, default=0, nullable=False)
+    overdue_31_60_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    overdue_61_90_count = Column(Integer, default=0, nullable=False)
+    overdue_61_90_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    overdue_90_plus_count = Column(Integer, default=0, nullable=False)
+    overdue_90_plus_amount = Column(Numeric(14, 2), default=0, nullable=False)
+
+    # Escalation stages, using the business's reminder settings thresholds
+    stage_1_count = Column(Integer, default=0, nullable=False)
+    stage_1_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    stage_2_count = Column(Integer, default=0, nullable=False)
+    stage_2_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    stage_3_count = Column(Integer, default=0, nullable=False)
+    stage_3_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    stage_4_count = Column(Integer, default=0, nullable=False)
+    stage_4_amount = Column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Boolean, Text, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,6 +19,7 @@ class ReminderStatus(str, enum.Enum):
     PENDING = "pending"  # Draft created, not yet approved
     APPROVED = "approved"  # User approved, ready to send
     SCHEDULED = "scheduled"  # Scheduled to auto-send
+    QUEUED = "queued"  # Waiting in the outbound mail queue
     SENT = "sent"  # Successfully sent
     FAILED = "failed"  # Send failed
 
@@ -36,9 +37,15 @@ class ReminderDraft(Base):
     approved = Column(Boolean, default=False, nullable=False)  # Legacy field, kept for compatibility
     auto_send_at = Column(DateTime, nullable=True)  # When to auto-send (if scheduled)
     sent_at = Column(DateTime, nullable=True)
-    delivery_status = Column(String(50), nullable=True)  # 'delivered', 'failed', etc.
+    delivery_status = Column(String(50), nullable=True)  # 'queued', 'sending', 'retrying', 'delivered', 'failed', etc.
+    sending_started_at = Column(DateTime, nullable=True)  # When a mail worker claimed it; cleared once the send resolves
     snoozed_until = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # The auto-send dispatcher claims scheduled drafts in auto_send_at order
+    __table_args__ = (
+        Index("ix_reminder_drafts_status_auto_send_at", "status", "auto_send_at"),
+    )
+
     # Relationships
     invoice = relationship("Invoice", back_populates="reminder_drafts")
@@ -0,0 +1,37 @@
+"""
+Reminder Template Model
+"""
+import uuid
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.core.database import Base
+from app.models.reminder import ReminderTone
+
+
+class ReminderTemplate(Base):
+    """
+    AI-written reminder email with placeholders, rendered locally per invoice
+
+    Generated once per business, tone and escalation level (a few variants
+    each) and reused for every routine reminder that matches.
+    """
+    __tablename__ = "reminder_templates"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id"), nullable=False)
+    tone = Column(Enum(ReminderTone, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    escalation_level = Column(Integer, nullable=False)
+    variant = Column(Integer, default=0, nullable=False)
+    subject_template = Column(String(255), nullable=False)
+    body_template = Column(Text, nullable=False)
+    model = Column(String, nullable=True)  # Model that wrote the template
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "business_id", "tone", "escalation_level", "variant",
+            name="uq_reminder_templates_business_tone_level_variant"
+        ),
+    )
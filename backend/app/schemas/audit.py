@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+
+
+class AuditLogResponse(BaseModel):
+    id: UUID
+    action: str
+    actor_id: UUID
+    payload_snapshot: dict
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
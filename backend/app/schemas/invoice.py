@@ -17,6 +17,7 @@ class InvoiceResponse(BaseModel):
     client_id: UUID
     client_name: str
     client_email: str
+    invoice_number: Optional[str] = None
     amount: Decimal
     due_date: date
     status: str
@@ -27,10 +28,26 @@ class InvoiceResponse(BaseModel):
         from_attributes = True
 
 
+class InvoiceListItem(BaseModel):
+    """An invoice in GET /invoices/; only the fields asked for are present"""
+    id: Optional[UUID] = None
+    client_id: Optional[UUID] = None
+    client_name: Optional[str] = None
+    client_email: Optional[str] = None
+    invoice_number: Optional[str] = None
+    amount: Optional[Decimal] = None
+    due_date: Optional[date] = None
+    status: Optional[str] = None
+    days_overdue: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+
 class InvoiceUploadResponse(BaseModel):
     success: int
     failed: int
     errors: list[str]
+    duplicates: int = 0  # Rows already imported by an earlier upload
+    already_imported: bool = False  # The identical file was imported before
 
 
 class InvoiceManualCreate(BaseModel):
@@ -46,3 +63,39 @@ class InvoiceUpdate(BaseModel):
     client_email: Optional[EmailStr] = None
     amount: Optional[str] = None  # Accepts as string from frontend
     due_date: Optional[str] = None  # Accepts as string from frontend (YYYY-MM-DD)
+
+
+class ImportJobResponse(BaseModel):
+    id: UUID
+    filename: str
+    status: str  # queued, running, completed, failed
+    rows_processed: int
+    rows_failed: int
+    rows_duplicate: int
+    rows_per_second: float
+    errors: list[str]
+    error_message: Optional[str]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SummaryBucket(BaseModel):
+    count: int
+    amount: Decimal
+
+
+class ReceivablesSummaryResponse(BaseModel):
+    outstanding_amount: Decimal
+    unpaid_count: int
+    paid_count: int
+    paid_amount: Decimal
+    overdue_count: int
+    overdue_amount: Decimal
+    average_days_overdue: float
+    overdue_buckets: dict[str, SummaryBucket]  # 1-30, 31-60, 61-90, 90+
+    stages: dict[int, SummaryBucket]  # Escalation stage 1-4
+    updated_at: datetime
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -33,6 +33,20 @@ class SnoozeReminderRequest(BaseModel):
     days: int = Field(..., ge=1, le=30)
 
 
+class SendRemindersRequest(BaseModel):
+    draft_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class SkippedDraft(BaseModel):
+    draft_id: UUID
+    reason: str  # not_found, not_approved, already_sent, already_queued
+
+
+class SendRemindersResponse(BaseModel):
+    queued: int
+    skipped: List[SkippedDraft]
+
+
 class ReminderSettingsResponse(BaseModel):
     id: UUID
     business_id: UUID
@@ -1,8 +1,8 @@
 """
-AI Service for generating payment reminder emails using OpenAI API
+AI Service for generating payment reminder emails
 """
-from openai import OpenAI
-from typing import Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from decimal import Decimal
 from datetime import date
 import json
@@ -10,13 +10,316 @@ import re
 
 from app.core.config import settings
 from app.models.reminder import ReminderTone
+from app.services.generation_cache import cache_key, get_generation_cache
+from app.services.model_backends import ModelBackend
+from app.services.model_resilience import CircuitOpenError
+from app.services.model_router import create_model_router
+
+
+# Tone-specific instructions
+TONE_INSTRUCTIONS = {
+    ReminderTone.FRIENDLY: (
+        "Use a warm, friendly, and understanding tone. "
+        "Assume this is a good client who may have simply forgotten. "
+        "Be polite and maintain the relationship. "
+        "Keep it conversational but professional."
+    ),
+    ReminderTone.PROFESSIONAL: (
+        "Use a professional business tone. "
+        "Be polite but more direct about the outstanding payment. "
+        "Maintain professionalism while clearly stating the situation."
+    ),
+    ReminderTone.FIRM: (
+        "Use a firm but respectful tone. "
+        "Be direct about the overdue payment and the need for immediate action. "
+        "Mention potential consequences (e.g., late fees, service suspension) if appropriate. "
+        "Remain professional and avoid aggressive language."
+    ),
+    ReminderTone.FORMAL: (
+        "Use a formal, serious tone appropriate for final notices. "
+        "Be clear that this is a final warning before escalation to collections or legal action. "
+        "Use formal business language. State next steps clearly."
+    )
+}
+
+SYSTEM_PROMPT = "You are a professional business email writer specializing in payment reminders."
+
+# Placeholders reminder templates may use, filled in per invoice when rendered
+TEMPLATE_PLACEHOLDERS = {
+    "client_name": "the client's name",
+    "amount": "the invoice amount, already formatted, e.g. £1,250.00",
+    "due_date": "the due date, e.g. 14 March 2026",
+    "days_overdue": "the number of days overdue",
+    "invoice_reference": "e.g. 'invoice INV-1042', or 'your invoice' when there is no number",
+    "business_name": "the sender's business name",
+}
+
+
+def _parse_json_response(response_text: str) -> dict:
+    """Parse the model's JSON reply, tolerating markdown code fences"""
+    try:
+        # Try to parse as JSON directly
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        # If response includes markdown code blocks, extract JSON
+        json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(1))
+
+        # Fallback: try to find JSON object
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(0))
+
+        raise ValueError("Could not parse AI response as JSON")
 
 
 class AIService:
-    """Service for AI-powered email generation using OpenAI"""
+    """
+    Service for AI-powered email generation
+
+    Prompts go through a ModelRouter to the fastest healthy provider in
+    AI_PROVIDERS (or the one pinned to the escalation stage), each wrapped
+    in a ResilientBackend for deadlines, retries and circuit breaking.
+    AI_BACKEND swaps the providers for offline stub/replay backends. Calls
+    fail with ModelBackendError (CircuitOpenError while every provider is
+    degraded), and callers fall back to their own templates.
+    """
+
+    def __init__(self, backend: Optional[ModelBackend] = None):
+        # Providers' rate limits are shared by every batch in the process,
+        # so concurrent runs together stay within the configured limits
+        self.backend = create_model_router(backend)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.AI_MAX_CONCURRENCY,
+            thread_name_prefix="ai-generation"
+        )
+        self.cache = get_generation_cache() if settings.GENERATION_CACHE_ENABLED else None
+
+    def generate_reminder_emails(self, requests: List[dict]) -> List[Union[Dict[str, str], Exception]]:
+        """
+        Generate several reminder emails concurrently (see iter_reminder_emails)
+
+        Args:
+            requests: Keyword arguments for generate_reminder_email, one per email
+
+        Returns:
+            One entry per request, in the same order: the generated email,
+            or the exception raised while generating it
+        """
+        results = [None] * len(requests)
+        for index, result in self.iter_reminder_emails(requests):
+            results[index] = result
+        return results
+
+    def iter_reminder_emails(
+        self,
+        requests: List[dict]
+    ) -> Iterator[Tuple[int, Union[Dict[str, str], Exception]]]:
+        """
+        Generate several reminder emails concurrently, yielding each when ready
+
+        Cached emails are yielded straight away. With AI_BATCH_MODE_ENABLED
+        the rest are sent AI_BATCH_SIZE at a time per business in a single
+        request (see _generate_reminder_batch); any item a batch doesn't
+        return valid is retried with a request of its own. Up to
+        AI_MAX_CONCURRENCY calls run at once, each bounded by
+        AI_CALL_DEADLINE_SECONDS including retries. While the provider's
+        circuit is open, uncached requests fail at once with CircuitOpenError.
+
+        Args:
+            requests: Keyword arguments for generate_reminder_email, one per email
+
+        Yields:
+            (index into requests, generated email or the exception raised
+            while generating it), in order of completion
+        """
+        remaining = []
+
+        for index, kwargs in enumerate(requests):
+            cached = self._cached_email(kwargs) if self.cache else None
+            if cached is not None:
+                yield index, cached
+                continue
+            remaining.append(index)
+
+        if remaining and not self.backend.available():
+            # The provider is degraded; don't queue anything up behind it
+            error = CircuitOpenError("Model provider circuit is open", status_code=503)
+            for index in remaining:
+                yield index, error
+            remaining = []
+
+        def generate(index: int):
+            try:
+                return self.generate_reminder_email(**requests[index], check_cache=False)
+            except Exception as e:
+                return e
 
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Future -> the request indices it covers; batches cover several
+        pending = {}
+        if settings.AI_BATCH_MODE_ENABLED and len(remaining) > 1:
+            # Batches share one prompt and one provider, so they are split
+            # by business and by any stage routing
+            by_business = {}
+            for index in remaining:
+                kwargs = requests[index]
+                group = (
+                    kwargs["business_name"],
+                    kwargs["industry_type"],
+                    self.backend.route_for(kwargs["escalation_level"])
+                )
+                by_business.setdefault(group, []).append(index)
+
+            for indices in by_business.values():
+                for start in range(0, len(indices), settings.AI_BATCH_SIZE):
+                    chunk = indices[start:start + settings.AI_BATCH_SIZE]
+                    batch = self.executor.submit(self._generate_reminder_batch, [requests[i] for i in chunk])
+                    pending[batch] = chunk
+        else:
+            for index in remaining:
+                pending[self.executor.submit(generate, index)] = [index]
+
+        batches = set(pending)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                indices = pending.pop(future)
+                if future not in batches:
+                    yield indices[0], future.result()
+                    continue
+
+                for index, email in zip(indices, future.result()):
+                    if email is None:
+                        pending[self.executor.submit(generate, index)] = [index]
+                        continue
+                    yield index, email
+
+    def _cached_email(self, kwargs: dict) -> Optional[Dict[str, str]]:
+        """A cached email for these inputs from any model the call could be routed to"""
+        keys = [cache_key(kwargs, model) for model in self.backend.models_for(kwargs["escalation_level"])]
+        cached = self.cache.get_any(keys)
+        return dict(cached) if cached is not None else None
+
+    def _generate_reminder_batch(self, requests: List[dict]) -> List[Optional[Dict[str, str]]]:
+        """
+        Generate emails for several invoices of one business in one request
+
+        The business context, tone guidance and writing rules are sent once
+        for the whole batch, followed by the invoices as a JSON array. Each
+        returned item is validated on its own.
+
+        Returns:
+            One entry per request, in order: the email, or None where the
+            model's item was missing or invalid (or the whole call failed)
+        """
+        if len(requests) == 1:
+            return [None]
+
+        first = requests[0]
+        tones = []
+        for kwargs in requests:
+            if kwargs["tone"] not in tones:
+                tones.append(kwargs["tone"])
+
+        items = []
+        for number, kwargs in enumerate(requests, start=1):
+            item = {
+                "id": str(number),
+                "client_name": kwargs["client_name"],
+                "client_email": kwargs["client_email"],
+                "invoice_amount": f"£{kwargs['invoice_amount']:,.2f}",
+                "due_date": kwargs["due_date"].strftime('%d %B %Y'),
+                "days_overdue": kwargs["days_overdue"],
+                "escalation_level": f"{kwargs['escalation_level']} of 4",
+                "previous_reminders_sent": kwargs.get("previous_reminders_sent", 0),
+                "tone": kwargs["tone"].value,
+            }
+            if kwargs.get("relationship_notes"):
+                item["relationship_context"] = kwargs["relationship_notes"]
+            items.append(item)
+
+        tone_guide = "\n".join(f"- {tone.value}: {TONE_INSTRUCTIONS[tone]}" for tone in tones)
+
+        prompt = f"""You are writing professional payment reminder emails, one for each invoice below.
+Business: {first['business_name']} ({first['industry_type']} industry)
+
+Use the tone given for each invoice:
+{tone_guide}
+
+Write each payment reminder email with the following requirements:
+1. Keep the email concise (150-250 words)
+2. Include a clear subject line that's professional and specific
+3. Start with an appropriate greeting
+4. Clearly state:
+   - The invoice amount, written exactly as given
+   - The due date
+   - How many days overdue it is
+5. Include a clear call-to-action
+6. End with an appropriate sign-off
+7. Do NOT include sender's name/signature (will be added automatically)
+8. Use British English spelling and currency formatting
+9. Be tactful - this is about maintaining business relationships
+
+Invoices:
+{json.dumps(items, indent=1)}
+
+Format your response as JSON with one key, "emails", holding a list with one
+object per invoice, each with three keys:
+- "id": The invoice's id from the list above
+- "subject": The email subject line (max 80 characters)
+- "body": The email body text
+
+Do not include any markdown formatting in the email bodies. Use plain text only."""
+
+        try:
+            reply, model = self.backend.complete_with_model(
+                [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=min(4096, 600 * len(requests)),
+                temperature=0.7,
+                escalation_level=first["escalation_level"]
+            )
+            result = _parse_json_response(reply)
+        except Exception as e:
+            print(f"Batch generation of {len(requests)} emails failed: {e}")
+            return [None] * len(requests)
+
+        emails = result.get("emails") if isinstance(result, dict) else None
+        by_id = {}
+        for email in emails if isinstance(emails, list) else []:
+            if isinstance(email, dict) and str(email.get("id")) not in by_id:
+                by_id[str(email.get("id"))] = email
+
+        validated = [
+            self._validate_batch_email(by_id.get(item["id"]), kwargs)
+            for item, kwargs in zip(items, requests)
+        ]
+        if self.cache:
+            for kwargs, email in zip(requests, validated):
+                if email:
+                    self.cache.set(cache_key(kwargs, model), email)
+        return validated
+
+    def _validate_batch_email(self, email: Optional[dict], kwargs: dict) -> Optional[Dict[str, str]]:
+        """Accept a batch item only if it's complete and about the right invoice"""
+        if not email:
+            return None
+
+        subject, body = email.get("subject"), email.get("body")
+        if not isinstance(subject, str) or not isinstance(body, str):
+            return None
+        if not subject.strip() or not body.strip() or len(subject) > 255:
+            return None
+
+        # Guards against the model swapping emails between invoices
+        amount = kwargs["invoice_amount"]
+        if f"{amount:,.2f}" not in body and f"{amount:.2f}" not in body:
+            return None
+
+        return {"subject": subject.strip(), "body": body.strip()}
 
     def generate_reminder_email(
         self,
@@ -30,14 +333,37 @@ class AIService:
         business_name: str,
         industry_type: str,
         relationship_notes: Optional[str] = None,
-        previous_reminders_sent: int = 0
+        previous_reminders_sent: int = 0,
+        check_cache: bool = True
     ) -> Dict[str, str]:
         """
-        Generate a payment reminder email using OpenAI API
+        Generate a payment reminder email using the configured model
+
+        Identical prompt inputs are served from the generation cache without
+        calling the model, if any model the call could be routed to has
+        generated them (check_cache=False skips the lookup for callers that
+        already missed). Results are cached under the model that answered.
 
         Returns:
             Dict with 'subject' and 'body' keys containing the email content
         """
+        inputs = dict(
+            client_name=client_name,
+            client_email=client_email,
+            invoice_amount=invoice_amount,
+            due_date=due_date,
+            days_overdue=days_overdue,
+            tone=tone,
+            escalation_level=escalation_level,
+            business_name=business_name,
+            industry_type=industry_type,
+            relationship_notes=relationship_notes,
+            previous_reminders_sent=previous_reminders_sent
+        )
+        if self.cache and check_cache:
+            cached = self._cached_email(inputs)
+            if cached is not None:
+                return cached
 
         # Build context for AI
         context_parts = [
@@ -56,36 +382,10 @@ class AIService:
 
         context = "\n".join(context_parts)
 
-        # Tone-specific instructions
-        tone_instructions = {
-            ReminderTone.FRIENDLY: (
-                "Use a warm, friendly, and understanding tone. "
-                "Assume this is a good client who may have simply forgotten. "
-                "Be polite and maintain the relationship. "
-                "Keep it conversational but professional."
-            ),
-            ReminderTone.PROFESSIONAL: (
-                "Use a professional business tone. "
-                "Be polite but more direct about the outstanding payment. "
-                "Maintain professionalism while clearly stating the situation."
-            ),
-            ReminderTone.FIRM: (
-                "Use a firm but respectful tone. "
-                "Be direct about the overdue payment and the need for immediate action. "
-                "Mention potential consequences (e.g., late fees, service suspension) if appropriate. "
-                "Remain professional and avoid aggressive language."
-            ),
-            ReminderTone.FORMAL: (
-                "Use a formal, serious tone appropriate for final notices. "
-                "Be clear that this is a final warning before escalation to collections or legal action. "
-                "Use formal business language. State next steps clearly."
-            )
-        }
-
         # Build the prompt
         prompt = f"""{context}
 
-{tone_instructions[tone]}
+{TONE_INSTRUCTIONS[tone]}
 
 Write a payment reminder email with the following requirements:
 1. Keep the email concise (150-250 words)
@@ -107,43 +407,100 @@ Format your response as JSON with two keys:
 
 Do not include any markdown formatting in the email body. Use plain text only."""
 
-        # Call OpenAI API
-        response = self.client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a professional business email writer specializing in payment reminders."},
+        # Call the model
+        reply, model = self.backend.complete_with_model(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            response_format={"type": "json_object"},
             max_tokens=1024,
-            temperature=0.7
+            temperature=0.7,
+            escalation_level=escalation_level
         )
 
         # Parse response
-        response_text = response.choices[0].message.content
+        result = _parse_json_response(reply)
 
-        # Extract JSON from response
-        try:
-            # Try to parse as JSON directly
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # If response includes markdown code blocks, extract JSON
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group(1))
-            else:
-                # Fallback: try to find JSON object
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(0))
-                else:
-                    raise ValueError("Could not parse AI response as JSON")
-
-        return {
+        email = {
             "subject": result.get("subject", "Payment Reminder"),
             "body": result.get("body", "")
         }
 
+        if self.cache:
+            self.cache.set(cache_key(inputs, model), email)
+
+        return email
+
+    def generate_reminder_templates(
+        self,
+        business_name: str,
+        industry_type: str,
+        tone: ReminderTone,
+        escalation_level: int,
+        count: int
+    ) -> List[Dict[str, str]]:
+        """
+        Generate reusable reminder templates with {placeholders} in one call
+
+        Returns:
+            List of dicts with 'subject' and 'body' template strings, each
+            checked by the caller before use, and the 'model' id of the
+            provider that wrote them
+        """
+        placeholders = "\n".join(
+            f"- {{{name}}}: {description}" for name, description in TEMPLATE_PLACEHOLDERS.items()
+        )
+
+        prompt = f"""You are writing reusable payment reminder email templates.
+Business: {business_name} ({industry_type} industry)
+Escalation level: {escalation_level} of 4
+
+{TONE_INSTRUCTIONS[tone]}
+
+Write {count} distinct templates. Each will be sent to many different clients,
+so never write a specific name, amount or date. Use these placeholders, written
+exactly as shown including the curly braces, wherever those details belong:
+{placeholders}
+
+Requirements for every template:
+1. Keep the email concise (150-250 words)
+2. Include a clear subject line that's professional and specific
+3. Start with an appropriate greeting using {{client_name}}
+4. Clearly state the amount ({{amount}}), the due date ({{due_date}}) and how many days overdue it is ({{days_overdue}})
+5. Include a clear call-to-action
+6. End with an appropriate sign-off
+7. Do NOT include sender's name/signature (will be added automatically)
+8. Use British English spelling
+9. Do not use curly braces for anything other than the placeholders
+
+Format your response as JSON with one key, "templates", holding a list of
+objects with two keys:
+- "subject": The email subject line template (max 80 characters)
+- "body": The email body template
+
+Do not include any markdown formatting in the email body. Use plain text only."""
+
+        reply, model = self.backend.complete_with_model(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1024 * count,
+            temperature=0.7,
+            escalation_level=escalation_level
+        )
+
+        result = _parse_json_response(reply)
+        templates = result.get("templates") if isinstance(result, dict) else None
+        if not isinstance(templates, list):
+            raise ValueError("AI response did not contain a list of templates")
+
+        return [
+            {"subject": t.get("subject", ""), "body": t.get("body", ""), "model": model}
+            for t in templates
+            if isinstance(t, dict)
+        ]
+
 
 # Singleton instance
 _ai_service = None
@@ -0,0 +1,104 @@
+"""
+Audit Partition Service - Monthly audit_logs partitions, created ahead and archived when old
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import List, Optional
+import re
+
+_PARTITION_NAME = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_y{month.year}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """The month a partition holds, or None if the table isn't one"""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class AuditPartitionService:
+    """
+    Keeps audit_logs partitioned by month of created_at
+
+    Partitions are created a few months ahead, so an insert never finds its
+    month missing. Partitions older than the retention period are detached
+    and moved to the archive schema: they drop out of the live table and
+    its indexes, but stay in the database until exported and dropped
+    (e.g. `pg_dump -n audit_archive`).
+
+    Every change commits on its own, so a failure (e.g. a lock timeout)
+    leaves earlier partitions done and is picked up on the next run.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def partitions(self) -> List[date]:
+        """Months with a partition attached to audit_logs, oldest first"""
+        names = self.db.execute(text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = 'audit_logs'::regclass
+        """)).scalars().all()
+        return sorted(month for month in map(partition_month, names) if month)
+
+    def ensure_partitions(self, months_ahead: int) -> List[str]:
+        """Create any missing partitions from this month to `months_ahead` months on"""
+        this_month = datetime.utcnow().date().replace(day=1)
+        existing = set(self.partitions())
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if month in existing:
+                continue
+            name = partition_name(month)
+            self.db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            self.db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            # Row triggers are inherited from audit_logs; TRUNCATE ones aren't
+            self.db.execute(text(
+                f"CREATE TRIGGER audit_logs_no_truncate BEFORE TRUNCATE ON {name} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION audit_logs_immutable()"
+            ))
+            self.db.commit()
+            created.append(name)
+
+        return created
+
+    def archive_partitions(self, retention_months: int, archive_schema: str) -> List[str]:
+        """Move partitions wholly older than `retention_months` into `archive_schema`"""
+        cutoff = add_months(datetime.utcnow().date().replace(day=1), -retention_months)
+
+        archived = []
+        for month in self.partitions():
+            if add_months(month, 1) > cutoff:
+                break
+            name = partition_name(month)
+            self.db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+            # Detaching briefly locks out writes to audit_logs, so give up
+            # rather than queue behind a long query
+            self.db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            self.db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            self.db.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            # The inherited row trigger goes with the detach; archived entries
+            # are still immutable
+            self.db.execute(text(
+                f"CREATE TRIGGER audit_logs_no_update_or_delete BEFORE UPDATE OR DELETE "
+                f"ON {archive_schema}.{name} FOR EACH ROW EXECUTE FUNCTION public.audit_logs_immutable()"
+            ))
+            self.db.commit()
+            archived.append(f"{archive_schema}.{name}")
+
+        return archived
@@ -1,13 +1,47 @@
+"""
+Audit Service - Immutable audit log entries, written with the change they record
+"""
+from sqlalchemy import event, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from datetime import datetime
+from threading import Condition, Lock, Thread
+from typing import Dict, List, Optional
 from uuid import UUID
+import atexit
+import json
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.database import engine
 from app.models.audit_log import AuditLog
 
 
+# Entries logged in write-behind mode wait here (in Session.info) until the
+# session's transaction commits
+_PENDING_KEY = "audit_log_pending"
+
+
 class AuditService:
-    """Service for creating immutable audit logs"""
+    """
+    Service for creating immutable audit logs
+
+    An entry is recorded only if the caller's transaction commits, so log
+    before committing the change being audited. AUDIT_LOG_MODE decides how
+    it is written:
 
-    def __init__(self, db: Session):
+    - transactional: the row is inserted in the caller's transaction, so
+      the change and its audit entry commit (or roll back) together.
+    - write_behind: on commit the entry is handed to the process-wide
+      AuditBuffer, which writes entries in bulk off the request path.
+      Entries still buffered if the process dies are lost.
+    """
+
+    def __init__(self, db: Session, mode: Optional[str] = None):
         self.db = db
+        self.mode = mode or settings.AUDIT_LOG_MODE
 
     def log_action(self, action: str, actor_id: UUID, payload: dict) -> AuditLog:
         """
@@ -18,11 +52,175 @@ class AuditService:
             actor_id: UUID of the user performing the action
             payload: Snapshot of relevant data at time of action
         """
+        # Snapshot the payload now; later changes to the caller's dict
+        # mustn't reach the log
         audit_log = AuditLog(
+            id=uuid.uuid4(),
             action=action,
             actor_id=actor_id,
-            payload_snapshot=payload
+            payload_snapshot=json.loads(json.dumps(payload, default=str)),
+            created_at=datetime.utcnow()
         )
-        self.db.add(audit_log)
-        self.db.commit()
+
+        if self.mode == "write_behind":
+            self.db.info.setdefault(_PENDING_KEY, []).append(_row(audit_log))
+        else:
+            self.db.add(audit_log)
         return audit_log
+
+
+def _row(audit_log: AuditLog) -> Dict[str, object]:
+    return {
+        "id": audit_log.id,
+        "action": audit_log.action,
+        "actor_id": audit_log.actor_id,
+        "payload_snapshot": audit_log.payload_snapshot,
+        "created_at": audit_log.created_at,
+    }
+
+
+@event.listens_for(Session, "after_commit")
+def _release_pending_entries(session: Session):
+    entries = session.info.pop(_PENDING_KEY, None)
+    if entries:
+        get_audit_buffer().add_many(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_entries(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class AuditBuffer:
+    """
+    Collects committed audit entries and inserts them in bulk
+
+    A background thread writes everything waiting as one multi-row INSERT
+    once `max_entries` are waiting or the oldest has waited
+    `flush_seconds`, and again when the process exits. If the insert
+    fails the entries are kept and retried.
+    """
+
+    def __init__(self, bind: Engine, max_entries: int = 500, flush_seconds: float = 1.0):
+        self.bind = bind
+        self.max_entries = max_entries
+        self.flush_seconds = flush_seconds
+        self._entries: List[Dict[str, object]] = []
+        self._oldest: Optional[float] = None
+        self._condition = Condition()
+        self._closed = False
+        self._stats = {"logged": 0, "written": 0, "flushes": 0, "errors": 0}
+        self._thread = Thread(target=self._run, name="audit-buffer", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {**self._stats, "pending": len(self._entries)}
+
+    def add_many(self, entries: List[Dict[str, object]]):
+        with self._condition:
+            # The thread only needs waking to start the clock or at the limit
+            wake = not self._entries
+            if wake:
+                self._oldest = time.monotonic()
+            self._entries.extend(entries)
+            self._stats["logged"] += len(entries)
+            if wake or len(self._entries) >= self.max_entries:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """Write everything waiting now; returns how many entries were written"""
+        with self._condition:
+            entries, self._entries = self._entries, []
+            self._oldest = None
+        if not entries:
+            return 0
+
+        try:
+            written = self._insert(entries)
+        except (IntegrityError, DataError):
+            # One bad entry fails the whole INSERT; write the rest one by one
+            written = self._insert_each(entries)
+        except Exception as e:
+            print(f"Audit log flush of {len(entries)} entries failed, will retry: {e}")
+            with self._condition:
+                self._entries[:0] = entries
+                self._oldest = time.monotonic()
+                self._stats["errors"] += 1
+            return 0
+
+        with self._condition:
+            self._stats["written"] += written
+            self._stats["flushes"] += 1
+        return written
+
+    def close(self):
+        """Stop the background thread and write whatever is left"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=self.flush_seconds + 5)
+        self.flush()
+
+    def _insert(self, entries: List[Dict[str, object]]) -> int:
+        with self.bind.begin() as connection:
+            for start in range(0, len(entries), self.max_entries):
+                connection.execute(
+                    insert(AuditLog.__table__).values(entries[start:start + self.max_entries])
+                )
+        return len(entries)
+
+    def _insert_each(self, entries: List[Dict[str, object]]) -> int:
+        written = 0
+        for entry in entries:
+            try:
+                written += self._insert([entry])
+            except (IntegrityError, DataError) as e:
+                print(f"Audit log entry {entry['action']} {entry['id']} could not be written: {e}")
+        return written
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if len(self._entries) >= self.max_entries:
+                        break
+                    if self._oldest is not None:
+                        remaining = self._oldest + self.flush_seconds - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            if not self.flush():
+                # The database is unreachable; give it a moment before retrying
+                with self._condition:
+                    if not self._closed:
+                        self._condition.wait(self.flush_seconds)
+
+
+# Singleton instance, started on first use so each worker process has its own
+_audit_buffer = None
+_audit_buffer_lock = Lock()
+
+
+def get_audit_buffer() -> AuditBuffer:
+    """Get the process-wide write-behind audit buffer"""
+    global _audit_buffer
+    with _audit_buffer_lock:
+        if _audit_buffer is None:
+            _audit_buffer = AuditBuffer(
+                engine,
+                max_entries=settings.AUDIT_FLUSH_MAX_ENTRIES,
+                flush_seconds=settings.AUDIT_FLUSH_SECONDS
+            )
+            atexit.register(_audit_buffer.close)
+        return _audit_buffer
+
+
+def flush_audit_buffer():
+    """Write any buffered audit entries (e.g. before a worker process exits)"""
+    if _audit_buffer is not None:
+        _audit_buffer.close()
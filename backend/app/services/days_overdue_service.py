@@ -0,0 +1,77 @@
+"""
+Days Overdue Service - Set-based recomputation of invoices.days_overdue
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, func, literal, select, update
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+import time
+
+from app.core.config import settings
+from app.models.invoice import Invoice, InvoiceStatus
+
+
+@dataclass
+class DaysOverdueRun:
+    """Outcome of a days_overdue recomputation"""
+    scanned: int = 0  # Unpaid invoices examined
+    updated: int = 0  # Rows whose value actually changed
+    chunks: int = 0
+    duration_seconds: float = 0.0
+
+
+class DaysOverdueService:
+    """
+    Service for recomputing days_overdue on every unpaid invoice
+
+    Instead of loading invoices into the ORM, each chunk is a single
+    UPDATE ... SET days_overdue = GREATEST(today - due_date, 0) over the next
+    `chunk_size` unpaid invoices in id order (keyset, so no OFFSET scans).
+    Rows whose value is already correct are left alone, and every chunk is
+    committed on its own so row locks are held only briefly.
+    """
+
+    def __init__(self, db: Session, chunk_size: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.DAYS_OVERDUE_CHUNK_SIZE
+
+    def recalculate(self, today: Optional[date] = None) -> DaysOverdueRun:
+        today = today or date.today()
+        days_overdue = func.greatest(literal(today, Date) - Invoice.due_date, 0)
+
+        run = DaysOverdueRun()
+        start = time.perf_counter()
+        last_id = None
+
+        while True:
+            chunk_query = select(Invoice.id).where(Invoice.status == InvoiceStatus.UNPAID)
+            if last_id is not None:
+                chunk_query = chunk_query.where(Invoice.id > last_id)
+            chunk = chunk_query.order_by(Invoice.id).limit(self.chunk_size).cte("chunk")
+
+            updated = update(Invoice).where(
+                Invoice.id == chunk.c.id,
+                Invoice.days_overdue != days_overdue
+            ).values(days_overdue=days_overdue).returning(Invoice.id).cte("updated")
+
+            # One round trip: update the chunk and report where it ended
+            last_id, scanned, changed = self.db.execute(select(
+                select(chunk.c.id).order_by(chunk.c.id.desc()).limit(1).scalar_subquery(),
+                select(func.count()).select_from(chunk).scalar_subquery(),
+                select(func.count()).select_from(updated).scalar_subquery()
+            )).one()
+            self.db.commit()
+
+            if not scanned:
+                break
+
+            run.scanned += scanned
+            run.updated += changed
+            run.chunks += 1
+
+            if scanned < self.chunk_size:
+                break
+
+        run.duration_seconds = time.perf_counter() - start
+        return run
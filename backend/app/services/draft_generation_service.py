@@ -1,25 +1,39 @@
 """
 Draft Generation Service - Automatically creates reminder drafts for overdue invoices
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, func
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from decimal import Decimal
 
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.reminder import ReminderDraft, ReminderTone, ReminderStatus
 from app.models.settings import ReminderSettings
 from app.models.client import Client
-from app.services.ai_service import get_ai_service
+from app.core.config import settings as app_settings
+from app.services.ai_service import AIService, get_ai_service
+from app.services.reminder_template_service import ReminderTemplateService, invoice_reference
+
+
+@dataclass
+class PendingDraft:
+    """A draft whose parameters are decided but whose text isn't generated yet"""
+    invoice: Invoice
+    days_overdue: int
+    escalation_level: int
+    tone: ReminderTone
+    ai_request: dict  # Keyword arguments for AIService.generate_reminder_email
 
 
 class DraftGenerationService:
     """Service for automatically generating payment reminder drafts"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, ai_service: Optional[AIService] = None):
         self.db = db
-        self.ai_service = get_ai_service()
+        self.ai_service = ai_service or get_ai_service()
+        self.template_service = ReminderTemplateService(db, self.ai_service)
 
     def generate_drafts_for_overdue_invoices(
         self,
@@ -38,6 +52,29 @@ class DraftGenerationService:
         Returns:
             List of created ReminderDraft objects
         """
+        created_drafts = list(self.iter_drafts_for_overdue_invoices(
+            business_id,
+            max_drafts=max_drafts,
+            manual_trigger=manual_trigger
+        ))
+
+        # All drafts are written in a single commit
+        self.db.commit()
+        return created_drafts
+
+    def iter_drafts_for_overdue_invoices(
+        self,
+        business_id: str,
+        max_drafts: int = 50,
+        manual_trigger: bool = False
+    ) -> Iterator[ReminderDraft]:
+        """
+        Generate reminder drafts, yielding each as soon as its email is ready
+
+        Template-rendered drafts come first, then model-written ones in the
+        order their generation finishes. Each draft is added to the session
+        but not committed; the caller decides when to commit.
+        """
         # Get or create business reminder settings
         settings = self.db.query(ReminderSettings).filter(
             ReminderSettings.business_id == business_id
@@ -61,39 +98,98 @@ class DraftGenerationService:
         # For automatic scheduled runs, check if auto_send is enabled
         # For manual triggers (button click), always proceed
         if not manual_trigger and not settings.auto_send_enabled:
-            return []
+            return
 
-        # Find overdue invoices that need reminders
+        # Find overdue invoices that need reminders, with their client,
+        # business and sent-reminder count loaded in the same query
         overdue_invoices = self._find_overdue_invoices_needing_reminders(
             business_id,
             max_drafts
         )
 
-        created_drafts = []
-        for invoice in overdue_invoices:
+        # Work out each draft's parameters first
+        pending = []
+        for invoice, previous_reminders in overdue_invoices:
             try:
-                draft = self._create_draft_for_invoice(invoice, settings)
-                if draft:
-                    created_drafts.append(draft)
+                pending.append(self._prepare_draft(invoice, previous_reminders, settings))
             except Exception as e:
                 # Log error but continue processing other invoices
                 print(f"Error creating draft for invoice {invoice.id}: {e}")
                 continue
 
-        self.db.commit()
-        return created_drafts
+        # Routine early-stage reminders are rendered from stored templates;
+        # only the rest need a model call of their own
+        needs_ai = []
+        for draft in pending:
+            if not self._uses_template(draft):
+                needs_ai.append(draft)
+                continue
+
+            try:
+                email_content = self.template_service.render(
+                    draft.invoice,
+                    draft.invoice.client.business,
+                    draft.tone,
+                    draft.escalation_level,
+                    draft.days_overdue
+                )
+            except Exception as e:
+                print(f"Template error for invoice {draft.invoice.id}, using AI: {e}")
+                needs_ai.append(draft)
+                continue
+
+            yield self._add_draft(draft, email_content, settings)
+
+        # Generate the remaining emails concurrently, as they finish
+        results = self.ai_service.iter_reminder_emails([draft.ai_request for draft in needs_ai])
+        for index, email_content in results:
+            draft = needs_ai[index]
+            if isinstance(email_content, Exception):
+                print(f"AI service error: {email_content}")
+                # Fall back to template if AI fails
+                email_content = self._generate_fallback_email(
+                    draft.invoice,
+                    draft.days_overdue,
+                    draft.escalation_level
+                )
+
+            yield self._add_draft(draft, email_content, settings)
 
     def _find_overdue_invoices_needing_reminders(
         self,
         business_id: str,
         limit: int
-    ) -> List[Invoice]:
-        """Find invoices that are overdue and need reminder drafts"""
+    ) -> List[Tuple[Invoice, int]]:
+        """
+        Find invoices that are overdue and need reminder drafts
+
+        Returns:
+            (invoice, previous reminders sent) pairs, with each invoice's
+            client and business already loaded
+        """
 
         today = datetime.utcnow().date()
 
+        # Sent reminders per invoice of this business, counted in one pass
+        sent_counts = self.db.query(
+            ReminderDraft.invoice_id,
+            func.count(ReminderDraft.id).label("sent")
+        ).join(Invoice).join(Client).filter(
+            and_(
+                Client.business_id == business_id,
+                ReminderDraft.status == ReminderStatus.SENT
+            )
+        ).group_by(ReminderDraft.invoice_id).subquery()
+
         # Query for overdue, unpaid invoices
-        query = self.db.query(Invoice).join(Client).filter(
+        query = self.db.query(
+            Invoice,
+            func.coalesce(sent_counts.c.sent, 0)
+        ).join(Client).outerjoin(
+            sent_counts, sent_counts.c.invoice_id == Invoice.id
+        ).options(
+            contains_eager(Invoice.client).joinedload(Client.business)
+        ).filter(
             and_(
                 Client.business_id == business_id,
                 Invoice.status == InvoiceStatus.UNPAID,
@@ -102,26 +198,38 @@ class DraftGenerationService:
             )
         )
 
-        # Exclude invoices that already have pending/scheduled drafts
-        # (we only want to create new drafts for invoices without active reminders)
+        # Exclude invoices that already have pending/scheduled/queued drafts
+        # (we only want to create new drafts for invoices without active reminders;
+        # queued covers drafts waiting on, retrying or deferred by the mail queue)
         query = query.filter(
             ~Invoice.reminder_drafts.any(
                 ReminderDraft.status.in_([
                     ReminderStatus.PENDING,
                     ReminderStatus.APPROVED,
-                    ReminderStatus.SCHEDULED
+                    ReminderStatus.SCHEDULED,
+                    ReminderStatus.QUEUED
                 ])
             )
         )
 
-        return query.limit(limit).all()
+        return [(invoice, sent) for invoice, sent in query.limit(limit).all()]
 
-    def _create_draft_for_invoice(
+    def _uses_template(self, pending: PendingDraft) -> bool:
+        """Whether a draft is routine enough to be rendered from a template"""
+        return (
+            app_settings.REMINDER_TEMPLATE_MODE_ENABLED
+            and pending.escalation_level <= app_settings.REMINDER_TEMPLATE_MAX_LEVEL
+            # Relationship notes call for a personalised email
+            and not pending.invoice.client.relationship_notes
+        )
+
+    def _prepare_draft(
         self,
         invoice: Invoice,
+        previous_reminders: int,
         settings: ReminderSettings
-    ) -> Optional[ReminderDraft]:
-        """Create a reminder draft for a specific invoice"""
+    ) -> PendingDraft:
+        """Work out the escalation, tone and AI prompt inputs for an invoice"""
 
         # Calculate days overdue
         days_overdue = (datetime.utcnow().date() - invoice.due_date).days
@@ -135,20 +243,15 @@ class DraftGenerationService:
         # Determine appropriate tone
         tone = self._determine_tone(escalation_level, settings)
 
-        # Count previous reminders sent
-        previous_reminders = self.db.query(ReminderDraft).filter(
-            and_(
-                ReminderDraft.invoice_id == invoice.id,
-                ReminderDraft.status == ReminderStatus.SENT
-            )
-        ).count()
-
         # Get business info from invoice
         business = invoice.client.business
 
-        # Generate email content using AI
-        try:
-            email_content = self.ai_service.generate_reminder_email(
+        return PendingDraft(
+            invoice=invoice,
+            days_overdue=days_overdue,
+            escalation_level=escalation_level,
+            tone=tone,
+            ai_request=dict(
                 client_name=invoice.client.name,
                 client_email=invoice.client.email,
                 invoice_amount=invoice.amount,
@@ -161,20 +264,21 @@ class DraftGenerationService:
                 relationship_notes=invoice.client.relationship_notes,
                 previous_reminders_sent=previous_reminders
             )
-        except Exception as e:
-            print(f"AI service error: {e}")
-            # Fall back to template if AI fails
-            email_content = self._generate_fallback_email(
-                invoice,
-                days_overdue,
-                escalation_level
-            )
+        )
+
+    def _add_draft(
+        self,
+        pending: PendingDraft,
+        email_content: dict,
+        settings: ReminderSettings
+    ) -> ReminderDraft:
+        """Create a reminder draft from generated email content"""
 
         # Create draft
         draft = ReminderDraft(
-            invoice_id=invoice.id,
-            tone=tone,
-            escalation_level=escalation_level,
+            invoice_id=pending.invoice.id,
+            tone=pending.tone,
+            escalation_level=pending.escalation_level,
             subject=email_content["subject"],
             body_text=email_content["body"],
             status=ReminderStatus.PENDING,
@@ -182,7 +286,7 @@ class DraftGenerationService:
         )
 
         # If auto-send is enabled and auto-approve is enabled, schedule it
-        if settings.auto_send_enabled and settings.auto_approve_stage_1 and escalation_level == 1:
+        if settings.auto_send_enabled and settings.auto_approve_stage_1 and pending.escalation_level == 1:
             draft.status = ReminderStatus.SCHEDULED
             draft.approved = True
             # Schedule for next day at 9am
@@ -236,6 +340,8 @@ class DraftGenerationService:
         client_name = invoice.client.name
         amount = f"£{invoice.amount:,.2f}"
         due_date = invoice.due_date.strftime("%d %B %Y")
+        reference = invoice_reference(invoice)
+        Reference = reference[:1].upper() + reference[1:]
 
         if escalation_level == 1:
             subject = f"Friendly Reminder: Invoice Payment Due"
@@ -243,7 +349,7 @@ class DraftGenerationService:
 
 I hope this email finds you well.
 
-This is a friendly reminder that invoice #{invoice.invoice_number} for {amount} was due on {due_date} ({days_overdue} days ago).
+This is a friendly reminder that {reference} for {amount} was due on {due_date} ({days_overdue} days ago).
 
 If you've already sent payment, please disregard this message. Otherwise, I'd appreciate it if you could process payment at your earliest convenience.
 
@@ -252,10 +358,10 @@ Please let me know if you have any questions.
 Best regards"""
 
         elif escalation_level == 2:
-            subject = f"Payment Reminder: Invoice #{invoice.invoice_number}"
+            subject = f"Payment Reminder: {Reference}"
             body = f"""Dear {client_name},
 
-I'm writing to follow up on invoice #{invoice.invoice_number} for {amount}, which was due on {due_date}.
+I'm writing to follow up on {reference} for {amount}, which was due on {due_date}.
 
 The payment is now {days_overdue} days overdue. Please arrange payment as soon as possible.
 
@@ -267,7 +373,7 @@ Best regards"""
             subject = f"Urgent: Overdue Payment Required"
             body = f"""Dear {client_name},
 
-Invoice #{invoice.invoice_number} for {amount} is now {days_overdue} days overdue (due date: {due_date}).
+{Reference} for {amount} is now {days_overdue} days overdue (due date: {due_date}).
 
 Please arrange immediate payment to avoid any service interruption or late fees.
 
@@ -279,7 +385,7 @@ Best regards"""
             subject = f"Final Notice: Payment Required"
             body = f"""Dear {client_name},
 
-This is a final notice regarding invoice #{invoice.invoice_number} for {amount}, which is now {days_overdue} days overdue.
+This is a final notice regarding {reference} for {amount}, which is now {days_overdue} days overdue.
 
 Payment must be received immediately to avoid escalation to collections.
 
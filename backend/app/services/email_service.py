@@ -1,8 +1,8 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
 from app.models.user import User
+from app.services.smtp_pool import get_smtp_pool
 
 
 class EmailService:
@@ -20,19 +20,12 @@ class EmailService:
         Raises:
             Exception: If email sending fails
         """
-        # Create message
-        message = MIMEMultipart()
-        message['From'] = from_user.email
-        message['To'] = to_email
-        message['Subject'] = "Invoice reminder"
-
-        # Add body
-        message.attach(MIMEText(body, 'plain'))
+        message = self.build_message(to_email, from_user.email, body)
 
         try:
             # Use SMTP fallback (Gmail SMTP)
             # For production, implement Gmail OAuth flow
-            if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            if self.is_configured():
                 self._send_via_smtp(message, to_email)
             else:
                 raise ValueError("Email credentials not configured")
@@ -40,12 +33,30 @@ class EmailService:
         except Exception as e:
             raise Exception(f"Failed to send email: {str(e)}")
 
+    def is_configured(self) -> bool:
+        """Whether there are credentials to send email with"""
+        return bool(settings.SMTP_USER and settings.SMTP_PASSWORD)
+
+    def build_message(
+        self,
+        to_email: str,
+        from_email: str,
+        body: str,
+        subject: str = "Invoice reminder"
+    ) -> MIMEMultipart:
+        """Build a plain-text reminder email"""
+        message = MIMEMultipart()
+        message['From'] = from_email
+        message['To'] = to_email
+        message['Subject'] = subject
+
+        # Add body
+        message.attach(MIMEText(body, 'plain'))
+        return message
+
     def _send_via_smtp(self, message: MIMEMultipart, to_email: str):
-        """Send email via SMTP"""
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.send_message(message)
+        """Send email via SMTP, over a warm pooled session"""
+        get_smtp_pool().send(message)
 
     def _send_via_gmail_oauth(self, message: MIMEMultipart, to_email: str):
         """
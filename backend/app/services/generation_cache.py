@@ -0,0 +1,169 @@
+"""
+Generation Cache - Content-addressed cache for AI-generated reminder emails
+"""
+from collections import OrderedDict
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, List, Optional
+import hashlib
+import json
+import time
+
+import redis
+
+from app.core.config import settings
+
+
+# Bump when the prompt changes so earlier generations are no longer served
+PROMPT_VERSION = 1
+
+KEY_PREFIX = "payflow:reminder-email"
+
+# How long to stop using Redis after it fails, rather than paying a
+# connection timeout on every generation
+REDIS_RETRY_SECONDS = 30.0
+
+
+def _normalise_text(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+
+def cache_key(inputs: dict, model: str) -> str:
+    """
+    Hash the prompt inputs of a reminder email into a cache key
+
+    Inputs are normalised first (whitespace collapsed, amounts to pence,
+    dates as ISO strings) so that equivalent requests share an entry. The
+    model (a router model id, e.g. "openai:gpt-4o") and prompt version are
+    part of the key.
+    """
+    normalised = {
+        "client_name": _normalise_text(inputs["client_name"]),
+        "client_email": inputs["client_email"].strip().lower(),
+        "invoice_amount": str(Decimal(inputs["invoice_amount"]).quantize(Decimal("0.01"))),
+        "due_date": inputs["due_date"].isoformat(),
+        "days_overdue": int(inputs["days_overdue"]),
+        "tone": getattr(inputs["tone"], "value", inputs["tone"]),
+        "escalation_level": int(inputs["escalation_level"]),
+        "business_name": _normalise_text(inputs["business_name"]),
+        "industry_type": _normalise_text(inputs["industry_type"]),
+        "relationship_notes": _normalise_text(inputs.get("relationship_notes")),
+        "previous_reminders_sent": int(inputs.get("previous_reminders_sent", 0)),
+        "model": model,
+        "prompt_version": PROMPT_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(normalised, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{digest}"
+
+
+class GenerationCache:
+    """
+    Two-level cache of generated emails: an in-process LRU in front of Redis
+
+    Local entries expire after the same TTL as Redis entries and the LRU is
+    capped at `local_max_entries`. Redis failures are counted and treated as
+    misses, so generation never depends on the cache being up.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl_seconds: int,
+        local_max_entries: int
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.local_max_entries = local_max_entries
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self._redis = redis.Redis.from_url(
+            redis_url,
+            socket_timeout=0.2,
+            socket_connect_timeout=0.2
+        )
+        self._redis_retry_at = 0.0
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "redis_errors": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Look a generation up locally, then in Redis"""
+        return self.get_any([key])
+
+    def get_any(self, keys: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Look up several keys for the same request, preferring earlier ones
+
+        Counts as a single lookup. The keys are checked locally first, then
+        in Redis with one round trip.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._local.get(key)
+                if entry and entry[0] > now:
+                    self._local.move_to_end(key)
+                    self._stats["local_hits"] += 1
+                    return entry[1]
+                if entry:
+                    del self._local[key]
+
+        cached = self._redis_call(self._redis.mget, keys) if keys else None
+        for key, value in zip(keys, cached or []):
+            if value is not None:
+                value = json.loads(value)
+                self._store_local(key, value)
+                self._count("redis_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, str]):
+        """Store a generation in both levels"""
+        self._store_local(key, value)
+        self._redis_call(self._redis.set, key, json.dumps(value), ex=self.ttl_seconds)
+        self._count("stores")
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters since the process started"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["local_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _store_local(self, key: str, value: Dict[str, str]):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _redis_call(self, method, *args, **kwargs):
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            return method(*args, **kwargs)
+        except redis.RedisError as e:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            self._count("redis_errors")
+            print(f"Generation cache: Redis unavailable, using local cache only: {e}")
+            return None
+
+
+# Singleton instance
+_generation_cache = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """Get or create the generation cache instance"""
+    global _generation_cache
+    if _generation_cache is None:
+        _generation_cache = GenerationCache(
+            redis_url=settings.REDIS_URL,
+            ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+            local_max_entries=settings.GENERATION_CACHE_LOCAL_MAX_ENTRIES
+        )
+    return _generation_cache
@@ -0,0 +1,344 @@
+"""
+Invoice Import Service - Streams CSV/Excel uploads into invoices in bounded batches
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from contextlib import contextmanager
+from itertools import islice
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from decimal import Decimal
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+import codecs
+import csv
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+from app.core.config import settings
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus, ExternalSource
+from app.services.invoice_validation import ParsedRow, validate_rows
+from app.services.receivables_summary_service import ReceivablesSummaryService
+
+
+REQUIRED_FIELDS = {'client_name', 'client_email', 'amount', 'due_date'}
+EXCEL_EXTENSIONS = {'xlsx', 'xls'}
+
+# Bytes read from the upload per chunk, and rows written per INSERT
+READ_CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 1000
+
+# Rows validated together, column by column
+VALIDATION_CHUNK_ROWS = 1000
+
+# Only the first few errors are reported back, so don't keep the rest
+MAX_REPORTED_ERRORS = 10
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an invoice import"""
+    success: int = 0
+    failed: int = 0
+    duplicates: int = 0  # Valid rows skipped because they were already imported
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.success + self.failed + self.duplicates
+
+    def add_error(self, row_num: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Row {row_num}: {message}")
+
+
+def _iter_text_lines(fileobj: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Decode a binary file chunk by chunk, yielding one line at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+
+    while True:
+        chunk = fileobj.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+
+        # Keep the trailing partial line until the next chunk completes it
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+
+        if not chunk:
+            break
+
+    if pending:
+        yield pending
+
+
+def _cell_to_str(value) -> str:
+    """Normalise an Excel cell value to the string form used by CSV rows"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _excel_row_to_strs(values) -> Optional[List[str]]:
+    """Convert a sheet row to CSV-style strings, or None if the row is blank"""
+    cells = [_cell_to_str(v) for v in values]
+    if not any(c.strip() for c in cells):
+        return None
+    return cells
+
+
+def _validate_chunks(headers: List[str], rows: Iterable[Tuple[int, List[str]]]) -> Iterator[ParsedRow]:
+    """Group (row_number, cells) pairs into chunks and validate each column by column"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, VALIDATION_CHUNK_ROWS))
+        if not chunk:
+            break
+
+        row_nums, cells = zip(*chunk)
+        yield from validate_rows(headers, row_nums, cells)
+
+
+def _iter_csv_rows(fileobj: BinaryIO) -> Tuple[List[str], Iterator[ParsedRow]]:
+    """Lazily parse and validate CSV rows from a binary file"""
+    reader = csv.reader(_iter_text_lines(fileobj))
+    headers = next(reader, [])
+
+    # Like csv.DictReader, skip blank lines without counting them
+    rows = enumerate(filter(None, reader), start=2)
+    return headers, _validate_chunks(headers, rows)
+
+
+def _excel_headers(worksheet) -> List[str]:
+    header_row = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), None)
+    if header_row is None:
+        raise ValueError("Excel file is empty")
+
+    return [str(h).lower().strip() for h in header_row]
+
+
+def _excel_rows(worksheet, min_row: int, max_row: Optional[int] = None) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (row_number, cells) for the non-blank rows of a sheet range"""
+    values = worksheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+    for row_num, row in enumerate(values, start=min_row):
+        cells = _excel_row_to_strs(row)
+        if cells is not None:
+            yield row_num, cells
+
+
+def _iter_excel_rows(worksheet, headers: List[str]) -> Iterator[ParsedRow]:
+    """Lazily parse and validate rows from a read-only worksheet"""
+    return _validate_chunks(headers, _excel_rows(worksheet, min_row=2))
+
+
+@contextmanager
+def open_upload(fileobj: BinaryIO, file_extension: str):
+    """
+    Open an uploaded file for streaming
+
+    Yields a (headers, rows) tuple, where rows is a generator of validated
+    (row_number, record, error) triples: record is None when the row is
+    invalid and error holds the reason. Nothing beyond the current chunk is
+    held in memory. Excel files are staged to disk because openpyxl needs a
+    path, then read in a single streaming pass.
+
+    Raises:
+        ValueError: If the file cannot be read
+    """
+    if file_extension not in EXCEL_EXTENSIONS:
+        yield _iter_csv_rows(fileobj)
+        return
+
+    from openpyxl import load_workbook
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as tmp:
+        shutil.copyfileobj(fileobj, tmp, READ_CHUNK_SIZE)
+        tmp_path = tmp.name
+
+    wb = None
+    try:
+        try:
+            wb = load_workbook(tmp_path, read_only=True)
+            worksheet = wb.active
+            headers = _excel_headers(worksheet)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(str(e))
+
+        yield headers, _iter_excel_rows(worksheet, headers)
+    finally:
+        if wb is not None:
+            wb.close()
+        os.unlink(tmp_path)
+
+
+def hash_upload(fileobj: BinaryIO) -> str:
+    """SHA-256 of an upload's content, leaving the file rewound for parsing"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(READ_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def stage_upload(fileobj: BinaryIO, job_id: UUID, file_extension: str) -> Tuple[str, str]:
+    """
+    Copy an upload into the shared staging directory for a background import
+
+    Returns:
+        (staged_path, sha256) - the content is hashed while it is copied
+    """
+    os.makedirs(settings.IMPORT_STAGING_DIR, exist_ok=True)
+    staged_path = os.path.join(settings.IMPORT_STAGING_DIR, f"{job_id}.{file_extension}")
+
+    digest = hashlib.sha256()
+    with open(staged_path, 'wb') as staged:
+        for chunk in iter(lambda: fileobj.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            staged.write(chunk)
+
+    return staged_path, digest.hexdigest()
+
+
+def row_fingerprint(business_id, record: dict) -> str:
+    """
+    Identity of an uploaded invoice within a business
+
+    Built from the client email, invoice number, amount and due date, so the
+    same ledger row maps to the same fingerprint however often it is uploaded.
+    """
+    key = "|".join((
+        str(business_id),
+        record["client_email"],
+        record["invoice_number"] or "",
+        str(record["amount"].quantize(Decimal('0.01'))),
+        record["due_date"].isoformat()
+    ))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class InvoiceImportService:
+    """Service for importing uploaded invoice rows in bounded batches"""
+
+    def __init__(self, db: Session, business_id, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.business_id = business_id
+        self.batch_size = batch_size
+        self.summary_service = ReceivablesSummaryService(db)
+
+    def import_rows(
+        self,
+        rows: Iterable[ParsedRow],
+        on_batch: Optional[Callable[[ImportResult], None]] = None
+    ) -> ImportResult:
+        """
+        Write validated rows in batches of `batch_size` invoices
+
+        The caller owns the transaction and is responsible for committing.
+
+        Args:
+            rows: (row_number, record, error) triples, e.g. from open_upload()
+            on_batch: Called with the running result after each batch is written
+        """
+        result = ImportResult()
+        batch = []
+
+        for row_num, record, error in rows:
+            if error:
+                result.add_error(row_num, error)
+                continue
+
+            batch.append((row_num, record))
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch, result)
+                batch = []
+                if on_batch:
+                    on_batch(result)
+
+        if batch:
+            self._write_batch(batch, result)
+        if on_batch:
+            on_batch(result)
+
+        return result
+
+    def _write_batch(self, batch: List[Tuple[int, dict]], result: ImportResult):
+        """Resolve clients and insert invoices for a batch of parsed rows"""
+        client_ids = self._resolve_clients(batch)
+        today = date.today()
+
+        invoice_rows = [
+            {
+                "client_id": client_ids[record["client_email"]],
+                "business_id": self.business_id,
+                "invoice_number": record["invoice_number"],
+                "amount": record["amount"],
+                "due_date": record["due_date"],
+                "external_source": ExternalSource.MANUAL,
+                "status": InvoiceStatus.UNPAID,
+                "days_overdue": max((today - record["due_date"]).days, 0),
+                "import_fingerprint": row_fingerprint(self.business_id, record)
+            }
+            for _, record in batch
+        ]
+
+        # One multi-row upsert per batch: rows already imported (by an earlier
+        # upload or earlier in this file) are skipped by the fingerprint index
+        stmt = pg_insert(Invoice).on_conflict_do_nothing(
+            index_elements=[Invoice.import_fingerprint]
+        ).returning(Invoice.amount, Invoice.days_overdue)
+        inserted = self.db.execute(stmt, invoice_rows).all()
+        result.success += len(inserted)
+        result.duplicates += len(invoice_rows) - len(inserted)
+
+        self.summary_service.invoices_added(
+            self.business_id,
+            ((InvoiceStatus.UNPAID, amount, days_overdue) for amount, days_overdue in inserted)
+        )
+
+    def _resolve_clients(self, batch: List[Tuple[int, dict]]) -> Dict[str, UUID]:
+        """
+        Map every client email in the batch to a client id
+
+        Existing clients are fetched with a single IN query and any missing
+        ones are created with a single bulk INSERT.
+        """
+        names = {}
+        for _, record in batch:
+            names.setdefault(record["client_email"], record["client_name"])
+
+        client_ids = dict(
+            self.db.query(Client.email, Client.id).filter(
+                Client.business_id == self.business_id,
+                Client.email.in_(list(names))
+            ).all()
+        )
+
+        new_clients = [
+            {
+                "id": uuid.uuid4(),
+                "business_id": self.business_id,
+                "name": name,
+                "email": email
+            }
+            for email, name in names.items()
+            if email not in client_ids
+        ]
+        if new_clients:
+            self.db.execute(insert(Client), new_clients)
+            client_ids.update((c["email"], c["id"]) for c in new_clients)
+
+        return client_ids
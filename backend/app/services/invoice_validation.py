@@ -0,0 +1,161 @@
+"""
+Invoice Validation - Columnar validation and normalisation of upload rows
+"""
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
+
+
+# Largest value that fits the invoices.amount NUMERIC(10, 2) column
+MAX_AMOUNT = Decimal('99999999.99')
+
+# Accepted due_date layouts, as shown to the user in error messages
+DATE_FORMATS_HINT = "YYYY-MM-DD, DD/MM/YYYY or DD Mon YYYY"
+
+_AMOUNT_RE = re.compile(r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?')
+_EMAIL_RE = re.compile(r'[^@\s]+@[^@\s.]+(?:\.[^@\s.]+)+')
+
+# One pattern covers every supported layout, so each value is matched once
+# instead of being tried against formats in turn:
+#   groups 1-3: YYYY-MM-DD (also / or . separated)
+#   groups 4-6: DD/MM/YYYY (also - or . separated)
+#   groups 7-9: DD Mon YYYY / DD-Month-YYYY
+_DATE_RE = re.compile(
+    r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})'
+    r'|(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})'
+    r'|(\d{1,2})[ -]([A-Za-z]{3,9}),?[ -](\d{4})'
+)
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'],
+        start=1
+    )
+}
+
+_COLUMNS = ('client_name', 'client_email', 'amount', 'due_date', 'invoice_number')
+
+# (row_number, record, error) - record is None when the row failed validation
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+@lru_cache(maxsize=4096)
+def parse_due_date(value: str) -> Optional[date]:
+    """Parse a due date in any supported layout, or None if it isn't one"""
+    match = _DATE_RE.fullmatch(value)
+    if not match:
+        return None
+
+    iso_y, iso_m, iso_d, uk_d, uk_m, uk_y, long_d, long_mon, long_y = match.groups()
+    if iso_y:
+        year, month, day = iso_y, iso_m, iso_d
+    elif uk_y:
+        year, month, day = uk_y, uk_m, uk_d
+    else:
+        year, month, day = long_y, _MONTHS.get(long_mon[:3].lower()), long_d
+        if month is None:
+            return None
+
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        # Well-formed but impossible, e.g. 31/02/2026
+        return None
+
+
+@lru_cache(maxsize=65536)
+def is_valid_email(value: str) -> bool:
+    """Cheap structural email check (ledgers repeat a small set of clients)"""
+    return _EMAIL_RE.fullmatch(value) is not None
+
+
+def _parse_amounts(values: Sequence[str]) -> List[Optional[Decimal]]:
+    """Parse an amount column, returning None where a value is invalid"""
+    cleaned = [v.replace('£', '').replace(',', '').strip() for v in values]
+
+    # Plain decimals ("1250.50", "-3") pass a cheap string-method mask; only
+    # the rest (exponents, junk) are checked against the full pattern
+    plain = [
+        (v[1:] if v.startswith(('+', '-')) else v).replace('.', '', 1).isdecimal()
+        for v in cleaned
+    ]
+    amounts = [
+        Decimal(v) if ok or _AMOUNT_RE.fullmatch(v) else None
+        for v, ok in zip(cleaned, plain)
+    ]
+
+    # Rows are inserted in bulk, so reject values the column would refuse
+    # rather than failing the whole batch
+    return [a if a is not None and -MAX_AMOUNT <= a <= MAX_AMOUNT else None for a in amounts]
+
+
+def validate_columns(
+    row_nums: Sequence[int],
+    columns: Dict[str, Sequence[str]]
+) -> List[ParsedRow]:
+    """
+    Validate a chunk of upload rows one column at a time
+
+    Each column is parsed in a single pass and reduced to a per-row error
+    mask; the masks are then combined into (row_number, record, error)
+    triples in the original row order.
+
+    Args:
+        row_nums: File row number of each row, used in error messages
+        columns: Raw string values keyed by column name
+    """
+    amounts = _parse_amounts(columns['amount'])
+    due_dates = list(map(parse_due_date, map(str.strip, columns['due_date'])))
+    names = list(map(str.strip, columns['client_name']))
+    emails = list(map(str.lower, map(str.strip, columns['client_email'])))
+    email_ok = list(map(is_valid_email, emails))
+    invoice_numbers = columns.get('invoice_number') or [''] * len(row_nums)
+
+    date_error = f"Invalid date format (use {DATE_FORMATS_HINT})"
+
+    results = []
+    for row_num, amount, due_date, name, email, valid_email, invoice_number in zip(
+        row_nums, amounts, due_dates, names, emails, email_ok, invoice_numbers
+    ):
+        if amount is None:
+            results.append((row_num, None, "Invalid amount format"))
+        elif due_date is None:
+            results.append((row_num, None, date_error))
+        elif not name or not email:
+            results.append((row_num, None, "Client name and email are required"))
+        elif not valid_email:
+            results.append((row_num, None, "Invalid client email"))
+        else:
+            results.append((row_num, {
+                "client_name": name,
+                "client_email": email,
+                "amount": amount,
+                "due_date": due_date,
+                "invoice_number": invoice_number.strip() or None,
+            }, None))
+
+    return results
+
+
+def validate_rows(headers: Sequence[str], row_nums: Sequence[int], rows: Sequence[Sequence[str]]) -> List[ParsedRow]:
+    """Transpose a chunk of rows into the columns we validate"""
+    positions = {header: index for index, header in enumerate(headers)}
+
+    # Pad short rows once so every column can be pulled out with itemgetter
+    width = len(headers)
+    if rows and min(map(len, rows)) < width:
+        rows = [list(row) + [''] * (width - len(row)) for row in rows]
+
+    columns = {}
+    for name in _COLUMNS:
+        index = positions.get(name)
+        if index is None:
+            columns[name] = [''] * len(rows)
+        else:
+            columns[name] = list(map(itemgetter(index), rows))
+
+    return validate_columns(row_nums, columns)
@@ -0,0 +1,402 @@
+"""
+Model Backends - Pluggable chat-completion backends for AIService
+"""
+from abc import ABC, abstractmethod
+import anthropic
+import openai
+from openai import OpenAI
+from threading import Lock
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+from app.core.config import settings
+
+
+class ModelBackendError(Exception):
+    """
+    A model call failed at the provider
+
+    status_code is the HTTP status (e.g. 429, 503), or None when no
+    response arrived at all. retry_after is the provider's requested wait
+    in seconds, if it sent one.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ModelTimeoutError(ModelBackendError):
+    """A model call didn't finish within its timeout"""
+
+
+class ModelBackend(ABC):
+    """
+    A chat-completion model that answers in JSON
+
+    AIService builds the prompts and parses the replies; backends only
+    carry a list of chat messages to a model and return the reply text.
+    """
+
+    model = "unknown"
+
+    @abstractmethod
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Send a prompt and return the reply text
+
+        Raises:
+            ModelBackendError: If the provider fails or `timeout` passes
+        """
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for the calls made so far; empty if the backend keeps none"""
+        return {}
+
+
+class OpenAIBackend(ModelBackend):
+    """OpenAI chat completions, or any server speaking the same API"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        timeout: float,
+        base_url: Optional[str] = None,
+        max_retries: int = 2
+    ):
+        self.model = model
+        self.client = OpenAI(api_key=api_key, timeout=timeout, base_url=base_url, max_retries=max_retries)
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        client = self.client if timeout is None else self.client.with_options(timeout=timeout)
+        try:
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+        except openai.APITimeoutError as e:
+            raise ModelTimeoutError(str(e)) from e
+        except openai.APIStatusError as e:
+            raise ModelBackendError(str(e), e.status_code, _retry_after(e.response.headers)) from e
+        except openai.APIConnectionError as e:
+            raise ModelBackendError(str(e)) from e
+
+        return response.choices[0].message.content
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Seconds from a Retry-After header, if it's given as a number"""
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AnthropicBackend(ModelBackend):
+    """
+    Anthropic messages API
+
+    Claude has no JSON response mode, so the reply is prefilled with "{"
+    to start it off as a JSON object.
+    """
+
+    def __init__(self, api_key: str, model: str, timeout: float, max_retries: int = 2):
+        self.model = model
+        self.client = anthropic.Anthropic(api_key=api_key, timeout=timeout, max_retries=max_retries)
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        conversation = [m for m in messages if m["role"] != "system"]
+        conversation.append({"role": "assistant", "content": "{"})
+
+        client = self.client if timeout is None else self.client.with_options(timeout=timeout)
+        try:
+            response = client.messages.create(
+                model=self.model,
+                system=system,
+                messages=conversation,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+        except anthropic.APITimeoutError as e:
+            raise ModelTimeoutError(str(e)) from e
+        except anthropic.APIStatusError as e:
+            raise ModelBackendError(str(e), e.status_code, _retry_after(e.response.headers)) from e
+        except anthropic.APIConnectionError as e:
+            raise ModelBackendError(str(e)) from e
+
+        return "{" + "".join(block.text for block in response.content if block.type == "text")
+
+
+PROVIDERS = ("openai", "anthropic")
+
+
+def default_model(provider: str) -> str:
+    """The configured model for a provider"""
+    return settings.ANTHROPIC_MODEL if provider == "anthropic" else settings.OPENAI_MODEL
+
+
+class ReplayStore:
+    """
+    Recorded model replies, keyed by a hash of the model and messages
+
+    Stored as JSON lines so recordings can be appended to safely and
+    checked in as benchmark fixtures.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._replies: Dict[str, str] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._replies[entry["key"]] = entry["reply"]
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]]) -> str:
+        payload = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._replies.get(key)
+
+    def add(self, key: str, reply: str):
+        with self._lock:
+            self._replies[key] = reply
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"key": key, "reply": reply}) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._replies)
+
+
+class RecordingBackend(ModelBackend):
+    """Pass calls through to another backend, saving every reply for replay"""
+
+    def __init__(self, backend: ModelBackend, store: ReplayStore):
+        self.backend = backend
+        self.store = store
+        self.model = backend.model
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        reply = self.backend.complete(messages, max_tokens, temperature, timeout)
+        self.store.add(ReplayStore.key(self.model, messages), reply)
+        return reply
+
+    def stats(self) -> Dict[str, object]:
+        return {**self.backend.stats(), "recorded": len(self.store)}
+
+
+_FILLER = (
+    "We value our working relationship and appreciate your prompt attention to this matter. "
+    "If payment has already been arranged, please accept our thanks and disregard this note. "
+)
+
+
+class StubBackend(ModelBackend):
+    """
+    Offline stand-in for a model, for benchmarks and local development
+
+    Replies come from a ReplayStore when one is given and it has the
+    prompt; otherwise a well-formed reply is synthesised from the prompt.
+    Each call waits `latency_ms` (plus up to `jitter_ms`, plus generation
+    time at `tokens_per_second` if set), fails with a 429/5xx at
+    `error_rate`, and times out like a real client if it would take longer
+    than its timeout.
+    """
+
+    model = "stub"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        replay: Optional[ReplayStore] = None,
+        model: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.replay = replay
+        self.model = model or self.model
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._stats = {"calls": 0, "replayed": 0, "synthesised": 0, "errors": 0, "timeouts": 0}
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return dict(self._stats)
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        with self._lock:
+            self._stats["calls"] += 1
+            fail = self._random.random() < self.error_rate
+            delay = self.latency_ms + self._random.random() * self.jitter_ms
+
+        if fail:
+            self._wait(delay, timeout)
+            status_code = self._random.choice((429, 500, 503))
+            self._count("errors")
+            raise ModelBackendError(f"Stub model error {status_code}", status_code)
+
+        reply = self.replay.get(ReplayStore.key(self.model, messages)) if self.replay else None
+        if reply is not None:
+            self._count("replayed")
+        else:
+            reply = json.dumps(self._synthesise(messages[-1]["content"]))
+            self._count("synthesised")
+
+        if self.tokens_per_second:
+            delay += len(reply) / 4 / self.tokens_per_second * 1000  # ~4 characters a token
+        self._wait(delay, timeout)
+        return reply
+
+    def _wait(self, delay_ms: float, timeout: Optional[float]):
+        if timeout is not None and delay_ms / 1000 > timeout:
+            time.sleep(timeout)
+            self._count("timeouts")
+            raise ModelTimeoutError(f"Stub model timed out after {timeout:.1f}s")
+        time.sleep(delay_ms / 1000)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _synthesise(self, prompt: str) -> dict:
+        """Build a reply in the shape AIService's prompt asks for"""
+        if '"templates"' in prompt:
+            count = int(re.search(r'Write (\d+) distinct templates', prompt).group(1))
+            return {"templates": [
+                {
+                    "subject": f"Payment reminder for {{invoice_reference}} ({n + 1})",
+                    "body": (
+                        "Dear {client_name},\n\nOur records show {invoice_reference} for {amount} was due on "
+                        "{due_date} and is now {days_overdue} days overdue. Please arrange payment at your "
+                        f"earliest convenience.\n\n{_FILLER * 3}\n\nKind regards"
+                    )
+                }
+                for n in range(count)
+            ]}
+
+        if '"emails"' in prompt:
+            invoices = json.loads(prompt.split("Invoices:\n", 1)[1].split("\n\nFormat", 1)[0])
+            return {"emails": [
+                {"id": invoice["id"], **self._email(invoice["client_name"], invoice["invoice_amount"])}
+                for invoice in invoices
+            ]}
+
+        client = re.search(r'^Client: (.*) \(', prompt, re.MULTILINE)
+        amount = re.search(r'^Invoice amount: (.*)$', prompt, re.MULTILINE)
+        return self._email(
+            client.group(1) if client else "Client",
+            amount.group(1) if amount else ""
+        )
+
+    def _email(self, client_name: str, amount: str) -> dict:
+        return {
+            "subject": f"Payment reminder: {amount} outstanding",
+            "body": (
+                f"Dear {client_name},\n\nThis is a reminder that {amount} is now overdue. "
+                f"Please arrange payment at your earliest convenience.\n\n{_FILLER * 3}\n\nKind regards"
+            )
+        }
+
+
+def create_model_backend(provider: str = "openai", model: Optional[str] = None) -> ModelBackend:
+    """
+    Build the backend for a provider, in the mode selected by AI_BACKEND
+
+    - live: the provider's API (OPENAI_BASE_URL can redirect OpenAI)
+    - record: as live, saving every reply to AI_REPLAY_FILE
+    - replay: offline, answering from AI_REPLAY_FILE where possible
+    - stub: offline, synthesising every reply
+
+    Args:
+        provider: "openai" or "anthropic"
+        model: Model name, or None for the provider's configured default
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown AI provider: {provider}")
+    model = model or default_model(provider)
+    mode = settings.AI_BACKEND
+
+    if mode in ("live", "record"):
+        # AIService retries through ResilientBackend, so the SDKs don't
+        if provider == "anthropic":
+            model_backend = AnthropicBackend(
+                api_key=settings.ANTHROPIC_API_KEY,
+                model=model,
+                timeout=settings.AI_REQUEST_TIMEOUT_SECONDS,
+                max_retries=0
+            )
+        else:
+            model_backend = OpenAIBackend(
+                api_key=settings.OPENAI_API_KEY,
+                model=model,
+                timeout=settings.AI_REQUEST_TIMEOUT_SECONDS,
+                base_url=settings.OPENAI_BASE_URL,
+                max_retries=0
+            )
+        if mode == "record":
+            model_backend = RecordingBackend(model_backend, ReplayStore(settings.AI_REPLAY_FILE))
+        return model_backend
+
+    if mode in ("replay", "stub"):
+        return StubBackend(
+            latency_ms=settings.AI_STUB_LATENCY_MS,
+            jitter_ms=settings.AI_STUB_JITTER_MS,
+            tokens_per_second=settings.AI_STUB_TOKENS_PER_SECOND,
+            error_rate=settings.AI_STUB_ERROR_RATE,
+            replay=ReplayStore(settings.AI_REPLAY_FILE) if mode == "replay" else None,
+            model=model
+        )
+
+    raise ValueError(f"Unknown AI_BACKEND: {mode}")
@@ -0,0 +1,289 @@
+"""
+Model Resilience - Deadlines, retries, circuit breaking and hedging for model calls
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Dict, List, Optional
+import random
+import time
+
+from app.core.config import settings
+from app.services.model_backends import ModelBackend, ModelBackendError, ModelTimeoutError
+from app.services.rate_limiter import TokenBucket
+
+
+# Hedging after the observed p95 needs this many recent calls to go on
+HEDGE_MIN_SAMPLES = 20
+
+
+class CircuitOpenError(ModelBackendError):
+    """The provider is considered degraded, so the call wasn't attempted"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, dropped connections, 429s and 5xxs are worth another try"""
+    if not isinstance(error, ModelBackendError) or isinstance(error, CircuitOpenError):
+        return False
+    status = error.status_code
+    return status is None or status in (408, 409, 429) or status >= 500
+
+
+class CircuitBreaker:
+    """
+    Stop calling a provider after repeated failures
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused for `reset_seconds`. Then a single trial call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = Lock()
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the trial when half open)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print("Model circuit closed, provider recovered")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if not self._trial_in_flight:
+                    print(f"Model circuit opened after {self._failures} failures")
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class ResilientBackend(ModelBackend):
+    """
+    Wraps a backend with the failure handling a remote model needs
+
+    - Every call has a deadline covering all of its attempts; each attempt
+      also has its own timeout, cut short as the deadline nears.
+    - Retryable failures (see is_retryable) are retried with full-jitter
+      exponential backoff, or after the provider's Retry-After.
+    - A CircuitBreaker refuses calls while the provider is degraded, so
+      callers fall back immediately instead of queueing up behind timeouts.
+    - With hedging on, an attempt that is still running after the hedge
+      delay gets a duplicate, and whichever answers first wins.
+
+    Each attempt, including retries and hedges, takes a rate-limit token.
+    """
+
+    def __init__(
+        self,
+        backend: ModelBackend,
+        rate_limiter: Optional[TokenBucket] = None,
+        deadline_seconds: float = 60.0,
+        attempt_timeout_seconds: float = 30.0,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 8.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_after_seconds: float = 0.0,
+        max_workers: int = 16
+    ):
+        self.backend = backend
+        self.model = backend.model
+        self.rate_limiter = rate_limiter
+        self.deadline_seconds = deadline_seconds
+        self.attempt_timeout_seconds = attempt_timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_seconds=30.0)
+        self.hedge = hedge
+        self.hedge_after_seconds = hedge_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-attempt") if hedge else None
+        self._latencies = deque(maxlen=200)
+        self._lock = Lock()
+        self._stats = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                       "failures": 0, "short_circuited": 0}
+
+    def available(self) -> bool:
+        """False while the circuit is open and calls would be refused"""
+        return self.breaker.state != "open"
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.state
+        stats["circuit_opened"] = self.breaker.opened
+        return stats
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None
+    ) -> str:
+        self._count("calls")
+        deadline = time.monotonic() + (timeout or self.deadline_seconds)
+        retries = 0
+        last_error = None
+
+        while True:
+            try:
+                if self.hedge:
+                    return self._hedged_attempt(messages, max_tokens, temperature, deadline)
+                return self._attempt(messages, max_tokens, temperature, deadline)
+            except Exception as e:
+                if isinstance(e, CircuitOpenError) and last_error:
+                    # Our own failures opened the circuit; report what they were
+                    self._count("failures")
+                    raise last_error
+                if not is_retryable(e) or retries >= self.max_retries:
+                    self._count("short_circuited" if isinstance(e, CircuitOpenError) else "failures")
+                    raise
+                last_error = e
+
+                delay = getattr(e, "retry_after", None) or random.uniform(
+                    0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** retries)
+                )
+                if time.monotonic() + delay >= deadline:
+                    self._count("failures")
+                    raise
+
+                retries += 1
+                self._count("retries")
+                time.sleep(delay)
+
+    def _attempt(self, messages, max_tokens, temperature, deadline: float) -> str:
+        # Checked before waiting for a token, and claimed only after, so a
+        # half-open trial is never taken by an attempt that then gives up
+        if self.breaker.state == "open":
+            raise CircuitOpenError("Model provider circuit is open", status_code=503)
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ModelTimeoutError("Deadline passed before the model was called")
+
+        if not self.breaker.allow():
+            raise CircuitOpenError("Model provider circuit is open", status_code=503)
+
+        self._count("attempts")
+        start = time.monotonic()
+        try:
+            reply = self.backend.complete(
+                messages,
+                max_tokens,
+                temperature,
+                min(self.attempt_timeout_seconds, remaining)
+            )
+        except Exception as e:
+            if is_retryable(e):
+                self.breaker.record_failure()
+            else:
+                # The provider answered, so it isn't degraded
+                self.breaker.record_success()
+            raise
+
+        self.breaker.record_success()
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return reply
+
+    def _hedged_attempt(self, messages, max_tokens, temperature, deadline: float) -> str:
+        hedge_after = self._hedge_delay()
+        first = self._executor.submit(self._attempt, messages, max_tokens, temperature, deadline)
+        if hedge_after is None:
+            return first.result()
+
+        done, _ = wait([first], timeout=hedge_after)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = self._executor.submit(self._attempt, messages, max_tokens, temperature, deadline)
+        pending = [first, second]
+        error = None
+
+        # The slower attempt is left to finish in the background; its
+        # result is discarded
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise ModelTimeoutError("Deadline passed waiting for the model")
+
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    if future is second:
+                        self._count("hedge_wins")
+                    return future.result()
+                # Prefer reporting a real failure over a refused hedge
+                if error is None or isinstance(error, CircuitOpenError):
+                    error = future.exception()
+
+        raise error
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Fixed delay if configured, otherwise the p95 of recent calls"""
+        if self.hedge_after_seconds > 0:
+            return self.hedge_after_seconds
+
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def create_resilient_backend(backend: ModelBackend, rate_limiter: Optional[TokenBucket] = None) -> ResilientBackend:
+    """Wrap a backend using the AI_* resilience settings"""
+    return ResilientBackend(
+        backend,
+        rate_limiter=rate_limiter,
+        deadline_seconds=settings.AI_CALL_DEADLINE_SECONDS,
+        attempt_timeout_seconds=settings.AI_REQUEST_TIMEOUT_SECONDS,
+        max_retries=settings.AI_MAX_RETRIES,
+        backoff_base_seconds=settings.AI_RETRY_BASE_SECONDS,
+        backoff_max_seconds=settings.AI_RETRY_MAX_SECONDS,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.AI_CIRCUIT_RESET_SECONDS
+        ),
+        hedge=settings.AI_HEDGE_ENABLED,
+        hedge_after_seconds=settings.AI_HEDGE_AFTER_SECONDS,
+        max_workers=settings.AI_MAX_CONCURRENCY * 2
+    )
@@ -0,0 +1,211 @@
+"""
+Model Router - Routes model calls across providers by latency, health and stage
+"""
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import random
+import time
+
+from app.core.config import settings
+from app.services.model_backends import ModelBackend, ModelBackendError, ModelTimeoutError, create_model_backend
+from app.services.model_resilience import CircuitOpenError, ResilientBackend, create_resilient_backend
+from app.services.rate_limiter import TokenBucket
+
+
+class Provider:
+    """One routable model, with its own retries, circuit and rate limit"""
+
+    def __init__(self, name: str, backend: ResilientBackend):
+        self.name = name
+        self.backend = backend
+        # e.g. "openai:gpt-4o"; what generations from this provider are labelled with
+        self.model_id = f"{name.partition(':')[0]}:{backend.model}"
+        self.latency_ewma: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.backend.available()
+
+
+class ModelRouter(ModelBackend):
+    """
+    Sends each call to the best available provider, failing over in turn
+
+    Providers are tried fastest first, by an exponentially weighted moving
+    average of their call latency (failures count as slow calls). Providers
+    whose circuit is open are skipped. A stage route, if configured for the
+    call's escalation level, is tried before the rest. A small share of
+    calls (`explore_rate`) go to a different provider first, so latencies
+    of providers not currently favoured stay up to date.
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        stage_routes: Optional[Dict[int, Provider]] = None,
+        deadline_seconds: float = 60.0,
+        ewma_alpha: float = 0.2,
+        explore_rate: float = 0.05
+    ):
+        """
+        Args:
+            providers: The general pool, used for every call
+            stage_routes: Escalation level -> provider tried first for it;
+                providers only listed here serve just their stages
+        """
+        self.pool = providers
+        self.stage_routes = stage_routes or {}
+        self.providers = {p.name: p for p in [*providers, *self.stage_routes.values()]}
+        self.deadline_seconds = deadline_seconds
+        self.ewma_alpha = ewma_alpha
+        self.explore_rate = explore_rate
+        self.model = providers[0].backend.model
+        self._lock = Lock()
+
+    def available(self) -> bool:
+        """False when every provider's circuit is open"""
+        return any(provider.healthy for provider in self.providers.values())
+
+    def route_for(self, escalation_level: Optional[int]) -> Optional[str]:
+        """Name of the provider pinned to an escalation level, if any"""
+        pinned = self.stage_routes.get(escalation_level)
+        return pinned.name if pinned else None
+
+    def models_for(self, escalation_level: Optional[int]) -> List[str]:
+        """Model ids of the providers a call would try, in order"""
+        return list(dict.fromkeys(
+            provider.model_id for provider in self._candidates(escalation_level, explore=False)
+        ))
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    **provider.backend.stats(),
+                    "latency_ewma_ms": round(provider.latency_ewma * 1000) if provider.latency_ewma else None,
+                    "routed": provider.calls,
+                    "routed_failures": provider.failures
+                }
+                for name, provider in self.providers.items()
+            }
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None,
+        escalation_level: Optional[int] = None
+    ) -> str:
+        reply, _ = self.complete_with_model(messages, max_tokens, temperature, timeout, escalation_level)
+        return reply
+
+    def complete_with_model(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None,
+        escalation_level: Optional[int] = None
+    ) -> Tuple[str, str]:
+        """As complete, also returning the model id of the provider that answered"""
+        deadline = time.monotonic() + (timeout or self.deadline_seconds)
+        candidates = [provider for provider in self._candidates(escalation_level) if provider.healthy]
+        if not candidates:
+            raise CircuitOpenError("Every model provider's circuit is open", status_code=503)
+
+        error = None
+        for position, provider in enumerate(candidates):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            # Leave time for the providers after this one to fail over to
+            budget = remaining / (len(candidates) - position)
+            start = time.monotonic()
+            try:
+                reply = provider.backend.complete(messages, max_tokens, temperature, budget)
+            except Exception as e:
+                if not isinstance(e, ModelBackendError):
+                    raise
+                self._record(provider, time.monotonic() - start, failed=not isinstance(e, CircuitOpenError))
+                if error is None or not isinstance(e, CircuitOpenError):
+                    error = e
+                if position + 1 < len(candidates):
+                    print(f"Model provider {provider.name} failed, failing over: {e}")
+                continue
+
+            self._record(provider, time.monotonic() - start, failed=False)
+            return reply, provider.model_id
+
+        raise error or ModelTimeoutError("Deadline passed before any provider answered")
+
+    def _candidates(self, escalation_level: Optional[int], explore: bool = True) -> List[Provider]:
+        """Providers in the order to try them for a call"""
+        with self._lock:
+            # Providers with no samples yet go first so they get measured
+            ordered = sorted(
+                self.pool,
+                key=lambda p: p.latency_ewma if p.latency_ewma is not None else 0.0
+            )
+
+        if explore and len(ordered) > 1 and random.random() < self.explore_rate:
+            ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+
+        pinned = self.stage_routes.get(escalation_level)
+        if pinned:
+            ordered = [pinned] + [p for p in ordered if p is not pinned]
+
+        return ordered
+
+    def _record(self, provider: Provider, elapsed: float, failed: bool):
+        with self._lock:
+            provider.calls += 1
+            sample = elapsed
+            if failed:
+                provider.failures += 1
+                # A failed call is worth at least two typical ones
+                sample = max(elapsed, 2 * (provider.latency_ewma or elapsed))
+
+            if provider.latency_ewma is None:
+                provider.latency_ewma = sample
+            else:
+                provider.latency_ewma += self.ewma_alpha * (sample - provider.latency_ewma)
+
+
+def _parse_provider(spec: str):
+    """'openai' or 'anthropic:claude-...' -> (provider, model or None)"""
+    provider, _, model = spec.partition(":")
+    return provider.strip(), model.strip() or None
+
+
+def create_model_router(backend: Optional[ModelBackend] = None) -> ModelRouter:
+    """
+    Build the router from AI_PROVIDERS and AI_STAGE_ROUTES
+
+    Args:
+        backend: Use this single backend instead (e.g. a benchmark stub)
+    """
+    def provider(name: str, model_backend: ModelBackend) -> Provider:
+        rate_limiter = TokenBucket(settings.AI_REQUESTS_PER_SECOND, settings.AI_BURST)
+        return Provider(name, create_resilient_backend(model_backend, rate_limiter))
+
+    if backend is not None:
+        providers = [provider(backend.model, backend)]
+        stage_routes = {}
+    else:
+        built = {}
+        for name in dict.fromkeys([*settings.AI_PROVIDERS, *settings.AI_STAGE_ROUTES.values()]):
+            built[name] = provider(name, create_model_backend(*_parse_provider(name)))
+        providers = [built[name] for name in dict.fromkeys(settings.AI_PROVIDERS)]
+        stage_routes = {level: built[name] for level, name in settings.AI_STAGE_ROUTES.items()}
+
+    return ModelRouter(
+        providers,
+        stage_routes=stage_routes,
+        deadline_seconds=settings.AI_CALL_DEADLINE_SECONDS,
+        ewma_alpha=settings.AI_ROUTER_EWMA_ALPHA,
+        explore_rate=settings.AI_ROUTER_EXPLORE_RATE
+    )
@@ -0,0 +1,351 @@
+"""
+Outbound Mail Service - Queues reminder emails for the mail workers and delivers them
+"""
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import or_
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+import smtplib
+import time
+
+import redis
+
+from app.core.config import settings
+from app.models.business import Business, SubscriptionStatus
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.reminder import ReminderDraft, ReminderStatus
+from app.models.settings import ReminderSettings
+from app.models.user import User, UserRole
+from app.services.audit_service import AuditService
+from app.services.email_service import EmailService
+from app.services.smtp_pool import get_smtp_pool
+
+
+def recipient_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].lower()
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """5xx replies (bad address, rejected content) won't succeed on a retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class DomainRateLimiter:
+    """
+    Messages per minute to each recipient domain, shared by every mail
+    worker through Redis
+
+    Counts are kept per domain per clock minute. If Redis can't be reached
+    the limit isn't enforced, rather than holding up every send.
+    """
+
+    def __init__(self, redis_client: redis.Redis, default_per_minute: int, overrides: Dict[str, int]):
+        self.redis = redis_client
+        self.default_per_minute = default_per_minute
+        self.overrides = {domain.lower(): limit for domain, limit in overrides.items()}
+
+    def limit_for(self, domain: str) -> int:
+        return self.overrides.get(domain, self.default_per_minute)
+
+    def take(self, domain: str, count: int) -> int:
+        """Claim up to `count` sends to a domain this minute; returns how many were granted"""
+        limit = self.limit_for(domain)
+        key = f"mail-rate:{domain}:{int(time.time() // 60)}"
+        try:
+            used = self.redis.incrby(key, count)
+            if used == count:
+                self.redis.expire(key, 120)
+            granted = max(0, min(count, limit - (used - count)))
+            if granted < count:
+                # Hand back what wasn't granted so later minutes' maths holds
+                self.redis.decrby(key, count - granted)
+        except redis.RedisError as e:
+            print(f"Mail rate limiter unavailable, not limiting {domain}: {e}")
+            return count
+        return granted
+
+    def seconds_until_reset(self) -> float:
+        return 60 - time.time() % 60
+
+
+@dataclass
+class DeliveryResult:
+    """What a delivery task did with its drafts"""
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retry: List[str] = field(default_factory=list)  # Transient failures to try again
+    deferred: List[str] = field(default_factory=list)  # Over a domain's rate limit
+    deferred_seconds: float = 0.0
+
+
+class OutboundMailService:
+    """
+    Service for sending reminder emails through the outbound mail queue
+
+    Sending a draft marks it queued and hands it to a Celery task on the
+    mail queue, so API requests never wait on SMTP. Mail workers deliver
+    queued drafts in batches (grouped by recipient domain, one pooled SMTP
+    session per batch) and update each draft's status and delivery_status
+    as they go. Scheduled drafts join the same queue once they fall due.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        email_service: Optional[EmailService] = None,
+        rate_limiter: Optional[DomainRateLimiter] = None
+    ):
+        self.db = db
+        self.email_service = email_service or EmailService()
+        self.rate_limiter = rate_limiter
+
+    def enqueue(self, drafts: List[ReminderDraft], actor_id: Optional[UUID]) -> int:
+        """
+        Queue approved drafts for sending
+
+        Raises:
+            ValueError: If email sending isn't configured
+            Exception: If the queue can't be reached; the drafts are left
+                as they were
+        """
+        return self._enqueue({actor_id: drafts})
+
+    def dispatch_scheduled(self, batch_size: int) -> int:
+        """
+        Claim a batch of scheduled drafts that are due and queue them
+
+        Rows are claimed with FOR UPDATE SKIP LOCKED, so several
+        dispatchers can run at once and each gets a different batch. Drafts
+        are sent as their business's owner. Businesses without an active
+        subscription are skipped. Returns how many were queued; 0 once
+        nothing (unclaimed) is due.
+        """
+        if not self.email_service.is_configured():
+            print("Scheduled reminders not sent: email credentials not configured")
+            return 0
+
+        now = datetime.utcnow()
+        drafts = self.db.query(ReminderDraft).join(Invoice).join(Client).join(
+            Business, Business.id == Client.business_id
+        ).join(
+            ReminderSettings, ReminderSettings.business_id == Client.business_id
+        ).options(
+            contains_eager(ReminderDraft.invoice).contains_eager(Invoice.client)
+        ).filter(
+            ReminderDraft.status == ReminderStatus.SCHEDULED,
+            ReminderDraft.auto_send_at <= now,
+            or_(ReminderDraft.snoozed_until.is_(None), ReminderDraft.snoozed_until <= now),
+            # Things may have changed since the draft was scheduled
+            Invoice.status == InvoiceStatus.UNPAID,
+            Client.reminders_disabled == False,
+            ReminderSettings.auto_send_enabled == True,
+            # Sending is blocked without an active subscription, as in the
+            # API; those drafts stay scheduled until it is active again
+            Business.subscription_status == SubscriptionStatus.ACTIVE
+        ).order_by(ReminderDraft.auto_send_at).limit(batch_size).with_for_update(
+            of=ReminderDraft,
+            skip_locked=True
+        ).all()
+
+        if not drafts:
+            self.db.rollback()
+            return 0
+
+        owners = self._business_owners({draft.invoice.client.business_id for draft in drafts})
+        by_actor = defaultdict(list)
+        for draft in drafts:
+            by_actor[owners.get(draft.invoice.client.business_id)].append(draft)
+
+        return self._enqueue(by_actor)
+
+    def deliver(self, draft_ids: List[str], actor_id: Optional[str], attempt: int = 0) -> DeliveryResult:
+        """Send a batch of queued drafts (runs on a mail worker)"""
+        result = DeliveryResult()
+
+        # Lock the batch's queued drafts so a redelivered task can't send
+        # them twice; drafts another worker holds are skipped
+        drafts = self.db.query(ReminderDraft).join(Invoice).join(Client).options(
+            contains_eager(ReminderDraft.invoice).contains_eager(Invoice.client)
+        ).filter(
+            ReminderDraft.id.in_(draft_ids),
+            ReminderDraft.status == ReminderStatus.QUEUED,
+            ReminderDraft.delivery_status.is_distinct_from("sending")
+        ).with_for_update(of=ReminderDraft, skip_locked=True).all()
+        result.skipped = len(draft_ids) - len(drafts)
+
+        # Stay under each recipient domain's rate limit; the rest wait
+        sending = []
+        for domain, domain_drafts in self._by_domain(drafts).items():
+            granted = self._take_quota(domain, len(domain_drafts))
+            sending.extend(domain_drafts[:granted])
+            result.deferred.extend(str(draft.id) for draft in domain_drafts[granted:])
+        if result.deferred:
+            result.deferred_seconds = self.rate_limiter.seconds_until_reset()
+
+        if not sending:
+            self.db.commit()
+            return result
+
+        sender = self.db.query(User).filter(User.id == actor_id).first() if actor_id else None
+        from_email = sender.email if sender else settings.SMTP_USER
+
+        # Everything needed later is read now; committing expires the drafts
+        messages = []
+        audit_payloads = []
+        claimed_at = datetime.utcnow()
+        for draft in sending:
+            client = draft.invoice.client
+            messages.append(self.email_service.build_message(
+                client.email,
+                from_email,
+                draft.body_text,
+                subject=draft.subject
+            ))
+            audit_payloads.append({
+                "draft_id": str(draft.id),
+                "invoice_id": str(draft.invoice_id),
+                "client_email": client.email,
+                "amount": str(draft.invoice.amount)
+            })
+            draft.delivery_status = "sending"
+            draft.sending_started_at = claimed_at
+        self.db.commit()
+
+        errors = get_smtp_pool().send_many(messages)
+
+        audit_entries = []
+        for draft, payload, error in zip(sending, audit_payloads, errors):
+            draft.sending_started_at = None
+            if error is None:
+                draft.status = ReminderStatus.SENT
+                draft.sent_at = datetime.utcnow()
+                draft.delivery_status = "delivered"
+                result.sent += 1
+                audit_entries.append(("draft_sent", payload))
+            elif not is_permanent_failure(error) and attempt + 1 < settings.MAIL_MAX_ATTEMPTS:
+                draft.delivery_status = "retrying"
+                result.retry.append(payload["draft_id"])
+                print(f"Reminder {payload['draft_id']} not sent, will retry: {error}")
+            else:
+                draft.status = ReminderStatus.FAILED
+                draft.delivery_status = "failed"
+                result.failed += 1
+                print(f"Reminder {payload['draft_id']} failed: {error}")
+                audit_entries.append(("draft_send_failed", {**payload, "error": str(error)}))
+
+        if actor_id:
+            audit_service = AuditService(self.db)
+            for action, payload in audit_entries:
+                audit_service.log_action(action=action, actor_id=actor_id, payload=payload)
+        self.db.commit()
+
+        return result
+
+    def fail_stale_sends(self, timeout_seconds: float) -> int:
+        """
+        Mark drafts stuck in "sending" for longer than `timeout_seconds` failed
+
+        A draft stays "sending" if its mail worker died mid-batch. Whether
+        the message went out can't be known, so rather than risk sending a
+        client the same reminder twice it is marked failed; it can be
+        resent from the inbox. Returns how many were marked.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+        stale = self.db.query(ReminderDraft).filter(
+            ReminderDraft.status == ReminderStatus.QUEUED,
+            ReminderDraft.delivery_status == "sending",
+            # Drafts claimed before the claim time was recorded count as stale
+            or_(ReminderDraft.sending_started_at.is_(None), ReminderDraft.sending_started_at < cutoff)
+        ).with_for_update(skip_locked=True).all()
+
+        for draft in stale:
+            draft.status = ReminderStatus.FAILED
+            draft.delivery_status = "interrupted"
+            draft.sending_started_at = None
+        self.db.commit()
+
+        return len(stale)
+
+    def _enqueue(self, drafts_by_actor: Dict[Optional[UUID], List[ReminderDraft]]) -> int:
+        """Mark drafts queued in one commit, then hand them to the mail workers"""
+        from app.jobs.mail_tasks import send_reminder_batch
+
+        if not self.email_service.is_configured():
+            raise ValueError("Email credentials not configured")
+
+        drafts = [draft for actor_drafts in drafts_by_actor.values() for draft in actor_drafts]
+        if not drafts:
+            return 0
+
+        # Batches are worked out before committing, which expires the drafts
+        tasks = [
+            (batch, str(actor_id) if actor_id else None)
+            for actor_id, actor_drafts in drafts_by_actor.items()
+            for batch in self._batches(actor_drafts)
+        ]
+        previous = {draft.id: (draft.status, draft.delivery_status) for draft in drafts}
+        for draft in drafts:
+            draft.status = ReminderStatus.QUEUED
+            draft.delivery_status = "queued"
+        self.db.commit()
+
+        try:
+            for batch, actor_id in tasks:
+                send_reminder_batch.delay(batch, actor_id)
+        except Exception:
+            # Anything already dispatched skips drafts that are no longer queued
+            for draft in drafts:
+                draft.status, draft.delivery_status = previous[draft.id]
+            self.db.commit()
+            raise
+
+        return len(drafts)
+
+    def _business_owners(self, business_ids: Set[UUID]) -> Dict[UUID, UUID]:
+        """Business id -> the user scheduled sends go out as (the owner, else the first user)"""
+        owners = {}
+        users = self.db.query(User.id, User.business_id, User.role).filter(
+            User.business_id.in_(business_ids)
+        ).order_by(User.created_at).all()
+        for user_id, business_id, role in users:
+            if business_id not in owners or (role == UserRole.OWNER and owners[business_id][1] != UserRole.OWNER):
+                owners[business_id] = (user_id, role)
+        return {business_id: user_id for business_id, (user_id, _) in owners.items()}
+
+    def _batches(self, drafts: List[ReminderDraft]) -> List[List[str]]:
+        """Draft ids in batches of MAIL_BATCH_SIZE, each to a single domain"""
+        size = max(1, settings.MAIL_BATCH_SIZE)
+        batches = []
+        for domain_drafts in self._by_domain(drafts).values():
+            ids = [str(draft.id) for draft in domain_drafts]
+            batches.extend(ids[i:i + size] for i in range(0, len(ids), size))
+        return batches
+
+    def _by_domain(self, drafts: List[ReminderDraft]) -> Dict[str, List[ReminderDraft]]:
+        grouped = defaultdict(list)
+        for draft in drafts:
+            grouped[recipient_domain(draft.invoice.client.email)].append(draft)
+        return grouped
+
+    def _take_quota(self, domain: str, count: int) -> int:
+        if self.rate_limiter is None:
+            return count
+        return self.rate_limiter.take(domain, count)
+
+
+def create_domain_rate_limiter() -> DomainRateLimiter:
+    """Rate limiter from the MAIL_DOMAIN_* settings"""
+    return DomainRateLimiter(
+        redis.Redis.from_url(settings.REDIS_URL),
+        default_per_minute=settings.MAIL_DOMAIN_RATE_PER_MINUTE,
+        overrides=settings.MAIL_DOMAIN_RATE_LIMITS
+    )
@@ -0,0 +1,38 @@
+"""
+Rate Limiter - Thread-safe token bucket for outbound API calls
+"""
+from threading import Lock
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` acquisitions per second on average
+
+    Up to `capacity` tokens accumulate while idle, so short bursts go out
+    immediately; after that callers block until a token is refilled.
+    Safe to share between threads.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
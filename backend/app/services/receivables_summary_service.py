@@ -0,0 +1,247 @@
+"""
+Receivables Summary Service - Keeps per-business dashboard totals up to date
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, select, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.business import Business
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.receivables_summary import ReceivablesSummary
+from app.models.settings import ReminderSettings
+
+
+# Escalation thresholds used when a business has no reminder settings yet
+DEFAULT_STAGE_DAYS = (7, 14, 30, 60)
+
+# (status, amount, days_overdue) - the invoice fields the summary depends on
+InvoiceState = Tuple[InvoiceStatus, Decimal, int]
+
+
+def _metric_conditions(unpaid, paid, days, stage_days) -> dict:
+    """
+    Which summary metrics an invoice counts towards
+
+    Only & and comparisons are used, so the same definitions evaluate to
+    booleans for a single invoice and to SQL expressions for a refresh.
+    """
+    stage_1, stage_2, stage_3, stage_4 = stage_days
+    overdue = unpaid & (days > 0)
+    return {
+        "unpaid": unpaid,
+        "paid": paid,
+        "overdue": overdue,
+        "overdue_1_30": overdue & (days <= 30),
+        "overdue_31_60": unpaid & (days > 30) & (days <= 60),
+        "overdue_61_90": unpaid & (days > 60) & (days <= 90),
+        "overdue_90_plus": unpaid & (days > 90),
+        "stage_1": unpaid & (days >= stage_1) & (days < stage_2),
+        "stage_2": unpaid & (days >= stage_2) & (days < stage_3),
+        "stage_3": unpaid & (days >= stage_3) & (days < stage_4),
+        "stage_4": unpaid & (days >= stage_4),
+    }
+
+
+_METRICS = list(_metric_conditions(True, True, 0, DEFAULT_STAGE_DAYS))
+
+# Every counter column on ReceivablesSummary
+METRIC_COLUMNS = [f"{m}_{kind}" for m in _METRICS for kind in ("count", "amount")] + ["overdue_days_total"]
+
+
+def invoice_state(invoice: Invoice) -> InvoiceState:
+    """Snapshot the fields of an invoice that the summary depends on"""
+    return invoice.status, Decimal(invoice.amount), invoice.days_overdue
+
+
+class ReceivablesSummaryService:
+    """
+    Service for maintaining per-business receivables summaries
+
+    Invoice writes report what changed and the service applies the
+    difference to the business's summary row with a single atomic upsert
+    (col = col + delta), inside the caller's transaction. refresh()
+    recomputes a business's row from scratch, for changes that shift many
+    invoices at once such as the daily days_overdue update or new stage
+    thresholds. The caller is responsible for committing.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._stage_days: Dict[UUID, Tuple[int, int, int, int]] = {}
+
+    def get_summary(self, business_id: UUID) -> ReceivablesSummary:
+        """Get a business's summary, building it first if it doesn't exist"""
+        summary = self.db.query(ReceivablesSummary).filter(
+            ReceivablesSummary.business_id == business_id
+        ).first()
+
+        if not summary:
+            self.refresh(business_id)
+            self.db.commit()
+            summary = self.db.query(ReceivablesSummary).filter(
+                ReceivablesSummary.business_id == business_id
+            ).first()
+
+        return summary
+
+    def invoice_changed(
+        self,
+        business_id: UUID,
+        before: Optional[InvoiceState],
+        after: Optional[InvoiceState]
+    ):
+        """
+        Apply a single invoice write to the summary
+
+        Args:
+            before: State prior to the write, or None for a new invoice
+            after: State after the write, or None for a deleted invoice
+        """
+        stage_days = self._get_stage_days(business_id)
+        delta = self._contribution(after, stage_days)
+        for column, value in self._contribution(before, stage_days).items():
+            delta[column] = delta.get(column, 0) - value
+
+        self._apply(business_id, delta)
+
+    def invoices_added(self, business_id: UUID, states: Iterable[InvoiceState]):
+        """Apply a batch of new invoices to the summary with one upsert"""
+        stage_days = self._get_stage_days(business_id)
+        delta = {}
+        for state in states:
+            for column, value in self._contribution(state, stage_days).items():
+                delta[column] = delta.get(column, 0) + value
+
+        self._apply(business_id, delta)
+
+    def business_ids(self) -> List[UUID]:
+        """Every business, for refreshing them all one at a time"""
+        return [business_id for (business_id,) in self.db.query(Business.id).order_by(Business.id)]
+
+    def refresh(self, business_id: UUID):
+        """
+        Recompute a business's summary from the invoices table
+
+        The summary row is locked before the invoices are read. Invoice
+        writes already in flight hold that lock through their delta upsert,
+        so the recount waits for them and includes them; writes that start
+        later wait for the refresh to commit and then add their delta on
+        top. Either way no delta is overwritten. Refresh one business per
+        transaction to keep the lock short.
+        """
+        # The row must exist for there to be something to lock
+        self.db.execute(
+            pg_insert(ReceivablesSummary).values(
+                business_id=business_id,
+                updated_at=datetime.utcnow()
+            ).on_conflict_do_nothing(index_elements=[ReceivablesSummary.business_id])
+        )
+        self.db.query(ReceivablesSummary.business_id).filter(
+            ReceivablesSummary.business_id == business_id
+        ).with_for_update().one()
+
+        stage_days = tuple(
+            func.coalesce(getattr(ReminderSettings, f"stage_{n}_days"), default)
+            for n, default in enumerate(DEFAULT_STAGE_DAYS, start=1)
+        )
+        conditions = _metric_conditions(
+            Invoice.status == InvoiceStatus.UNPAID,
+            Invoice.status == InvoiceStatus.PAID,
+            Invoice.days_overdue,
+            stage_days
+        )
+
+        columns = []
+        for metric, condition in conditions.items():
+            columns.append(func.count(Invoice.id).filter(condition).label(f"{metric}_count"))
+            columns.append(func.coalesce(func.sum(Invoice.amount).filter(condition), 0).label(f"{metric}_amount"))
+        columns.append(
+            func.coalesce(func.sum(Invoice.days_overdue).filter(conditions["overdue"]), 0).label("overdue_days_total")
+        )
+
+        # A new statement, so it sees everything committed before the lock
+        query = select(
+            Business.id.label("business_id"),
+            *columns,
+            literal(datetime.utcnow(), DateTime).label("updated_at")
+        ).select_from(Business)\
+         .outerjoin(ReminderSettings, ReminderSettings.business_id == Business.id)\
+         .outerjoin(Client, Client.business_id == Business.id)\
+         .outerjoin(Invoice, Invoice.client_id == Client.id)\
+         .where(Business.id == business_id)\
+         .group_by(Business.id, ReminderSettings.id)
+
+        stmt = pg_insert(ReceivablesSummary).from_select(
+            ["business_id", *METRIC_COLUMNS, "updated_at"], query
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReceivablesSummary.business_id],
+            set_={column: stmt.excluded[column] for column in [*METRIC_COLUMNS, "updated_at"]}
+        )
+        self.db.execute(stmt)
+
+    def _get_stage_days(self, business_id: UUID) -> Tuple[int, int, int, int]:
+        if business_id not in self._stage_days:
+            settings = self.db.query(ReminderSettings).filter(
+                ReminderSettings.business_id == business_id
+            ).first()
+
+            if settings:
+                self._stage_days[business_id] = (
+                    settings.stage_1_days,
+                    settings.stage_2_days,
+                    settings.stage_3_days,
+                    settings.stage_4_days
+                )
+            else:
+                self._stage_days[business_id] = DEFAULT_STAGE_DAYS
+
+        return self._stage_days[business_id]
+
+    def _contribution(self, state: Optional[InvoiceState], stage_days) -> dict:
+        """Counter values a single invoice adds to its business's summary"""
+        if state is None:
+            return {}
+
+        status, amount, days = state
+        conditions = _metric_conditions(
+            status == InvoiceStatus.UNPAID,
+            status == InvoiceStatus.PAID,
+            days,
+            stage_days
+        )
+
+        contribution = {}
+        for metric, applies in conditions.items():
+            if applies:
+                contribution[f"{metric}_count"] = 1
+                contribution[f"{metric}_amount"] = amount
+        if conditions["overdue"]:
+            contribution["overdue_days_total"] = days
+
+        return contribution
+
+    def _apply(self, business_id: UUID, delta: dict):
+        """Add counter deltas to a business's summary row, creating it if needed"""
+        if not any(delta.values()):
+            return
+
+        values = {column: delta.get(column, 0) for column in METRIC_COLUMNS}
+        stmt = pg_insert(ReceivablesSummary).values(
+            business_id=business_id,
+            updated_at=datetime.utcnow(),
+            **values
+        )
+        table = ReceivablesSummary.__table__
+        set_ = {column: table.c[column] + stmt.excluded[column] for column in METRIC_COLUMNS}
+        set_["updated_at"] = stmt.excluded.updated_at
+
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[ReceivablesSummary.business_id],
+            set_=set_
+        ))
@@ -0,0 +1,160 @@
+"""
+Reminder Template Service - Renders routine reminders from stored AI-written templates
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import re
+
+from app.core.config import settings
+from app.models.business import Business
+from app.models.invoice import Invoice
+from app.models.reminder import ReminderTone
+from app.models.reminder_template import ReminderTemplate
+from app.services.ai_service import AIService, TEMPLATE_PLACEHOLDERS, get_ai_service
+
+
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+# A template that leaves these out can't be a usable reminder
+REQUIRED_PLACEHOLDERS = {"amount", "due_date"}
+
+
+def invoice_reference(invoice: Invoice) -> str:
+    """How an invoice is referred to in reminder text"""
+    if invoice.invoice_number:
+        return f"invoice {invoice.invoice_number}"
+    return "your invoice"
+
+
+def validate_template(subject: str, body: str) -> Optional[str]:
+    """Return why a generated template can't be used, or None if it can"""
+    if not subject.strip() or not body.strip():
+        return "empty subject or body"
+    if len(subject) > 200:
+        return "subject too long"
+
+    used = set(_PLACEHOLDER_RE.findall(subject + body))
+    unknown = used - set(TEMPLATE_PLACEHOLDERS)
+    if unknown:
+        return f"unknown placeholders: {', '.join(sorted(unknown))}"
+    missing = REQUIRED_PLACEHOLDERS - used
+    if missing:
+        return f"missing placeholders: {', '.join(sorted(missing))}"
+    return None
+
+
+def render_template(text: str, values: Dict[str, str]) -> str:
+    """Fill in {placeholders}, leaving anything else untouched"""
+    return _PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), text)
+
+
+class ReminderTemplateService:
+    """
+    Service for template-mode reminder drafts
+
+    Templates are generated by the model once per business, tone and
+    escalation level (REMINDER_TEMPLATE_VARIANTS variants), stored, and then
+    rendered locally for each invoice, so model calls scale with the number
+    of businesses and stages rather than the number of invoices.
+    """
+
+    def __init__(self, db: Session, ai_service: Optional[AIService] = None):
+        self.db = db
+        self.ai_service = ai_service or get_ai_service()
+        self._templates: Dict[Tuple[UUID, ReminderTone, int], List[ReminderTemplate]] = {}
+
+    def render(
+        self,
+        invoice: Invoice,
+        business: Business,
+        tone: ReminderTone,
+        escalation_level: int,
+        days_overdue: int
+    ) -> Dict[str, str]:
+        """
+        Render a reminder for an invoice from the business's templates
+
+        Raises:
+            ValueError: If no usable templates could be generated
+        """
+        templates = self.get_templates(business, tone, escalation_level)
+
+        # Spread invoices across the variants, stably per invoice
+        template = templates[invoice.id.int % len(templates)]
+
+        values = {
+            "client_name": invoice.client.name,
+            "amount": f"£{invoice.amount:,.2f}",
+            "due_date": invoice.due_date.strftime("%d %B %Y"),
+            "days_overdue": str(days_overdue),
+            "invoice_reference": invoice_reference(invoice),
+            "business_name": business.name,
+        }
+        return {
+            "subject": render_template(template.subject_template, values),
+            "body": render_template(template.body_template, values)
+        }
+
+    def get_templates(
+        self,
+        business: Business,
+        tone: ReminderTone,
+        escalation_level: int
+    ) -> List[ReminderTemplate]:
+        """Get the stored templates for a stage, generating them on first use"""
+        key = (business.id, tone, escalation_level)
+        if key not in self._templates:
+            templates = self._load(business.id, tone, escalation_level)
+            if not templates:
+                self._generate(business, tone, escalation_level)
+                templates = self._load(business.id, tone, escalation_level)
+            self._templates[key] = templates
+
+        return self._templates[key]
+
+    def _load(self, business_id: UUID, tone: ReminderTone, escalation_level: int) -> List[ReminderTemplate]:
+        return self.db.query(ReminderTemplate).filter(
+            ReminderTemplate.business_id == business_id,
+            ReminderTemplate.tone == tone,
+            ReminderTemplate.escalation_level == escalation_level
+        ).order_by(ReminderTemplate.variant).all()
+
+    def _generate(self, business: Business, tone: ReminderTone, escalation_level: int):
+        """Ask the model for templates and store the ones that validate"""
+        generated = self.ai_service.generate_reminder_templates(
+            business_name=business.name,
+            industry_type=business.industry_type,
+            tone=tone,
+            escalation_level=escalation_level,
+            count=settings.REMINDER_TEMPLATE_VARIANTS
+        )
+
+        rows = []
+        for template in generated:
+            problem = validate_template(template["subject"], template["body"])
+            if problem:
+                print(f"Discarding reminder template for business {business.id}: {problem}")
+                continue
+
+            rows.append({
+                "business_id": business.id,
+                "tone": tone,
+                "escalation_level": escalation_level,
+                "variant": len(rows),
+                "subject_template": template["subject"].strip(),
+                "body_template": template["body"].strip(),
+                "model": template["model"]
+            })
+
+        if not rows:
+            raise ValueError("AI returned no usable reminder templates")
+
+        # Another run may have stored templates for this stage meanwhile
+        self.db.execute(
+            pg_insert(ReminderTemplate).on_conflict_do_nothing(
+                constraint="uq_reminder_templates_business_tone_level_variant"
+            ),
+            rows
+        )
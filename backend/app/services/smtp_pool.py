@@ -0,0 +1,275 @@
+"""
+SMTP Pool - Warm, authenticated SMTP sessions shared across sends
+"""
+from contextlib import contextmanager
+from email.message import Message
+from threading import BoundedSemaphore, Lock
+from typing import Dict, Iterator, List, Optional
+import smtplib
+import time
+
+from app.core.config import settings
+
+
+def is_connection_error(error: Exception) -> bool:
+    """
+    Whether an error means the session itself is unusable, rather than the
+    message being refused (SMTPException subclasses OSError, hence the check)
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class PooledConnection:
+    """An authenticated SMTP session and its usage"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+        self.broken = False
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `max_size` logged-in SMTP sessions open for reuse
+
+    Opening a session costs a TCP connect, EHLO, STARTTLS (a TLS handshake)
+    and AUTH before the first message, so sessions are kept open and
+    checked out per send instead.
+
+    - Sessions idle for longer than `idle_timeout_seconds` are closed
+      rather than reused; the server has probably dropped them.
+    - A session idle for more than `noop_after_seconds` is checked with a
+      NOOP before reuse, and replaced if the server no longer answers.
+    - A session is retired after `max_messages_per_connection` messages,
+      since providers cap messages per session.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        starttls: bool = True,
+        timeout_seconds: float = 30.0,
+        max_size: int = 4,
+        idle_timeout_seconds: float = 60.0,
+        noop_after_seconds: float = 5.0,
+        max_messages_per_connection: int = 100
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout_seconds = timeout_seconds
+        self.max_size = max_size
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.noop_after_seconds = noop_after_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle: List[PooledConnection] = []
+        self._slots = BoundedSemaphore(max_size)
+        self._lock = Lock()
+        self._stats = {"opened": 0, "reused": 0, "closed": 0, "evicted_idle": 0,
+                       "failed_health_checks": 0, "messages": 0}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "idle": len(self._idle)}
+
+    def send(self, message: Message):
+        """Send one message over a pooled session"""
+        errors = self.send_many([message])
+        if errors[0]:
+            raise errors[0]
+
+    def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send several messages back to back over one session
+
+        Returns one entry per message: None if it was accepted, otherwise
+        the error. A refused message doesn't affect the others; if the
+        session drops, the rest are sent over a new one.
+        """
+        errors: List[Optional[Exception]] = [None] * len(messages)
+        pending = list(range(len(messages)))
+
+        while pending:
+            try:
+                with self.connection() as connection:
+                    self._send_on(connection, messages, pending, errors)
+            except OSError as e:
+                # Couldn't connect or log in; nothing left can be sent
+                for index in pending:
+                    errors[index] = e
+                break
+
+        return errors
+
+    def _send_on(
+        self,
+        connection: PooledConnection,
+        messages: List[Message],
+        pending: List[int],
+        errors: List[Optional[Exception]]
+    ):
+        """Send pending messages until the session is used up or drops"""
+        # A session that sat in the pool may have been dropped without us
+        # noticing, which shows up on its first command. That is worth one
+        # more try; a drop later on may be after the server took the message.
+        retry_drop = connection.last_used > connection.created_at
+
+        while pending:
+            index = pending[0]
+            try:
+                connection.smtp.send_message(messages[index])
+            except OSError as e:
+                if is_connection_error(e):
+                    connection.broken = True
+                    if not retry_drop:
+                        errors[index] = e
+                        pending.pop(0)
+                    return
+                # smtplib resets the session after a refusal, so it can
+                # carry on with the next message
+                errors[index] = e
+                pending.pop(0)
+            else:
+                pending.pop(0)
+                connection.messages_sent += 1
+                self._count("messages")
+
+            retry_drop = False
+            if connection.messages_sent >= self.max_messages_per_connection:
+                return
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Check out a live session, returning it to the pool afterwards"""
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection
+        except Exception as e:
+            if connection and is_connection_error(e):
+                connection.broken = True
+            raise
+        finally:
+            if connection:
+                self._checkin(connection)
+            self._slots.release()
+
+    def close(self):
+        """Close every idle session (checked-out ones close on return)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection)
+
+    def _checkout(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                expired = self._take_expired()
+                # Most recently used first; it's the likeliest to still be open
+                connection = self._idle.pop() if self._idle else None
+
+            for stale in expired:
+                self._close(stale)
+
+            if connection is None:
+                return self._open()
+
+            if time.monotonic() - connection.last_used > self.noop_after_seconds and not self._healthy(connection):
+                self._count("failed_health_checks")
+                connection.broken = True
+                self._close(connection)
+                continue
+
+            self._count("reused")
+            return connection
+
+    def _checkin(self, connection: PooledConnection):
+        connection.last_used = time.monotonic()
+        if connection.broken or connection.messages_sent >= self.max_messages_per_connection:
+            self._close(connection)
+            return
+        with self._lock:
+            self._idle.append(connection)
+
+    def _take_expired(self) -> List[PooledConnection]:
+        """Remove sessions idle too long from the pool; call with the lock held"""
+        cutoff = time.monotonic() - self.idle_timeout_seconds
+        expired = [c for c in self._idle if c.last_used < cutoff]
+        if expired:
+            self._idle = [c for c in self._idle if c.last_used >= cutoff]
+            self._stats["evicted_idle"] += len(expired)
+        return expired
+
+    def _open(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+
+        self._count("opened")
+        return PooledConnection(smtp)
+
+    def _healthy(self, connection: PooledConnection) -> bool:
+        try:
+            code, _ = connection.smtp.noop()
+        except OSError:
+            return False
+        return code == 250
+
+    def _close(self, connection: PooledConnection):
+        try:
+            if connection.broken:
+                connection.smtp.close()
+            else:
+                connection.smtp.quit()
+        except OSError:
+            connection.smtp.close()
+        self._count("closed")
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+
+# Singleton instance, created on first use so each worker process opens its own
+_smtp_pool = None
+_smtp_pool_lock = Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get the process-wide SMTP pool for the configured server"""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPConnectionPool(
+                host=settings.SMTP_HOST,
+                port=settings.SMTP_PORT,
+                username=settings.SMTP_USER,
+                password=settings.SMTP_PASSWORD,
+                starttls=settings.SMTP_STARTTLS,
+                timeout_seconds=settings.SMTP_TIMEOUT_SECONDS,
+                max_size=settings.SMTP_POOL_SIZE,
+                idle_timeout_seconds=settings.SMTP_POOL_IDLE_SECONDS,
+                noop_after_seconds=settings.SMTP_POOL_NOOP_AFTER_SECONDS,
+                max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+            )
+        return _smtp_pool
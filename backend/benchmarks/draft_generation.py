@@ -0,0 +1,190 @@
+"""
+Benchmark reminder draft generation against an offline stub model
+
+Runs DraftGenerationService end to end - invoice lookup, template
+rendering, batched and single model calls, draft inserts - with the model
+replaced by StubBackend, so no API key is needed and results are
+repeatable. Latency and error rates are injected by the stub; --replay
+answers from recorded replies (see AI_BACKEND=record).
+
+Runs against DATABASE_URL inside a transaction that is rolled back, so it
+leaves no data behind. Point it at a scratch database anyway.
+
+Usage:
+    python -m benchmarks.draft_generation --sizes 10 100 1000 --latency-ms 800 --jitter-ms 400
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import date, timedelta
+from threading import Lock
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.business import Business
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus, ExternalSource
+from app.models.settings import ReminderSettings
+from app.services.ai_service import AIService
+from app.services.draft_generation_service import DraftGenerationService
+from app.services.model_backends import ModelBackend, ReplayStore, StubBackend
+
+
+class TimedBackend(ModelBackend):
+    """Record how long each model call takes"""
+
+    def __init__(self, backend: ModelBackend):
+        self.backend = backend
+        self.model = backend.model
+        self.durations: List[float] = []
+        self._lock = Lock()
+
+    def complete(self, messages, max_tokens, temperature, timeout=None):
+        start = time.perf_counter()
+        try:
+            return self.backend.complete(messages, max_tokens, temperature, timeout)
+        finally:
+            with self._lock:
+                self.durations.append(time.perf_counter() - start)
+
+    def stats(self):
+        return self.backend.stats()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def create_business(db: Session, invoices: int) -> Business:
+    """A business with `invoices` overdue invoices spread across every stage"""
+    business = Business(name=f"Benchmark business {invoices}", industry_type="consulting")
+    db.add(business)
+    db.flush()
+    db.add(ReminderSettings(business_id=business.id))
+
+    clients = []
+    for n in range(max(1, invoices // 5)):
+        clients.append(Client(
+            business_id=business.id,
+            name=f"Client {n}",
+            email=f"client{n}@example.com",
+            # Some clients get personalised emails rather than templates
+            relationship_notes="Long-standing client, usually pays promptly" if n % 4 == 0 else None
+        ))
+    db.add_all(clients)
+    db.flush()
+
+    today = date.today()
+    for n in range(invoices):
+        days_overdue = 1 + n * 7 % 90
+        db.add(Invoice(
+            client_id=clients[n % len(clients)].id,
+            business_id=business.id,
+            invoice_number=f"INV-{n}",
+            amount=100 + n % 2000,
+            due_date=today - timedelta(days=days_overdue),
+            days_overdue=days_overdue,
+            status=InvoiceStatus.UNPAID,
+            external_source=ExternalSource.MANUAL
+        ))
+    db.flush()
+    return business
+
+
+def run(db: Session, ai_service: AIService, backend: TimedBackend, size: int) -> Dict[str, float]:
+    business = create_business(db, size)
+    backend.durations.clear()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    drafts = DraftGenerationService(db, ai_service).generate_drafts_for_overdue_invoices(
+        business.id,
+        max_drafts=size,
+        manual_trigger=True
+    )
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "drafts": len(drafts),
+        "seconds": elapsed,
+        "drafts_per_second": len(drafts) / elapsed if elapsed else 0.0,
+        "model_calls": len(backend.durations),
+        "p50_ms": percentile(backend.durations, 50) * 1000,
+        "p99_ms": percentile(backend.durations, 99) * 1000,
+        "peak_mb": peak / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=400.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--replay", help="JSONL file of recorded replies")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--hedge", action="store_true", help="Hedge calls slower than the observed p95")
+    parser.add_argument("--requests-per-second", type=float, default=settings.AI_REQUESTS_PER_SECOND)
+    parser.add_argument("--no-batch", action="store_true", help="One invoice per model call")
+    parser.add_argument("--no-templates", action="store_true", help="Every draft gets its own generation")
+    args = parser.parse_args()
+
+    settings.AI_REQUESTS_PER_SECOND = args.requests_per_second
+    settings.AI_BATCH_MODE_ENABLED = not args.no_batch
+    settings.REMINDER_TEMPLATE_MODE_ENABLED = not args.no_templates
+    settings.AI_HEDGE_ENABLED = args.hedge
+
+    backend = TimedBackend(StubBackend(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        replay=ReplayStore(args.replay) if args.replay else None,
+        model=settings.OPENAI_MODEL,
+        seed=args.seed
+    ))
+    ai_service = AIService(backend)
+    # Every run is new content; the cache would only measure Redis
+    ai_service.cache = None
+
+    print(
+        f"Stub model: {args.latency_ms:.0f}ms +{args.jitter_ms:.0f}ms jitter, "
+        f"{args.error_rate:.0%} errors, {settings.AI_REQUESTS_PER_SECOND:g} req/s, "
+        f"batch={'on' if settings.AI_BATCH_MODE_ENABLED else 'off'}, "
+        f"templates={'on' if settings.REMINDER_TEMPLATE_MODE_ENABLED else 'off'}"
+    )
+    print(f"{'invoices':>8} {'drafts':>7} {'seconds':>8} {'drafts/s':>9} {'calls':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}")
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Commits inside the service only release savepoints
+    db = Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False)
+    try:
+        for size in args.sizes:
+            result = run(db, ai_service, backend, size)
+            print(
+                f"{size:>8} {result['drafts']:>7} {result['seconds']:>8.2f} "
+                f"{result['drafts_per_second']:>9.1f} {result['model_calls']:>6} "
+                f"{result['p50_ms']:>8.0f} {result['p99_ms']:>8.0f} {result['peak_mb']:>8.1f}"
+            )
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+    print(f"Stub calls: {backend.stats()}")
+    print(f"Model calls: {ai_service.backend.stats()}")
+
+
+if __name__ == "__main__":
+    main()
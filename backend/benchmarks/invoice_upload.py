@@ -0,0 +1,110 @@
+"""
+Benchmark invoice upload throughput: legacy row-by-row path vs bulk path
+
+Runs against DATABASE_URL inside a transaction that is rolled back, so it
+leaves no data behind. Point it at a scratch database anyway.
+
+Usage:
+    python -m benchmarks.invoice_upload --rows 50000 --clients 500
+"""
+import argparse
+import io
+import time
+from datetime import datetime
+
+from app.core.database import SessionLocal
+from app.models.business import Business
+from app.models.client import Client
+from app.models.invoice import Invoice, InvoiceStatus, ExternalSource
+from app.services.invoice_import_service import InvoiceImportService, open_upload
+
+
+def build_csv(rows: int, clients: int) -> bytes:
+    """Generate an upload with `rows` invoices spread across `clients` clients"""
+    lines = ["client_name,client_email,amount,due_date,invoice_number\n"]
+    for i in range(rows):
+        c = i % clients
+        lines.append(f"Client {c},client{c}@example.com,\"£1,{i % 1000}.50\",2026-01-{i % 28 + 1:02d},INV-{i}\n")
+    return "".join(lines).encode('utf-8')
+
+
+def legacy_import(db, business_id, rows) -> int:
+    """The previous upload loop: one client lookup and unit of work per row"""
+    count = 0
+    for _, record, error in rows:
+        if error:
+            continue
+
+        client = db.query(Client).filter(
+            Client.business_id == business_id,
+            Client.email == record["client_email"]
+        ).first()
+
+        if not client:
+            client = Client(
+                business_id=business_id,
+                name=record["client_name"],
+                email=record["client_email"]
+            )
+            db.add(client)
+            db.flush()
+
+        invoice = Invoice(
+            client_id=client.id,
+            business_id=business_id,
+            amount=record["amount"],
+            due_date=record["due_date"],
+            external_source=ExternalSource.MANUAL,
+            status=InvoiceStatus.UNPAID
+        )
+        invoice.days_overdue = invoice.calculate_days_overdue()
+        db.add(invoice)
+        count += 1
+
+    db.flush()
+    return count
+
+
+def bulk_import(db, business_id, rows) -> int:
+    """The current batched upload path"""
+    return InvoiceImportService(db, business_id).import_rows(rows).success
+
+
+def run(name: str, import_fn, payload: bytes) -> float:
+    db = SessionLocal()
+    try:
+        business = Business(name=f"Benchmark {datetime.utcnow().isoformat()}", industry_type="benchmark")
+        db.add(business)
+        db.flush()
+
+        start = time.perf_counter()
+        with open_upload(io.BytesIO(payload), 'csv') as (_, rows):
+            count = import_fn(db, business.id, rows)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.rollback()
+        db.close()
+
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{name:<8} {count:>8} rows  {elapsed:>8.2f}s  {rate:>10.0f} rows/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=100)
+    args = parser.parse_args()
+
+    payload = build_csv(args.rows, args.clients)
+    print(f"Uploading {args.rows} rows across {args.clients} clients")
+
+    before = run("legacy", legacy_import, payload)
+    after = run("bulk", bulk_import, payload)
+
+    if before:
+        print(f"Speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark upload row validation: legacy per-row parsing vs columnar validation
+
+Pure CPU benchmark, no database needed.
+
+Usage:
+    python -m benchmarks.row_validation --rows 100000
+"""
+import argparse
+import csv
+import io
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List
+
+from app.services.invoice_import_service import open_upload
+from app.services.invoice_validation import validate_columns
+
+
+def build_csv(rows: int) -> bytes:
+    """Generate an upload mixing both date layouts and a few invalid rows"""
+    lines = ["client_name,client_email,amount,due_date,invoice_number\n"]
+    for i in range(rows):
+        due_date = f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 2 else f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/2026"
+        amount = "n/a" if i % 97 == 0 else f"\"£{i % 9 + 1},{i % 1000:03d}.50\""
+        lines.append(f"Client {i % 500},client{i % 500}@example.com,{amount},{due_date},INV-{i}\n")
+    return "".join(lines).encode('utf-8')
+
+
+def read_rows(payload: bytes) -> List[dict]:
+    return list(csv.DictReader(io.StringIO(payload.decode('utf-8'))))
+
+
+def legacy_validate(rows: List[dict]) -> int:
+    """The previous validation: one Decimal/strptime chain per row"""
+    valid = 0
+    for row in rows:
+        try:
+            Decimal(row['amount'].replace('£', '').replace(',', '').strip())
+        except (InvalidOperation, ValueError):
+            continue
+
+        try:
+            datetime.strptime(row['due_date'].strip(), '%Y-%m-%d').date()
+        except ValueError:
+            try:
+                datetime.strptime(row['due_date'].strip(), '%d/%m/%Y').date()
+            except ValueError:
+                continue
+
+        row['client_name'].strip()
+        row['client_email'].strip().lower()
+        valid += 1
+    return valid
+
+
+def columnar_validate(rows: List[dict]) -> int:
+    """The current columnar validation stage, fed the same rows as columns"""
+    row_nums = list(range(2, len(rows) + 2))
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+    return sum(1 for _, record, _ in validate_columns(row_nums, columns) if record is not None)
+
+
+def legacy_pipeline(payload: bytes) -> int:
+    """Previous end-to-end path: DictReader then per-row validation"""
+    return legacy_validate(read_rows(payload))
+
+
+def streaming_pipeline(payload: bytes) -> int:
+    """Current end-to-end path: streaming reader with columnar validation"""
+    with open_upload(io.BytesIO(payload), 'csv') as (_, rows):
+        return sum(1 for _, record, _ in rows if record is not None)
+
+
+def run(name: str, validate_fn, data, rows: int) -> float:
+    start = time.perf_counter()
+    valid = validate_fn(data)
+    elapsed = time.perf_counter() - start
+
+    per_row_us = elapsed / rows * 1_000_000
+    print(f"  {name:<9} {valid:>8} valid  {elapsed:>7.2f}s  {per_row_us:>6.2f} µs/row")
+    return per_row_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    payload = build_csv(args.rows)
+    print(f"Validating {args.rows} rows")
+
+    rows = read_rows(payload)
+    print("Validation stage only:")
+    before = run("legacy", legacy_validate, rows, args.rows)
+    after = run("columnar", columnar_validate, rows, args.rows)
+    print(f"  Speed-up: {before / after:.1f}x")
+
+    print("Read + validate:")
+    before = run("legacy", legacy_pipeline, payload, args.rows)
+    after = run("columnar", streaming_pipeline, payload, args.rows)
+    print(f"  Speed-up: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
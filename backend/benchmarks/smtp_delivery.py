@@ -0,0 +1,143 @@
+"""
+Benchmark reminder delivery: a new SMTP session per message vs the pool
+
+Starts a local aiosmtpd server that accepts everything and delays each
+reply by --rtt-ms to stand in for the network, then sends the same
+messages three ways: the previous connect/STARTTLS/login per message, one
+pooled send per message, and send_many over pooled sessions. Pass
+--tls-cert/--tls-key to include STARTTLS in the handshake.
+
+Usage:
+    python -m benchmarks.smtp_delivery --messages 200 --rtt-ms 20 --threads 4
+"""
+import argparse
+import asyncio
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from typing import Callable, List, Optional
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, AuthResult
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+class Sink:
+    """Accept and count every message"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+class SlowSMTPController(Controller):
+    """aiosmtpd server whose every reply takes `rtt` seconds"""
+
+    def __init__(self, handler, rtt: float, tls_context: Optional[ssl.SSLContext], **kwargs):
+        self.rtt = rtt
+        self.tls_context = tls_context
+        super().__init__(handler, **kwargs)
+
+    def factory(self):
+        rtt = self.rtt
+
+        class SlowSMTP(SMTP):
+            async def push(self, status):
+                await asyncio.sleep(rtt)
+                return await super().push(status)
+
+        return SlowSMTP(
+            self.handler,
+            tls_context=self.tls_context,
+            authenticator=lambda *args: AuthResult(success=True),
+            auth_require_tls=False
+        )
+
+
+def build_messages(count: int) -> List[EmailMessage]:
+    messages = []
+    for n in range(count):
+        message = EmailMessage()
+        message["From"] = "accounts@example.com"
+        message["To"] = f"client{n}@example.com"
+        message["Subject"] = f"Payment reminder: INV-{n}"
+        message.set_content(f"Invoice INV-{n} for £{100 + n:,.2f} is now overdue.")
+        messages.append(message)
+    return messages
+
+
+def timed(label: str, send: Callable[[], None], count: int):
+    start = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed:>8.2f} {count / elapsed:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent senders")
+    parser.add_argument("--batch", type=int, default=25, help="Messages per send_many call")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--tls-cert")
+    parser.add_argument("--tls-key")
+    args = parser.parse_args()
+
+    tls_context = None
+    if args.tls_cert:
+        tls_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        tls_context.load_cert_chain(args.tls_cert, args.tls_key)
+
+    sink = Sink()
+    server = SlowSMTPController(sink, args.rtt_ms / 1000, tls_context, hostname="127.0.0.1", port=args.port)
+    server.start()
+
+    messages = build_messages(args.messages)
+    starttls = tls_context is not None
+
+    def per_message(message: EmailMessage):
+        # The previous EmailService._send_via_smtp
+        with smtplib.SMTP("127.0.0.1", args.port) as smtp:
+            if starttls:
+                smtp.starttls()
+            smtp.login("user", "password")
+            smtp.send_message(message)
+
+    def new_pool() -> SMTPConnectionPool:
+        return SMTPConnectionPool("127.0.0.1", args.port, "user", "password",
+                                  starttls=starttls, max_size=args.threads)
+
+    batches = [messages[i:i + args.batch] for i in range(0, len(messages), args.batch)]
+
+    print(f"{args.messages} messages, {args.rtt_ms:.0f}ms per reply, {args.threads} senders, "
+          f"STARTTLS {'on' if starttls else 'off'}")
+    print(f"{'path':<26} {'seconds':>8} {'msgs/s':>10}")
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            timed("session per message", lambda: list(executor.map(per_message, messages)), len(messages))
+
+            pool = new_pool()
+            timed("pooled send", lambda: list(executor.map(pool.send, messages)), len(messages))
+            print(f"  {pool.stats()}")
+            pool.close()
+
+            pool = new_pool()
+            timed(f"pooled send_many ({args.batch})",
+                  lambda: list(executor.map(pool.send_many, batches)), len(messages))
+            print(f"  {pool.stats()}")
+            pool.close()
+    finally:
+        server.stop()
+
+    print(f"Server received {sink.received} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Local stand-in for the OpenAI chat completions API
+
+Serves POST /v1/chat/completions from StubBackend, so the whole app -
+including the real OpenAI client and its HTTP handling - can run offline.
+Injected errors are returned as HTTP 429/5xx responses. With --record the
+server instead proxies to the real API and saves every reply, building a
+file that --replay (or AI_BACKEND=replay) can serve later.
+
+Usage:
+    python -m benchmarks.stub_model_server --port 8089 --latency-ms 800 --error-rate 0.02
+    OPENAI_BASE_URL=http://localhost:8089/v1 uvicorn app.main:app
+"""
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.core.config import settings
+from app.services.model_backends import (
+    ModelBackend,
+    ModelBackendError,
+    OpenAIBackend,
+    RecordingBackend,
+    ReplayStore,
+    StubBackend,
+)
+
+
+def make_handler(backend: ModelBackend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self._send(404, {"error": {"message": "Not found"}})
+                return
+
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            try:
+                reply = backend.complete(
+                    request["messages"],
+                    request.get("max_tokens", 1024),
+                    request.get("temperature", 1.0)
+                )
+            except ModelBackendError as e:
+                self._send(e.status_code or 504, {"error": {"message": str(e), "type": "stub_error"}})
+                return
+
+            self._send(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", backend.model),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--jitter-ms", type=float, default=400.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--replay", help="Serve recorded replies from this JSONL file where possible")
+    mode.add_argument("--record", help="Proxy to the real API, appending replies to this JSONL file")
+    args = parser.parse_args()
+
+    if args.record:
+        backend = RecordingBackend(
+            OpenAIBackend(settings.OPENAI_API_KEY, settings.OPENAI_MODEL, settings.AI_REQUEST_TIMEOUT_SECONDS),
+            ReplayStore(args.record)
+        )
+        description = f"recording to {args.record}"
+    else:
+        backend = StubBackend(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            tokens_per_second=args.tokens_per_second,
+            error_rate=args.error_rate,
+            replay=ReplayStore(args.replay) if args.replay else None,
+            model=settings.OPENAI_MODEL,
+            seed=args.seed
+        )
+        description = f"{args.latency_ms:.0f}ms +{args.jitter_ms:.0f}ms, {args.error_rate:.0%} errors"
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend))
+    print(f"Stub model server on http://{args.host}:{args.port}/v1 ({description})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import time
+
+from app.jobs.reminder_tasks import _cache_lookups, summarise_draft_generation
+from app.services.generation_cache import GenerationCache
+
+
+def test_cache_lookups_counts_only_since_the_snapshot():
+    # Nothing listens on this port, so every Redis call fails over to local
+    cache = GenerationCache("redis://127.0.0.1:1/0", ttl_seconds=60, local_max_entries=10)
+    cache.get("earlier")
+
+    before = cache.stats()
+    cache.set("a", {"subject": "s", "body": "b"})
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    assert _cache_lookups(cache, before) == {"hits": 1, "misses": 2}
+
+
+def test_cache_lookups_without_a_cache():
+    assert _cache_lookups(None, None) == {"hits": 0, "misses": 0}
+
+
+def test_summary_totals_cache_lookups_across_chunks():
+    chunks = [
+        [
+            {"business_id": "a", "status": "completed", "drafts": 3, "duration_seconds": 1.0,
+             "cache": {"hits": 3, "misses": 1}},
+            {"business_id": "b", "status": "skipped"},
+        ],
+        [
+            {"business_id": "c", "status": "completed", "drafts": 2, "duration_seconds": 2.5,
+             "cache": {"hits": 0, "misses": 4}},
+            {"business_id": "d", "status": "failed", "error": "boom"},
+        ],
+    ]
+
+    summary = summarise_draft_generation(chunks, time.time())
+
+    assert summary["drafts"] == 5
+    assert summary["completed"] == 2
+    assert summary["skipped"] == 1
+    assert summary["failed"] == ["d"]
+    assert summary["slowest_business_seconds"] == 2.5
+    assert summary["generation_cache"] == {"hits": 3, "misses": 5, "hit_rate": 0.375}
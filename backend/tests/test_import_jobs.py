@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.jobs import import_tasks
+from app.models.import_job import ImportJob, ImportJobStatus
+
+CSV = b"client_name,client_email,amount,due_date\nAcme,acme@example.com,120.00,2026-01-31\n"
+
+
+@pytest.fixture
+def queued(monkeypatch, tmp_path):
+    """Stage uploads under tmp_path and record the imports queued for workers"""
+    monkeypatch.setattr(settings, "IMPORT_STAGING_DIR", str(tmp_path))
+    job_ids = []
+    monkeypatch.setattr(import_tasks.process_invoice_import, "delay", job_ids.append)
+    return job_ids
+
+
+def upload(api):
+    response = api.post("/invoices/imports", files={"file": ("ledger.csv", CSV, "text/csv")})
+    assert response.status_code == 202
+    return response.json()
+
+
+def status_after_sweep(db, job_id) -> ImportJobStatus:
+    import_tasks.fail_stale_imports()
+    db.expire_all()
+    return db.get(ImportJob, job_id).status
+
+
+def age(db, job_id, **fields):
+    job = db.get(ImportJob, job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.commit()
+    return job
+
+
+def test_identical_upload_returns_the_pending_job(api, queued):
+    first = upload(api)
+    second = upload(api)
+
+    assert second["id"] == first["id"]
+    assert queued == [first["id"]]
+
+
+def test_stale_queued_job_is_failed_and_the_file_can_be_imported_again(api, db, queued):
+    first = upload(api)
+    staged_path = db.get(ImportJob, first["id"]).staged_path
+    stale_since = datetime.utcnow() - timedelta(seconds=settings.IMPORT_STALE_SECONDS + 60)
+    age(db, first["id"], created_at=stale_since)
+
+    assert status_after_sweep(db, first["id"]) == ImportJobStatus.FAILED
+    job = db.get(ImportJob, first["id"])
+    assert job.staged_path is None
+    assert job.error_message
+    assert not os.path.exists(staged_path)
+
+    second = upload(api)
+    assert second["id"] != first["id"]
+    assert second["status"] == "queued"
+
+
+def test_running_job_is_stale_only_once_progress_stops(api, db, queued):
+    job_id = upload(api)["id"]
+    long_ago = datetime.utcnow() - timedelta(seconds=settings.IMPORT_STALE_SECONDS + 60)
+    age(db, job_id, status=ImportJobStatus.RUNNING, created_at=long_ago, started_at=long_ago,
+        progress_at=datetime.utcnow())
+
+    assert status_after_sweep(db, job_id) == ImportJobStatus.RUNNING
+
+    age(db, job_id, progress_at=long_ago)
+    assert status_after_sweep(db, job_id) == ImportJobStatus.FAILED
+
+
+def test_fresh_queued_job_is_left_alone(api, db, queued):
+    job_id = upload(api)["id"]
+
+    assert status_after_sweep(db, job_id) == ImportJobStatus.QUEUED
+
+
+def test_finished_jobs_are_left_alone(api, db, queued):
+    job_id = upload(api)["id"]
+    long_ago = datetime.utcnow() - timedelta(seconds=settings.IMPORT_STALE_SECONDS + 60)
+    age(db, job_id, status=ImportJobStatus.COMPLETED, created_at=long_ago, finished_at=long_ago)
+
+    assert status_after_sweep(db, job_id) == ImportJobStatus.COMPLETED
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.api.invoices import _INVOICE_LIST_FIELDS
+
+
+def test_ndjson_export_has_every_list_field(api, business, make_invoice):
+    invoice = make_invoice(business)
+
+    response = api.get("/invoices/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [str(invoice.id)]
+    assert list(rows[0]) == list(_INVOICE_LIST_FIELDS)
+    assert rows[0]["amount"] == "100.00"
+    assert rows[0]["status"] == "unpaid"
+
+
+def test_export_rejects_an_unknown_format(api):
+    response = api.get("/invoices/export", params={"format": "xml"})
+
+    assert response.status_code == 400
+
+
+def test_csv_export_matches_list_fields_and_stays_in_the_business(api, business, make_business, make_invoice):
+    older = make_invoice(business, due_date=date(2026, 1, 5), amount=Decimal("250.50"))
+    newer = make_invoice(business, due_date=date(2026, 2, 5), invoice_number=None)
+    other_business, _ = make_business("Other Ltd")
+    make_invoice(other_business)
+
+    response = api.get("/invoices/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = csv.reader(io.StringIO(response.text))
+    assert header == list(_INVOICE_LIST_FIELDS)
+
+    # Latest due date first, and nothing from the other business
+    assert [row[0] for row in rows] == [str(newer.id), str(older.id)]
+    exported = dict(zip(header, rows[1]))
+    assert exported["client_id"] == str(older.client_id)
+    assert exported["amount"] == "250.50"
+    assert exported["due_date"] == "2026-01-05"
+    assert exported["status"] == "unpaid"
+    assert exported["days_overdue"] == "10"
+    assert dict(zip(header, rows[0]))["invoice_number"] == ""
+
+
+def test_csv_export_filters_by_status(api, business, make_invoice):
+    from app.models.invoice import InvoiceStatus
+
+    make_invoice(business, status=InvoiceStatus.PAID)
+    unpaid = make_invoice(business)
+
+    response = api.get("/invoices/export", params={"format": "csv", "status_filter": "unpaid"})
+
+    _, *rows = csv.reader(io.StringIO(response.text))
+    assert [row[0] for row in rows] == [str(unpaid.id)]
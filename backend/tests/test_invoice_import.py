@@ -0,0 +1,112 @@
+import io
+from decimal import Decimal
+
+from app.models.client import Client
+from app.models.invoice import Invoice
+from app.services.invoice_import_service import InvoiceImportService, open_upload
+
+HEADER = "client_name,client_email,amount,due_date,invoice_number\n"
+
+
+def run_import(db, business, csv_text: str, batch_size: int = 1000):
+    service = InvoiceImportService(db, business.id, batch_size=batch_size)
+    with open_upload(io.BytesIO((HEADER + csv_text).encode()), "csv") as (_, rows):
+        result = service.import_rows(rows)
+    db.commit()
+    return result
+
+
+def invoices_of(db, business):
+    return db.query(Invoice).filter(Invoice.business_id == business.id).all()
+
+
+def test_reimporting_a_ledger_adds_nothing(db, business):
+    ledger = (
+        "Acme,acme@example.com,100.00,2026-01-10,INV-1\n"
+        "Acme,acme@example.com,250.00,2026-01-20,INV-2\n"
+        "Beta,beta@example.com,75.50,2026-02-01,\n"
+    )
+
+    first = run_import(db, business, ledger)
+    second = run_import(db, business, ledger)
+
+    assert (first.success, first.duplicates) == (3, 0)
+    assert (second.success, second.duplicates) == (0, 3)
+    assert len(invoices_of(db, business)) == 3
+
+
+def test_duplicates_within_one_file_and_across_batches(db, business):
+    row = "Acme,acme@example.com,100.00,2026-01-10,INV-1\n"
+
+    result = run_import(db, business, row + "Acme,acme@example.com,100,10/01/2026,INV-1\n" + row, batch_size=2)
+
+    # The same invoice written three ways is imported once
+    assert (result.success, result.duplicates) == (1, 2)
+    assert len(invoices_of(db, business)) == 1
+
+
+def test_changed_rows_are_new_invoices(db, business):
+    run_import(db, business, "Acme,acme@example.com,100.00,2026-01-10,INV-1\n")
+
+    result = run_import(db, business, (
+        "Acme,acme@example.com,100.01,2026-01-10,INV-1\n"
+        "Acme,acme@example.com,100.00,2026-01-11,INV-1\n"
+        "Acme,acme@example.com,100.00,2026-01-10,INV-9\n"
+    ))
+
+    assert (result.success, result.duplicates) == (3, 0)
+
+
+def test_same_ledger_in_two_businesses_is_imported_by_each(db, business, make_business):
+    other, _ = make_business("Other Ltd")
+    ledger = "Acme,acme@example.com,100.00,2026-01-10,INV-1\n"
+
+    assert run_import(db, business, ledger).success == 1
+    assert run_import(db, other, ledger).success == 1
+
+
+def test_invalid_rows_are_reported_and_skipped(db, business):
+    result = run_import(db, business, (
+        "Acme,acme@example.com,100.00,2026-01-10,INV-1\n"
+        "Acme,acme@example.com,lots,2026-01-10,INV-2\n"
+    ))
+
+    assert (result.success, result.failed) == (1, 1)
+    assert result.errors == ["Row 3: Invalid amount format"]
+
+
+def test_clients_are_resolved_by_email_and_created_once(db, business):
+    existing = Client(business_id=business.id, name="Acme Ltd", email="acme@example.com")
+    db.add(existing)
+    db.commit()
+
+    run_import(db, business, (
+        "Acme Limited,ACME@example.com,100.00,2026-01-10,INV-1\n"
+        "Beta,beta@example.com,20.00,2026-01-10,INV-2\n"
+        "Beta Renamed,beta@example.com,30.00,2026-01-11,INV-3\n"
+        "Beta,beta@example.com,40.00,2026-01-12,INV-4\n"
+    ), batch_size=2)
+
+    clients = {c.email: c for c in db.query(Client).filter(Client.business_id == business.id)}
+    assert set(clients) == {"acme@example.com", "beta@example.com"}
+    # Existing clients keep their details; a new one takes the first name seen
+    assert clients["acme@example.com"].id == existing.id
+    assert clients["acme@example.com"].name == "Acme Ltd"
+    assert clients["beta@example.com"].name == "Beta"
+    by_number = {i.invoice_number: i for i in invoices_of(db, business)}
+    assert by_number["INV-1"].client_id == existing.id
+    assert {by_number[n].client_id for n in ("INV-2", "INV-3", "INV-4")} == {clients["beta@example.com"].id}
+
+
+def test_import_keeps_the_summary_in_step(db, business, summary_totals):
+    run_import(db, business, (
+        "Acme,acme@example.com,100.00,2020-01-10,INV-1\n"
+        "Acme,acme@example.com,250.00,2099-01-20,INV-2\n"
+    ))
+    run_import(db, business, "Acme,acme@example.com,100.00,2020-01-10,INV-1\n")
+
+    totals = summary_totals(business)
+    assert totals["unpaid_count"] == 2
+    assert totals["unpaid_amount"] == Decimal("350.00")
+    assert totals["overdue_count"] == 1
+    assert totals == summary_totals(business, recount=True)
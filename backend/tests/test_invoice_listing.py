@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from app.api.invoices import MAX_INVOICE_PAGE_SIZE
+
+
+def walk(api, **params):
+    """Every page of GET /invoices/, following X-Next-Cursor"""
+    pages = []
+    cursor = None
+    while True:
+        response = api.get("/invoices/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+
+def test_cursor_walks_every_invoice_once_latest_due_first(api, business, make_invoice):
+    invoices = [make_invoice(business, due_date=date(2026, 3, 1) - timedelta(days=n)) for n in range(7)]
+
+    pages = walk(api, limit=3, fields="id")
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [row["id"] for page in pages for row in page] == [str(i.id) for i in invoices]
+
+
+def test_cursor_splits_invoices_sharing_a_due_date(api, business, make_invoice):
+    due = date(2026, 3, 1)
+    tied = [make_invoice(business, due_date=due) for _ in range(5)]
+    earlier = make_invoice(business, due_date=due - timedelta(days=1))
+
+    pages = walk(api, limit=2, fields="id,due_date")
+
+    ids = [row["id"] for page in pages for row in page]
+    # Ties are ordered by id, newest due date first, with none skipped or repeated
+    assert ids == sorted((str(i.id) for i in tied), reverse=True) + [str(earlier.id)]
+
+
+def test_limit_defaults_to_one_page_and_is_capped(api, business, make_invoice):
+    for _ in range(101):
+        make_invoice(business)
+
+    response = api.get("/invoices/", params={"fields": "id"})
+    assert len(response.json()) == 100
+    assert response.headers.get("x-next-cursor")
+
+    assert api.get("/invoices/", params={"limit": MAX_INVOICE_PAGE_SIZE + 1}).status_code == 422
+
+
+def test_cursor_keeps_filters(api, business, make_invoice):
+    from app.models.invoice import InvoiceStatus
+
+    unpaid = [make_invoice(business, due_date=date(2026, 3, n)) for n in range(1, 5)]
+    for n in range(1, 5):
+        make_invoice(business, due_date=date(2026, 3, n), status=InvoiceStatus.PAID)
+
+    pages = walk(api, limit=3, status_filter="unpaid", fields="id,status")
+
+    rows = [row for page in pages for row in page]
+    assert [row["id"] for row in rows] == [str(i.id) for i in reversed(unpaid)]
+    assert {row["status"] for row in rows} == {"unpaid"}
+
+
+def test_lists_only_the_business_own_invoices(api, business, make_business, make_invoice):
+    mine = make_invoice(business)
+    other_business, _ = make_business("Other Ltd")
+    theirs = make_invoice(other_business)
+
+    assert [row["id"] for row in api.get("/invoices/").json()] == [str(mine.id)]
+    response = api.get("/invoices/", params={"client_id": str(theirs.client_id)})
+    assert response.json() == []
+
+
+def test_rejects_a_malformed_cursor(api):
+    assert api.get("/invoices/", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.invoice_validation import (
+    MAX_AMOUNT,
+    is_valid_email,
+    parse_due_date,
+    validate_rows,
+)
+
+HEADERS = ["client_name", "client_email", "amount", "due_date", "invoice_number"]
+
+
+def validate(*rows, headers=HEADERS):
+    return validate_rows(headers, list(range(2, len(rows) + 2)), [list(row) for row in rows])
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-03-14", date(2026, 3, 14)),
+    ("2026/3/4", date(2026, 3, 4)),
+    ("14/03/2026", date(2026, 3, 14)),
+    ("14.03.2026", date(2026, 3, 14)),
+    ("14 Mar 2026", date(2026, 3, 14)),
+    ("14-March-2026", date(2026, 3, 14)),
+    ("14 March, 2026", date(2026, 3, 14)),
+    ("31/02/2026", None),
+    ("14 Foo 2026", None),
+    ("03/14", None),
+    ("", None),
+])
+def test_parse_due_date(value, expected):
+    assert parse_due_date(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("accounts@example.com", True),
+    ("a.b+c@mail.example.co.uk", True),
+    ("no-at-sign.example.com", False),
+    ("two@@example.com", False),
+    ("nodot@example", False),
+    ("spaces in@example.com", False),
+])
+def test_is_valid_email(value, expected):
+    assert is_valid_email(value) == expected
+
+
+def test_valid_row_is_normalised():
+    [(row_num, record, error)] = validate(
+        ["  Acme Ltd ", " Accounts@Example.COM ", "£1,250.50", "14/03/2026", " INV-7 "]
+    )
+
+    assert (row_num, error) == (2, None)
+    assert record == {
+        "client_name": "Acme Ltd",
+        "client_email": "accounts@example.com",
+        "amount": Decimal("1250.50"),
+        "due_date": date(2026, 3, 14),
+        "invoice_number": "INV-7",
+    }
+
+
+@pytest.mark.parametrize("amount, expected", [
+    ("100", Decimal("100")),
+    ("-3.5", Decimal("-3.5")),
+    ("+.5", Decimal(".5")),
+    ("1e3", Decimal("1e3")),
+    (str(MAX_AMOUNT), MAX_AMOUNT),
+])
+def test_amount_formats(amount, expected):
+    [(_, record, error)] = validate(["Acme", "a@example.com", amount, "2026-03-14", ""])
+
+    assert error is None
+    assert record["amount"] == expected
+
+
+@pytest.mark.parametrize("row, error", [
+    (["Acme", "a@example.com", "ten pounds", "2026-03-14", ""], "Invalid amount format"),
+    (["Acme", "a@example.com", "1e12", "2026-03-14", ""], "Invalid amount format"),
+    (["Acme", "a@example.com", "100000000", "2026-03-14", ""], "Invalid amount format"),
+    (["Acme", "a@example.com", "10", "next week", ""], "Invalid date format"),
+    (["", "a@example.com", "10", "2026-03-14", ""], "Client name and email are required"),
+    (["Acme", " ", "10", "2026-03-14", ""], "Client name and email are required"),
+    (["Acme", "not-an-email", "10", "2026-03-14", ""], "Invalid client email"),
+])
+def test_invalid_rows_report_the_first_problem(row, error):
+    [(_, record, message)] = validate(row)
+
+    assert record is None
+    assert message.startswith(error)
+
+
+def test_rows_keep_their_order_and_numbers():
+    results = validate(
+        ["Acme", "a@example.com", "10", "2026-03-14", ""],
+        ["Bad", "a@example.com", "x", "2026-03-14", ""],
+        ["Beta", "b@example.com", "20", "2026-03-15", ""],
+    )
+
+    assert [(row_num, error is None) for row_num, _, error in results] == [(2, True), (3, False), (4, True)]
+    # A blank invoice number is stored as missing
+    assert results[0][1]["invoice_number"] is None
+
+
+def test_short_rows_and_missing_optional_columns():
+    headers = ["due_date", "amount", "client_email", "client_name"]
+
+    [(_, full, _), (_, short, error)] = validate(
+        ["2026-03-14", "10", "a@example.com", "Acme"],
+        ["2026-03-14", "10", "a@example.com"],
+        headers=headers,
+    )
+
+    assert full["invoice_number"] is None
+    assert short is None
+    assert error == "Client name and email are required"
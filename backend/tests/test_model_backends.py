@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from app.services.model_backends import ModelBackend, ModelBackendError, StubBackend
+from app.services.model_resilience import ResilientBackend
+
+MESSAGES = [{"role": "user", "content": "Client: Acme (a@example.com)\nInvoice amount: £10.00"}]
+
+
+def test_model_backend_is_abstract():
+    with pytest.raises(TypeError):
+        ModelBackend()
+
+
+def test_stub_backend_reports_stats_like_other_backends():
+    backend = StubBackend(seed=1)
+
+    reply = backend.complete(MESSAGES, max_tokens=100, temperature=0.0)
+
+    assert "£10.00" in json.loads(reply)["body"]
+    stats = backend.stats()
+    assert stats["calls"] == 1
+    assert stats["synthesised"] == 1
+    # A copy, not the live counters
+    stats["calls"] = 99
+    assert backend.stats()["calls"] == 1
+
+
+def test_every_backend_exposes_stats():
+    stub = StubBackend(error_rate=1.0, seed=1)
+    resilient = ResilientBackend(stub, max_retries=0)
+
+    with pytest.raises(ModelBackendError):
+        resilient.complete(MESSAGES, max_tokens=100, temperature=0.0)
+
+    for backend in (stub, resilient):
+        assert isinstance(backend.stats(), dict)
+    assert stub.stats()["errors"] == 1
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.models.invoice import InvoiceStatus
+from app.services.receivables_summary_service import ReceivablesSummaryService
+
+
+def create(api, amount: str, days_overdue: int) -> str:
+    response = api.post("/invoices/manual", json={
+        "client_name": "Acme",
+        "client_email": "acme@example.com",
+        "amount": amount,
+        "due_date": (date.today() - timedelta(days=days_overdue)).isoformat(),
+    })
+    assert response.status_code == 201
+    return response.json()["invoice_id"]
+
+
+def test_invoice_writes_keep_the_summary_equal_to_a_recount(api, business, summary_totals):
+    overdue = create(api, "100.00", 45)
+    later = create(api, "250.00", -5)
+    stale = create(api, "80.00", 95)
+
+    totals = summary_totals(business)
+    assert (totals["unpaid_count"], totals["unpaid_amount"]) == (3, Decimal("430.00"))
+    assert (totals["overdue_count"], totals["overdue_days_total"]) == (2, 140)
+    assert (totals["overdue_31_60_count"], totals["overdue_90_plus_count"]) == (1, 1)
+    assert totals["stage_3_count"] == 1 and totals["stage_4_count"] == 1
+    assert totals == summary_totals(business, recount=True)
+
+    assert api.patch(f"/invoices/{overdue}", json={"amount": "120.00"}).status_code == 200
+    assert api.patch(f"/invoices/{later}", json={
+        "due_date": (date.today() - timedelta(days=10)).isoformat()
+    }).status_code == 200
+    assert api.patch(f"/invoices/{stale}/mark-paid").status_code == 200
+    assert api.delete(f"/invoices/{overdue}").status_code == 200
+
+    totals = summary_totals(business)
+    assert (totals["unpaid_count"], totals["unpaid_amount"]) == (1, Decimal("250.00"))
+    assert (totals["paid_count"], totals["paid_amount"]) == (1, Decimal("80.00"))
+    assert (totals["overdue_1_30_count"], totals["stage_1_count"]) == (1, 1)
+    assert totals["overdue_days_total"] == 10
+    assert totals == summary_totals(business, recount=True)
+
+
+def test_summary_endpoint_reports_the_totals(api, business):
+    create(api, "100.00", 45)
+    create(api, "50.00", 15)
+
+    body = api.get("/invoices/summary").json()
+
+    assert Decimal(str(body["outstanding_amount"])) == Decimal("150.00")
+    assert body["average_days_overdue"] == 30
+    assert body["overdue_buckets"]["1-30"]["count"] == 1
+    assert body["overdue_buckets"]["31-60"]["count"] == 1
+    assert body["stages"]["2"]["count"] == 1
+
+
+def test_deltas_net_out(db, business, summary_totals):
+    service = ReceivablesSummaryService(db)
+    unpaid = (InvoiceStatus.UNPAID, Decimal("100.00"), 20)
+
+    service.invoices_added(business.id, [unpaid, unpaid])
+    service.invoice_changed(business.id, unpaid, (InvoiceStatus.PAID, Decimal("100.00"), 20))
+    service.invoice_changed(business.id, unpaid, None)
+    db.commit()
+
+    totals = summary_totals(business)
+    assert (totals["paid_count"], totals["paid_amount"]) == (1, Decimal("100.00"))
+    assert all(totals[column] == 0 for column in totals if not column.startswith("paid_"))
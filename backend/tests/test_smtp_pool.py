@@ -0,0 +1,171 @@
+import socket
+import time
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+class Sink:
+    """Accept and count every message"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+class DroppableController(Controller):
+    """aiosmtpd server that counts NOOPs and can drop every open session"""
+
+    def __init__(self, handler, **kwargs):
+        self.sessions = []
+        self.noops = 0
+        super().__init__(handler, **kwargs)
+
+    def factory(self):
+        controller = self
+
+        class TrackedSMTP(SMTP):
+            def connection_made(self, transport):
+                super().connection_made(transport)
+                controller.sessions.append(transport)
+
+            async def smtp_NOOP(self, arg):
+                controller.noops += 1
+                await super().smtp_NOOP(arg)
+
+        return TrackedSMTP(self.handler)
+
+    def drop_sessions(self):
+        """Close every session from the server side, as an idle timeout would"""
+        sessions, self.sessions = self.sessions, []
+        for transport in sessions:
+            self.loop.call_soon_threadsafe(transport.close)
+        time.sleep(0.1)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def sink():
+    return Sink()
+
+
+@pytest.fixture
+def server(sink):
+    controller = DroppableController(sink, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def make_pool(server, **kwargs) -> SMTPConnectionPool:
+    options = dict(starttls=False, timeout_seconds=5.0, noop_after_seconds=60.0)
+    options.update(kwargs)
+    return SMTPConnectionPool(server.hostname, server.port, **options)
+
+
+def build_messages(count: int):
+    messages = []
+    for n in range(count):
+        message = EmailMessage()
+        message["From"] = "accounts@example.com"
+        message["To"] = f"client{n}@example.com"
+        message["Subject"] = f"Payment reminder: INV-{n}"
+        message.set_content(f"Invoice INV-{n} is now overdue.")
+        messages.append(message)
+    return messages
+
+
+def test_reuses_one_session_for_consecutive_sends(server, sink):
+    pool = make_pool(server)
+
+    for message in build_messages(3):
+        pool.send(message)
+
+    stats = pool.stats()
+    assert sink.received == 3
+    assert stats["opened"] == 1
+    assert stats["reused"] == 2
+    assert stats["idle"] == 1
+    pool.close()
+
+
+def test_reconnects_when_an_idle_session_was_dropped(server, sink):
+    pool = make_pool(server)
+    pool.send(build_messages(1)[0])
+
+    server.drop_sessions()
+    errors = pool.send_many(build_messages(2))
+
+    assert errors == [None, None]
+    assert sink.received == 3
+    assert pool.stats()["opened"] == 2
+    pool.close()
+
+
+def test_health_check_keeps_a_live_session(server, sink):
+    pool = make_pool(server, noop_after_seconds=0.0)
+
+    pool.send(build_messages(1)[0])
+    pool.send(build_messages(1)[0])
+
+    stats = pool.stats()
+    assert server.noops == 1
+    assert stats["failed_health_checks"] == 0
+    assert stats["opened"] == 1
+    assert sink.received == 2
+    pool.close()
+
+
+def test_health_check_replaces_a_dead_session(server, sink):
+    pool = make_pool(server, noop_after_seconds=0.0)
+    pool.send(build_messages(1)[0])
+
+    server.drop_sessions()
+    pool.send(build_messages(1)[0])
+
+    stats = pool.stats()
+    assert stats["failed_health_checks"] == 1
+    assert stats["opened"] == 2
+    assert sink.received == 2
+    pool.close()
+
+
+def test_rolls_over_to_a_new_session_after_max_messages(server, sink):
+    pool = make_pool(server, max_messages_per_connection=2)
+
+    errors = pool.send_many(build_messages(5))
+
+    stats = pool.stats()
+    assert errors == [None] * 5
+    assert sink.received == 5
+    assert stats["opened"] == 3
+    # The two full sessions were retired; the last has room left
+    assert stats["closed"] == 2
+    assert stats["idle"] == 1
+    pool.close()
+
+
+def test_evicts_sessions_idle_past_the_timeout(server, sink):
+    pool = make_pool(server, idle_timeout_seconds=0.05)
+    pool.send(build_messages(1)[0])
+
+    time.sleep(0.1)
+    pool.send(build_messages(1)[0])
+
+    stats = pool.stats()
+    assert stats["evicted_idle"] == 1
+    assert stats["opened"] == 2
+    assert sink.received == 2
+    pool.close()
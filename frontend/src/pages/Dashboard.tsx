@@ -1,13 +1,19 @@
 import { Link, useNavigate } from 'react-router-dom'
 import { useQuery } from 'react-query'
 import { invoiceApi, reminderApi, authApi } from '@/services/api'
-import type { Invoice, ReminderDraft } from '@/types'
+import type { Invoice, ReceivablesSummary, ReminderDraft } from '@/types'
 
 export default function Dashboard() {
   const navigate = useNavigate()
 
-  const { data: invoices } = useQuery<Invoice[]>('invoices', async () => {
-    const res = await invoiceApi.getAll()
+  const { data: summary } = useQuery<ReceivablesSummary>(['invoices', 'summary'], async () => {
+    const res = await invoiceApi.getSummary()
+    return res.data
+  })
+
+  // Only the few most recent unpaid invoices are shown here
+  const { data: recentUnpaid } = useQuery<Invoice[]>(['invoices', 'recent-unpaid'], async () => {
+    const res = await invoiceApi.getAll({ status_filter: 'unpaid', limit: 5 })
     return res.data
   })
 
@@ -16,12 +22,9 @@ export default function Dashboard() {
     return res.data
   })
 
-  const unpaidInvoices = invoices?.filter(inv => inv.status === 'unpaid') || []
-  const overdueInvoices = unpaidInvoices.filter(inv => inv.days_overdue > 0)
-  const avgDaysOverdue = overdueInvoices.length > 0
-    ? Math.round(overdueInvoices.reduce((sum, inv) => sum + inv.days_overdue, 0) / overdueInvoices.length)
-    : 0
-  const totalOutstanding = unpaidInvoices.reduce((sum, inv) => sum + Number(inv.amount), 0)
+  const unpaidInvoices = recentUnpaid || []
+  const avgDaysOverdue = Math.round(summary?.average_days_overdue || 0)
+  const totalOutstanding = Number(summary?.outstanding_amount || 0)
 
   const handleLogout = async () => {
     await authApi.logout()
@@ -91,7 +94,7 @@ export default function Dashboard() {
               </div>
             </div>
             <dt className="text-sm font-medium text-slate-600 mb-1">Unpaid Invoices</dt>
-            <dd className="text-3xl font-bold text-slate-900">{unpaidInvoices.length}</dd>
+            <dd className="text-3xl font-bold text-slate-900">{summary?.unpaid_count || 0}</dd>
           </div>
 
           <div className="card p-6">
@@ -18,6 +18,9 @@ export default function DraftInbox() {
   const { data: drafts, isLoading } = useQuery<ReminderDraft[]>('drafts', async () => {
     const res = await reminderApi.getDrafts()
     return res.data
+  }, {
+    // Emails go out in the background; poll until queued ones are sent or fail
+    refetchInterval: (data) => data?.some((d) => d.status === 'queued') ? 3000 : false,
   })
 
   // Apply filters
@@ -63,19 +66,18 @@ export default function DraftInbox() {
     }
   )
 
+  // Drafts are streamed in and shown as each one is generated
+  const [generatedCount, setGeneratedCount] = useState(0)
   const generateDraftsMutation = useMutation(
-    async () => {
-      const res = await fetch('/api/reminders/generate-drafts', {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        }
+    () => {
+      setGeneratedCount(0)
+      return reminderApi.generateDraftsStream((draft) => {
+        setGeneratedCount((count) => count + 1)
+        queryClient.setQueryData<ReminderDraft[]>('drafts', (current) => [draft, ...(current ?? [])])
       })
-      if (!res.ok) throw new Error('Failed to generate drafts')
-      return res.json()
     },
     {
-      onSuccess: () => {
+      onSettled: () => {
         queryClient.invalidateQueries('drafts')
       }
     }
@@ -198,7 +200,7 @@ export default function DraftInbox() {
                   <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4"></circle>
                   <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
                 </svg>
-                Generating...
+                Generating... {generatedCount > 0 && `(${generatedCount} ready)`}
               </>
             ) : (
               <>
@@ -326,6 +328,16 @@ export default function DraftInbox() {
                             Approved
                           </span>
                         )}
+                        {draft.status === 'queued' && (
+                          <span className="badge badge-info">
+                            Sending
+                          </span>
+                        )}
+                        {draft.status === 'failed' && (
+                          <span className="badge bg-red-100 text-red-700">
+                            Failed to send
+                          </span>
+                        )}
                         {draft.status === 'scheduled' && (
                           <span className="badge badge-info">
                             <svg className="w-3 h-3 mr-1" fill="currentColor" viewBox="0 0 20 20">
@@ -25,7 +25,7 @@ export default function Invoices() {
   })
 
   const { data: invoices = [], isLoading } = useQuery('invoices', () =>
-    invoiceApi.getAll().then(res => res.data)
+    invoiceApi.getAllPages()
   )
 
   const markPaidMutation = useMutation(
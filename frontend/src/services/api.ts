@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { Invoice, ReminderDraft } from '@/types'
+import type { Invoice, ReceivablesSummary, ReminderDraft } from '@/types'
 
 const api = axios.create({
   baseURL: '/api',
@@ -21,8 +21,23 @@ export const authApi = {
 }
 
 export const invoiceApi = {
-  getAll: () =>
-    api.get<Invoice[]>('/invoices'),
+  getAll: (params?: { status_filter?: string; limit?: number; cursor?: string }) =>
+    api.get<Invoice[]>('/invoices', { params }),
+
+  // Follows X-Next-Cursor through every page of the list
+  getAllPages: async (params?: { status_filter?: string }) => {
+    const invoices: Invoice[] = []
+    let cursor: string | undefined
+    do {
+      const res = await api.get<Invoice[]>('/invoices', { params: { ...params, limit: 500, cursor } })
+      invoices.push(...res.data)
+      cursor = res.headers['x-next-cursor']
+    } while (cursor)
+    return invoices
+  },
+
+  getSummary: () =>
+    api.get<ReceivablesSummary>('/invoices/summary'),
 
   upload: (file: File) => {
     const formData = new FormData()
@@ -72,11 +87,52 @@ export const reminderApi = {
   send: (draftId: string) =>
     api.post(`/reminders/${draftId}/send`),
 
+  // Queues every draft in one call; each moves from queued to sent or failed
+  sendMany: (draftIds: string[]) =>
+    api.post<{ queued: number; skipped: { draft_id: string; reason: string }[] }>('/reminders/send', { draft_ids: draftIds }),
+
   markAsSent: (draftId: string) =>
     api.post(`/reminders/${draftId}/mark-sent`),
 
   delete: (draftId: string) =>
     api.delete(`/reminders/${draftId}`),
+
+  // Server-sent events from a POST, so read with fetch rather than EventSource.
+  // Calls onDraft as each draft is ready; resolves with the number generated.
+  generateDraftsStream: async (onDraft: (draft: ReminderDraft) => void): Promise<number> => {
+    const res = await fetch('/api/reminders/generate-drafts/stream', {
+      method: 'POST',
+      credentials: 'include',
+      headers: {
+        'Authorization': `Bearer ${localStorage.getItem('token')}`
+      }
+    })
+    if (!res.ok || !res.body) throw new Error('Failed to generate drafts')
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) break
+      buffer += value
+
+      let end
+      while ((end = buffer.indexOf('\n\n')) !== -1) {
+        const message = buffer.slice(0, end)
+        buffer = buffer.slice(end + 2)
+
+        const event = /^event: (.*)$/m.exec(message)?.[1]
+        const data = /^data: (.*)$/m.exec(message)?.[1]
+        if (!event || !data) continue
+
+        const payload = JSON.parse(data)
+        if (event === 'draft') onDraft(payload)
+        else if (event === 'done') return payload.count
+        else if (event === 'error') throw new Error(payload.detail)
+      }
+    }
+    throw new Error('Draft generation ended unexpectedly')
+  },
 }
 
 export default api
@@ -10,6 +10,7 @@ export interface Invoice {
   client_id: string
   client_name: string
   client_email: string
+  invoice_number?: string | null
   amount: number
   due_date: string
   status: 'unpaid' | 'paid'
@@ -17,6 +18,24 @@ export interface Invoice {
   created_at: string
 }
 
+export interface SummaryBucket {
+  count: number
+  amount: string
+}
+
+export interface ReceivablesSummary {
+  outstanding_amount: string
+  unpaid_count: number
+  paid_count: number
+  paid_amount: string
+  overdue_count: number
+  overdue_amount: string
+  average_days_overdue: number
+  overdue_buckets: Record<'1-30' | '31-60' | '61-90' | '90+', SummaryBucket>
+  stages: Record<1 | 2 | 3 | 4, SummaryBucket>
+  updated_at: string
+}
+
 export interface ReminderDraft {
   id: string
   invoice_id: string
@@ -28,7 +47,7 @@ export interface ReminderDraft {
   escalation_level: number // 1-4
   subject?: string
   body_text: string
-  status: 'pending' | 'approved' | 'scheduled' | 'sent' | 'failed'
+  status: 'pending' | 'approved' | 'scheduled' | 'queued' | 'sent' | 'failed'
   approved: boolean
   auto_send_at?: string | null
   sent_at: string | null